@@ -9,8 +9,11 @@ REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method',
 REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'endpoint'])
 ACTIVE_SESSIONS = Gauge('active_sessions_total', 'Number of active sessions')
 VECTOR_STORE_SIZE = Gauge('vector_store_documents_total', 'Total documents in vector store')
-EMBEDDING_CACHE_HITS = Counter('embedding_cache_hits_total', 'Embedding cache hits')
-EMBEDDING_CACHE_MISSES = Counter('embedding_cache_misses_total', 'Embedding cache misses')
+EMBEDDING_CACHE_HITS = Counter('embedding_cache_hits_total', 'Embedding cache hits', ['namespace'])
+EMBEDDING_CACHE_MISSES = Counter('embedding_cache_misses_total', 'Embedding cache misses', ['namespace'])
+EMBEDDING_CACHE_EVICTIONS = Counter('embedding_cache_evictions_total', 'Embedding cache evictions', ['namespace'])
+EMBEDDING_CACHE_BYTES = Gauge('embedding_cache_bytes', 'Approximate bytes held by the embedding cache', ['namespace'])
+EMBEDDING_CACHE_ENTRIES = Gauge('embedding_cache_entries', 'Entries held by the embedding cache', ['namespace'])
 
 async def metrics_middleware(request, call_next):
     """Record request metrics"""
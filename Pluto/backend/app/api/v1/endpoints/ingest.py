@@ -5,7 +5,7 @@ import os
 import shutil
 import uuid
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 
@@ -29,8 +29,10 @@ class IngestionResponse(BaseModel):
     session_id: str
     chunks: int = 0
     indexed: int = 0
+    skipped: int = 0
     topic: Optional[str] = None
     concepts: Optional[List[str]] = None
+    image_dedup: Optional[Dict[str, int]] = None
 
 
 class IngestionStatusResponse(BaseModel):
@@ -109,8 +111,10 @@ async def ingest_file(
             session_id=session_id,
             chunks=result.get("chunks", 0),
             indexed=result.get("indexed", 0),
+            skipped=result.get("skipped", 0),
             topic=result.get("topic"),
-            concepts=result.get("concepts")
+            concepts=result.get("concepts"),
+            image_dedup=result.get("image_dedup")
         )
         
     except Exception as e:
@@ -271,10 +275,8 @@ async def ingest_batch(
 async def delete_session_documents(session_id: str):
     """Delete all documents for a session"""
     try:
-        from app.storage.vector_store import VectorStore
-        store = VectorStore()
-        result = store.delete_by_session(session_id)
-        return result
+        from app.storage.async_vector_store import AsyncVectorStore
+        return await AsyncVectorStore().delete_by_session(session_id)
     except Exception as e:
         logger.error(f"Failed to delete session {session_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,11 +1,13 @@
 """
 Query API Endpoint - Handle user queries with retrieval and synthesis
 """
+import asyncio
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.core.logging_config import get_safe_logger
+from app.core.model_registry import require_models
 from app.graph.agents.synthesis_agent import SynthesisAgent
 from app.services.chat_history import ChatHistoryManager
 
@@ -40,7 +42,11 @@ class QueryResponse(BaseModel):
     session_id: str
 
 
-@router.post("/", response_model=QueryResponse)
+@router.post(
+    "/",
+    response_model=QueryResponse,
+    dependencies=[Depends(require_models("clip", "qdrant"))]
+)
 async def query(request: QueryRequest):
     """
     Process a query against the knowledge base
@@ -53,8 +59,9 @@ async def query(request: QueryRequest):
         # Get chat history for context
         history = chat_history.get_history(request.session_id, limit=5)
         
-        # Generate response
-        result = synthesis_agent.synthesize(
+        # Generate response (CLIP, Qdrant and the LLM block: keep them off the event loop)
+        result = await asyncio.to_thread(
+            synthesis_agent.synthesize,
             query=request.query,
             session_id=request.session_id,
             chat_history=history,
@@ -6,12 +6,14 @@ from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel
 
 from app.storage.vector_store import VectorStore
+from app.storage.async_vector_store import AsyncVectorStore
 from app.storage.chat_store import ChatHistoryManager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 vector_store = VectorStore()
+async_vector_store = AsyncVectorStore()
 chat_history = ChatHistoryManager()
 
 
@@ -33,7 +35,10 @@ async def clear_session(session_id: str = Header(..., alias="X-Session-ID")):
         logger.info(f"Clearing session: {session_id}")
         
         # Clear documents from vector store
-        deleted_count = vector_store.delete_by_session(session_id)
+        result = await async_vector_store.delete_by_session(session_id)
+        if result.get("status") != "success":
+            raise RuntimeError(result.get("message", "Delete failed"))
+        deleted_count = result.get("deleted", 0)
         
         # Clear chat history
         history_cleared = await chat_history.clear_session(session_id)
@@ -60,15 +65,15 @@ async def get_session_info(session_id: str = Header(..., alias="X-Session-ID")):
     - **session_id**: Session to query (from header)
     """
     try:
-        # Get knowledge catalog to count documents
-        catalog = vector_store.get_knowledge_catalog()
+        # Session-scoped catalog lookup (in memory, no collection scan)
+        catalog = vector_store.get_knowledge_catalog(session_id)
         
         # Get chat history info
         history_info = await chat_history.get_session_info(session_id)
         
         return {
             "session_id": session_id,
-            "document_count": len(catalog.get("topics", [])),
+            "document_count": catalog.get("document_count", 0),
             "topics": catalog.get("topics", []),
             "status": "active",
             "chat_history": {
@@ -1,19 +1,24 @@
 """
 Vector management endpoints
 """
+import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from fastapi.responses import JSONResponse
 
 from app.storage.vector_store import VectorStore
+from app.storage.async_vector_store import AsyncVectorStore
+from app.storage.cleanup import VectorStoreCleaner
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
+async_vector_store = AsyncVectorStore()
+_cleanup_lock = asyncio.Lock()
 
 
 @router.delete("/reset")
@@ -43,35 +48,43 @@ async def reset_vector_store() -> Dict[str, Any]:
 
 
 @router.get("/stats")
-async def get_vector_store_stats() -> Dict[str, Any]:
+async def get_vector_store_stats(
+    session_id: Optional[str] = None,
+    exact: bool = True,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get statistics about the vector store including counts by modality.
     
+    Counts come from Qdrant's count API on indexed payload fields. The ETag
+    is derived from the shared catalog version and the counts, so every
+    worker sends the same ETag for the same data and pollers sending
+    If-None-Match get an empty 304 while nothing changed.
+    
+    Args:
+        session_id: Restrict counts to one session
+        exact: Exact counts, or faster estimates
+    
     Returns:
         Statistics showing total documents and breakdown by modality (text, image, audio)
     """
     try:
-        vector_store = VectorStore()
-        
-        # Get basic stats (total count, collection name, embedding dimension)
-        basic_stats = vector_store.get_stats()
-
-        # For Qdrant, we can't easily get all documents with metadata like ChromaDB
-        # So we'll use the basic stats for now
-        modality_counts = {
-            "text": 0,  # TODO: Implement modality counting for Qdrant
-            "image": 0,
-            "audio": 0
-        }
+        basic_stats = await async_vector_store.get_stats(session_id=session_id, exact=exact)
+        headers = {"ETag": basic_stats["etag"], "Cache-Control": "no-cache"}
+        if if_none_match == basic_stats["etag"]:
+            return Response(status_code=304, headers=headers)
         
         stats = {
-            "total_documents": basic_stats.get('total_documents', 0),
-            "modalities": modality_counts,
-            "collection": basic_stats.get('collection_name', 'unknown')
+            "total_documents": basic_stats["total_documents"],
+            "modalities": basic_stats["modalities"],
+            "collection": basic_stats["collection_name"],
+            "session_id": session_id,
+            "exact": exact,
+            "version": basic_stats["version"],
         }
         
-        logger.info(f"Vector store stats: {stats['total_documents']} total docs, {modality_counts}")
-        return stats
+        logger.info(f"Vector store stats: {stats['total_documents']} total docs, {stats['modalities']}")
+        return JSONResponse(content=stats, headers=headers)
 
     except Exception as e:
         logger.error(f"Failed to get vector store stats: {e}")
@@ -82,27 +95,55 @@ async def get_vector_store_stats() -> Dict[str, Any]:
 
 
 @router.post("/cleanup-orphans")
-async def cleanup_orphaned_documents() -> Dict[str, Any]:
+async def cleanup_orphaned_documents(
+    dry_run: bool = True,
+    max_pages: Optional[int] = None,
+    restart: bool = False,
+) -> Dict[str, Any]:
     """
     Clean up orphaned documents whose source files no longer exist on disk.
 
     This is useful when files were manually deleted but their vectors remain in the vector store.
+    Duplicate chunks from re-uploads are removed in the same pass. The scan is
+    rate-limited (settings.vector_cleanup_max_points_per_s) and resumable:
+    with max_pages, each call continues where the previous one stopped.
+    Nothing is deleted unless dry_run=false is passed explicitly.
+
+    Args:
+        dry_run: Report what would be deleted without deleting (default)
+        max_pages: Scan at most this many pages in this call
+        restart: Ignore saved progress and scan from the beginning
 
     Returns:
         Number of orphaned documents deleted and list of cleaned files
     """
-    try:
-        vector_store = VectorStore()
+    if _cleanup_lock.locked():
+        raise HTTPException(status_code=409, detail="A cleanup is already running")
 
-        # For Qdrant, we need to implement this differently
-        # TODO: Implement orphaned document cleanup for Qdrant
-        logger.warning("Orphaned document cleanup not yet implemented for Qdrant")
+    try:
+        def run_cleanup():
+            # Built in the worker thread: the progress database is bound to it
+            cleaner = VectorStoreCleaner(
+                dry_run=dry_run,
+                max_points_per_s=settings.vector_cleanup_max_points_per_s,
+            )
+            try:
+                return cleaner.run(resume=not restart, max_pages=max_pages)
+            finally:
+                cleaner.state.close()
+
+        async with _cleanup_lock:
+            report = await asyncio.to_thread(run_cleanup)
 
         return {
-            "status": "not_implemented",
-            "message": "Orphaned document cleanup is not yet implemented for Qdrant",
-            "deleted_count": 0,
-            "deleted_sources": []
+            "status": report["status"],
+            "message": report.get("message", f"Scanned {report['scanned']} points"),
+            "dry_run": dry_run,
+            "deleted_count": report["deleted"],
+            "orphaned_points": report["orphaned_points"],
+            "duplicates": report["duplicates"],
+            "scanned": report["scanned"],
+            "deleted_sources": report["orphan_sample"],
         }
     
     except Exception as e:
@@ -114,19 +155,19 @@ async def cleanup_orphaned_documents() -> Dict[str, Any]:
 
 
 @router.delete("/source/{source_file:path}")
-async def delete_documents_by_source(source_file: str) -> Dict[str, Any]:
+async def delete_documents_by_source(source_file: str, session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Delete all documents from a specific source file.
     
     Args:
-        source_file: Path to the source file (can be relative or absolute)
+        source_file: Source file exactly as stored in the payload at ingestion
+        session_id: Restrict the delete to one session
     
     Returns:
         Number of documents deleted
     """
     try:
-        vector_store = VectorStore()
-        deleted_count = vector_store.delete_by_source(source_file)
+        deleted_count = await async_vector_store.delete_by_source(source_file, session_id)
         
         logger.info(f"Deleted {deleted_count} documents from source: {source_file}")
         return {
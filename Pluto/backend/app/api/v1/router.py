@@ -1,9 +1,10 @@
 """
 API Router for version 1 endpoints
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.api.v1.endpoints import ingest, query, vector, session
+from app.core.model_registry import require_models
 
 # Create the main API router
 api_router = APIRouter()
@@ -12,7 +13,8 @@ api_router = APIRouter()
 api_router.include_router(
     ingest.router,
     prefix="/ingest",
-    tags=["ingestion"]
+    tags=["ingestion"],
+    dependencies=[Depends(require_models("clip", "qdrant"))]
 )
 
 api_router.include_router(
@@ -24,11 +26,13 @@ api_router.include_router(
 api_router.include_router(
     vector.router,
     prefix="/vector",
-    tags=["vector"]
+    tags=["vector"],
+    dependencies=[Depends(require_models("qdrant"))]
 )
 
 api_router.include_router(
     session.router,
     prefix="/session",
-    tags=["session"]
+    tags=["session"],
+    dependencies=[Depends(require_models("qdrant"))]
 )
\ No newline at end of file
@@ -88,6 +88,20 @@ class Settings(BaseSettings):
     image_embedding_model: str = "Qdrant/clip-ViT-B-32-vision"
     embedding_batch_size: int = 32
     embedding_max_length: int = 77  # CLIP token limit
+    embedding_precision: str = "fp32"  # fp32 | int8 (dynamically quantized CLIP ONNX)
+    embedding_disk_cache_enabled: bool = True  # Persistent mmap cache in cache_dir/embeddings
+    embedding_text_cache_mb: int = 64  # In-memory LRU budget for text embeddings
+    embedding_image_cache_mb: int = 16  # In-memory LRU budget for image embeddings
+    embedding_image_decode_workers: int = 4  # Threads decoding/resizing images before CLIP
+    
+    # Micro-batching of concurrent query embeddings
+    embedding_dispatch_enabled: bool = True
+    embedding_dispatch_window_ms: float = 3.0  # Max wait to coalesce requests under load (a lone request never waits)
+    embedding_dispatch_max_batch: int = 32  # Flush early when this many are queued
+    
+    # Process-pool workers for ingestion batches (0 = embed in-process)
+    embedding_process_workers: int = 0
+    embedding_worker_threads: int = 2  # ONNX intra-op threads per worker
 
     # ===========================================
     # WHISPER SETTINGS (Audio Transcription)
@@ -105,6 +119,41 @@ class Settings(BaseSettings):
     qdrant_port: int = 6333
     collection_name: str = "pluto_multimodal"
     qdrant_prefer_grpc: bool = False
+    qdrant_mode: str = "server"  # server | local (embedded, persisted) | memory (embedded, in-process)
+    qdrant_local_path: str = ""  # Embedded storage dir (defaults to vectorstore_dir/qdrant_local)
+    
+    # Bulk upsert pipelining
+    qdrant_upsert_batch_size: int = 256  # Points per upsert request
+    qdrant_upsert_max_in_flight: int = 4  # Concurrent wait=False batches
+    qdrant_upsert_retries: int = 3  # Retries per batch on transient errors
+    qdrant_upsert_backoff_s: float = 0.5  # Initial retry backoff (doubles each attempt)
+    
+    # Vector index (applied per named vector at collection creation)
+    qdrant_quantization: str = "none"  # none | scalar (int8) | binary
+    qdrant_quantization_always_ram: bool = True  # Keep quantized vectors in RAM
+    qdrant_quantization_oversampling: float = 2.0  # Candidates fetched per result before rescoring
+    qdrant_quantization_rescore: bool = True  # Rescore candidates with full-precision vectors
+    qdrant_vectors_on_disk: bool = False  # Full-precision vectors on disk (pairs with quantization)
+    qdrant_hnsw_m: int = 16  # HNSW graph degree
+    qdrant_hnsw_ef_construct: int = 100  # HNSW build-time candidate list
+    qdrant_hnsw_ef: int = 128  # HNSW search-time candidate list
+    qdrant_hnsw_payload_m: int = 16  # Extra per-session HNSW links (tenant-local graphs)
+    
+    # Session partitioning
+    qdrant_session_shards: int = 0  # Custom shard keys sessions are hashed into (0 = auto sharding)
+    qdrant_exact_search_max_points: int = 5000  # Sessions up to this size use exact search instead of HNSW
+    vector_cleanup_max_points_per_s: float = 2000  # Orphan/duplicate scan rate beside live traffic (0 = unlimited)
+    qdrant_stats_cache_ttl_s: float = 10.0  # Age bound of cached /stats counts (writes that bypass the catalog)
+    knowledge_catalog_refresh_s: float = 1.0  # How often reads check for other workers' catalog writes
+    
+    # In-process session vector cache (brute force over small hot sessions)
+    session_cache_enabled: bool = False  # Answer small-session queries from local float32 matrices
+    session_cache_max_bytes: int = 268435456  # LRU budget across cached sessions (256 MB)
+    session_cache_max_points: int = 5000  # Larger sessions are always queried on Qdrant
+    session_cache_ttl_s: float = 30.0  # Reload age bound (writes from other processes)
+    
+    # Payloads
+    qdrant_external_content: bool = False  # Opt-in: chunk bodies in host-local cache_dir/chunk_content.sqlite (single API host)
 
     # ===========================================
     # RETRIEVAL SETTINGS
@@ -114,11 +163,12 @@ class Settings(BaseSettings):
     default_top_k: int = 10
     max_top_k: int = 50
 
-    # BM25 Settings
+    # BM25 Settings (sparse vectors in Qdrant, written at ingestion)
     bm25_enabled: bool = True
     bm25_k1: float = 1.5
     bm25_b: float = 0.75
-    bm25_weight: float = 0.3
+    bm25_weight: float = 0.3  # BM25 weight in reciprocal-rank fusion
+    bm25_avg_doc_length: float = 30.0  # Average chunk length in terms (length normalization)
 
     # MMR Settings
     mmr_enabled: bool = True
@@ -130,8 +180,10 @@ class Settings(BaseSettings):
     multi_query_count: int = 3
 
     # Hybrid Search Weights
-    dense_weight: float = 0.5
-    sparse_weight: float = 0.3
+    hybrid_fusion: str = "rrf"  # rrf (weighted by dense_weight/bm25_weight) | weighted (BM25-boosted cosine)
+    hybrid_prefetch_multiplier: int = 3  # Candidates per dense/sparse branch = n_results * this
+    dense_weight: float = 0.5  # Per dense vector space in reciprocal-rank fusion
+    sparse_weight: float = 0.3  # Share of the gap to 1.0 a saturated BM25 match closes in weighted fusion
     rerank_weight: float = 0.2
 
     # Reranking
@@ -239,6 +291,10 @@ class Settings(BaseSettings):
     def qdrant_storage_dir(self) -> Path:
         return self.vectorstore_dir / "qdrant_storage"
 
+    @property
+    def qdrant_local_dir(self) -> Path:
+        return Path(self.qdrant_local_path) if self.qdrant_local_path else self.vectorstore_dir / "qdrant_local"
+
     @property
     def logs_dir(self) -> Path:
         return self.data_dir / "logs"
@@ -0,0 +1,232 @@
+"""
+Central model registry
+Owns each heavy model once, loads them concurrently and tracks readiness
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _ModelEntry:
+    def __init__(self, name: str, loader: Callable[[], Any], description: str):
+        self.name = name
+        self.loader = loader
+        self.description = description
+        self.future: Optional[Future] = None
+        self.started_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.failures = 0  # Consecutive failed loads
+        self.retry_at = 0.0  # time.monotonic() after which a failed load is retried
+
+    @property
+    def state(self) -> str:
+        if self.future is None:
+            return "registered"
+        if not self.future.done():
+            return "loading"
+        return "failed" if self.future.exception() is not None else "ready"
+
+
+class ModelRegistry:
+    """
+    Registry of heavy models (CLIP, Whisper, Ollama, Qdrant, ...)
+
+    Each model is loaded exactly once. start() loads all registered models
+    concurrently in background threads; get() blocks until the requested model
+    is ready, loading it in the caller's thread if nobody started it yet.
+
+    A failed load (e.g. Qdrant or Ollama not up yet at boot) is retried with
+    exponential backoff: get() retries inline and is_ready() in the background
+    once the backoff has elapsed, so the app recovers when the dependency does.
+    """
+
+    def __init__(self, max_workers: int = 4, retry_backoff_s: float = 5.0, max_retry_backoff_s: float = 300.0):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-loader")
+        self.retry_backoff_s = retry_backoff_s
+        self.max_retry_backoff_s = max_retry_backoff_s
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, loader: Callable[[], Any], description: str = "") -> None:
+        """Register a loader; re-registering a loaded model is a no-op"""
+        with self._lock:
+            if name in self._entries and self._entries[name].future is not None:
+                return
+            self._entries[name] = _ModelEntry(name, loader, description or name)
+
+    def _load(self, entry: _ModelEntry) -> Any:
+        entry.started_at = time.perf_counter()
+        try:
+            model = entry.loader()
+            entry.failures = 0
+            logger.info(f"[OK] Model '{entry.name}' loaded in {time.perf_counter() - entry.started_at:.2f}s")
+            return model
+        except Exception as e:
+            entry.error = str(e)
+            entry.failures += 1
+            backoff = min(self.max_retry_backoff_s, self.retry_backoff_s * 2 ** (entry.failures - 1))
+            entry.retry_at = time.monotonic() + backoff
+            logger.error(f"[FAIL] Model '{entry.name}' failed to load: {e} (retry in {backoff:.0f}s)")
+            raise
+        finally:
+            entry.load_seconds = time.perf_counter() - entry.started_at
+
+    def _ensure_started(self, name: str, background: bool) -> _ModelEntry:
+        """
+        Start loading a model once (again after a failure whose backoff has
+        elapsed); inline loads run in the calling thread
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                raise KeyError(f"Model '{name}' is not registered")
+            if entry.future is not None and not (
+                entry.state == "failed" and time.monotonic() >= entry.retry_at
+            ):
+                return entry
+            entry.error = None
+            if background:
+                entry.future = self._executor.submit(self._load, entry)
+                return entry
+            entry.future = Future()
+            entry.future.set_running_or_notify_cancel()
+
+        # Load outside the registry lock so other models are not blocked
+        try:
+            entry.future.set_result(self._load(entry))
+        except Exception as e:
+            entry.future.set_exception(e)
+        return entry
+
+    def start(self, names: Iterable[str] = None) -> None:
+        """Begin loading models concurrently in background threads (non-blocking)"""
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        for name in list(names or self._entries.keys()):
+            self._ensure_started(name, background=True)
+
+    def get(self, name: str, timeout: float = None) -> Any:
+        """Return a loaded model, waiting for (or performing) its load"""
+        entry = self._ensure_started(name, background=False)
+        return entry.future.result(timeout=timeout)
+
+    def is_ready(self, name: str) -> bool:
+        """Whether a model is loaded; a failed model due for retry starts reloading in the background"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if entry.state == "failed" and time.monotonic() >= entry.retry_at:
+            self._ensure_started(name, background=True)
+        return entry.state == "ready"
+
+    def not_ready(self, names: Iterable[str]) -> List[str]:
+        return [name for name in names if not self.is_ready(name)]
+
+    def wait(self, names: Iterable[str] = None, timeout: float = None) -> bool:
+        """Wait until models finished loading (successfully or not)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in list(names or self._entries.keys()):
+            entry = self._entries.get(name)
+            if entry is None or entry.future is None:
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                entry.future.exception(timeout=remaining)
+            except Exception:
+                return False
+        return True
+
+    @property
+    def cold_start_seconds(self) -> Optional[float]:
+        """Seconds from start() until the last started model finished"""
+        if self.started_at is None:
+            return None
+        finished = [
+            e.started_at + e.load_seconds for e in self._entries.values()
+            if e.load_seconds is not None and e.started_at is not None
+        ]
+        return max(finished) - self.started_at if finished else None
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "description": entry.description,
+                "state": entry.state,
+                "load_seconds": entry.load_seconds,
+                "error": entry.error,
+                "failures": entry.failures,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+def require_models(*names: str, registry: "ModelRegistry" = None):
+    """FastAPI dependency: 503 until the models a route needs are ready (default: the global registry)"""
+    from fastapi import HTTPException
+
+    def dependency():
+        pending = (registry or model_registry).not_ready(names)
+        if pending:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Models still loading: {', '.join(pending)}",
+                headers={"Retry-After": "5"},
+            )
+
+    return dependency
+
+
+def _load_clip():
+    from app.embeddings.models.multimodal_embedder import MultimodalEmbedder
+    embedder = MultimodalEmbedder()
+    embedder.encode_text("warmup")  # First inference allocates ONNX buffers
+    return embedder
+
+
+def _load_whisper():
+    from faster_whisper import WhisperModel
+    # CPU with int8 for VRAM efficiency
+    return WhisperModel("base", device="cpu", compute_type="int8")
+
+
+def _load_ollama():
+    from app.reasoning.llm.ollama_reasoner import OllamaReasoner
+    return OllamaReasoner()
+
+
+def _load_vision_models():
+    """Names of the vision models available in Ollama"""
+    import requests
+    from app.config import settings
+
+    response = requests.get(f"{settings.ollama_host}/api/tags", timeout=5)
+    response.raise_for_status()
+    models = [m['name'] for m in response.json().get('models', [])]
+    return [m for m in models if any(v in m for v in ['llava', 'bakllava', 'vision'])]
+
+
+def _load_qdrant():
+    from app.storage.vector_store import VectorStore
+    store = VectorStore()
+    store.get_collection_info()
+    return store
+
+
+def register_default_models(registry: "ModelRegistry") -> None:
+    """Register the application's heavy dependencies"""
+    registry.register("clip", _load_clip, "CLIP ViT-B/32 (text + vision)")
+    registry.register("whisper", _load_whisper, "Faster-Whisper base")
+    registry.register("ollama", _load_ollama, "Ollama LLM")
+    registry.register("vision", _load_vision_models, "Ollama vision models")
+    registry.register("qdrant", _load_qdrant, "Qdrant vector store")
+
+
+# Global registry instance
+model_registry = ModelRegistry()
+register_default_models(model_registry)
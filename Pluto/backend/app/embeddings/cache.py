@@ -0,0 +1,144 @@
+"""
+In-memory LRU embedding cache with a byte budget and Prometheus metrics
+"""
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from app.api.middleware.metrics import (
+        EMBEDDING_CACHE_HITS,
+        EMBEDDING_CACHE_MISSES,
+        EMBEDDING_CACHE_EVICTIONS,
+        EMBEDDING_CACHE_BYTES,
+        EMBEDDING_CACHE_ENTRIES,
+    )
+except ImportError:  # prometheus_client not installed
+    EMBEDDING_CACHE_HITS = EMBEDDING_CACHE_MISSES = EMBEDDING_CACHE_EVICTIONS = None
+    EMBEDDING_CACHE_BYTES = EMBEDDING_CACHE_ENTRIES = None
+
+# Approximate per-entry overhead of the OrderedDict node and hex-digest key
+_ENTRY_OVERHEAD = 200
+
+
+def _value_size(value: Any) -> int:
+    """Approximate memory footprint of a cached embedding in bytes"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, list):
+        return sys.getsizeof(value) + len(value) * sys.getsizeof(0.0)
+    return sys.getsizeof(value)
+
+
+class EmbeddingLRUCache:
+    """
+    Thread-safe LRU cache bounded by total bytes
+
+    Reads are lock-free: the lookup relies on the atomicity of OrderedDict
+    operations under the GIL, and the recency bump is skipped when a writer
+    holds the lock instead of waiting for it. Writes and evictions are
+    serialized by a lock.
+
+    Each instance is one namespace (e.g. "text", "image") and exports its
+    hit/miss/eviction counters under that label.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None, marking it most recently used"""
+        entry = self._data.get(key)
+
+        if entry is None:
+            self.misses += 1
+            if EMBEDDING_CACHE_MISSES is not None:
+                EMBEDDING_CACHE_MISSES.labels(namespace=self.namespace).inc()
+            return None
+
+        self.hits += 1
+        if EMBEDDING_CACHE_HITS is not None:
+            EMBEDDING_CACHE_HITS.labels(namespace=self.namespace).inc()
+
+        # Best-effort recency update; never block a reader on a writer
+        if self._lock.acquire(blocking=False):
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                pass  # Evicted concurrently
+            finally:
+                self._lock.release()
+
+        return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        """Insert a value, evicting least recently used entries over budget"""
+        size = _value_size(value) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        evicted = 0
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._data[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                evicted += 1
+
+            self.evictions += evicted
+            current_bytes = self._bytes
+            current_entries = len(self._data)
+
+        if EMBEDDING_CACHE_BYTES is not None:
+            if evicted:
+                EMBEDDING_CACHE_EVICTIONS.labels(namespace=self.namespace).inc(evicted)
+            EMBEDDING_CACHE_BYTES.labels(namespace=self.namespace).set(current_bytes)
+            EMBEDDING_CACHE_ENTRIES.labels(namespace=self.namespace).set(current_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self._data),
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
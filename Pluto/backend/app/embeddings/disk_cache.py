@@ -0,0 +1,198 @@
+"""
+Persistent on-disk embedding cache backed by memory-mapped float32 vectors
+
+Layout (one directory per namespace/model/precision under settings.cache_dir / "embeddings"):
+- vectors.f32: contiguous float32 rows of `dimension` values
+- index.bin:   16-byte content hashes, row i of the index -> row i of vectors.f32
+- .lock:       advisory lock file for cross-process appends
+
+The files are append-only. Writers take an exclusive lock, append vectors
+first and the index second, so a reader never sees an index entry whose
+vector is not yet on disk. Every uvicorn worker maps the same files and picks
+up rows appended by other workers on the next lookup miss.
+"""
+import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking falls back to in-process only
+    fcntl = None
+
+from app.config import settings
+from app.embeddings.quantization import precision_variant
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 16  # md5 digest
+
+
+def content_hash(data: bytes) -> str:
+    """Content hash used as the cache key (hex md5)"""
+    return hashlib.md5(data).hexdigest()
+
+
+class DiskEmbeddingCache:
+    """
+    Content-hash keyed embedding cache persisted in a memory-mapped file
+
+    Lookups are O(1) against an in-memory dict of hash -> row, loaded when the
+    cache is opened (warm on boot) and refreshed incrementally from the index
+    file when other processes append to it.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        model_name: str,
+        dimension: int = None,
+        cache_dir: Path = None,
+        precision: str = None
+    ):
+        self.dimension = dimension or settings.embedding_dimension
+        self.row_bytes = self.dimension * 4
+
+        # fp32 and int8 models embed differently: each variant gets its own files
+        model_slug = f"{model_name.replace('/', '__')}@{precision_variant(precision)}"
+        root = Path(cache_dir or settings.cache_dir / "embeddings")
+        self.directory = root / namespace / model_slug
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.vectors_path = self.directory / "vectors.f32"
+        self.index_path = self.directory / "index.bin"
+        self.lock_path = self.directory / ".lock"
+        for path in (self.vectors_path, self.index_path, self.lock_path):
+            path.touch(exist_ok=True)
+
+        self._rows: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._vectors: Optional[np.memmap] = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._refresh()
+        logger.info(f"Disk embedding cache ready: {self.directory} ({len(self._rows)} vectors)")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive cross-process lock around appends"""
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Load index entries appended since the last refresh and remap vectors"""
+        index_size = self.index_path.stat().st_size
+        # Ignore a partially written trailing record
+        index_size -= index_size % HASH_SIZE
+
+        if index_size > self._index_offset:
+            with open(self.index_path, 'rb') as f:
+                f.seek(self._index_offset)
+                data = f.read(index_size - self._index_offset)
+
+            row = self._index_offset // HASH_SIZE
+            for start in range(0, len(data), HASH_SIZE):
+                self._rows.setdefault(data[start:start + HASH_SIZE], row)
+                row += 1
+            self._index_offset = index_size
+
+        total_rows = self._index_offset // HASH_SIZE
+        if total_rows and total_rows != self._mapped_rows:
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode='r',
+                shape=(total_rows, self.dimension)
+            )
+            self._mapped_rows = total_rows
+
+    def _lookup(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._vectors[row])
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get a cached vector by hex content hash"""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Get cached vectors for hex content hashes (None for misses)"""
+        raw_keys = [bytes.fromhex(k) for k in keys]
+
+        with self._lock:
+            results = [self._lookup(k) for k in raw_keys]
+            if any(r is None for r in results):
+                # Another worker may have appended since our last look
+                self._refresh()
+                results = [
+                    r if r is not None else self._lookup(k)
+                    for r, k in zip(results, raw_keys)
+                ]
+        return results
+
+    def put(self, key: str, vector) -> None:
+        """Store a vector under a hex content hash"""
+        self.put_many([key], [vector])
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence) -> None:
+        """Append vectors for hex content hashes that are not yet cached"""
+        if not keys:
+            return
+
+        try:
+            with self._lock, self._file_lock():
+                self._refresh()
+
+                new_keys = []
+                new_vectors = []
+                seen = set()
+                for key, vector in zip(keys, vectors):
+                    raw = bytes.fromhex(key)
+                    if raw in self._rows or raw in seen:
+                        continue
+                    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+                    if array.shape[0] != self.dimension:
+                        continue
+                    seen.add(raw)
+                    new_keys.append(raw)
+                    new_vectors.append(array)
+
+                if not new_keys:
+                    return
+
+                # Truncate any torn tail left by a crashed writer, then append
+                # vectors before the index so readers never see dangling rows
+                row = self._index_offset // HASH_SIZE
+                with open(self.vectors_path, 'r+b') as f:
+                    f.truncate(row * self.row_bytes)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.stack(new_vectors).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                with open(self.index_path, 'r+b') as f:
+                    f.truncate(self._index_offset)
+                    f.seek(0, os.SEEK_END)
+                    f.write(b''.join(new_keys))
+                    f.flush()
+
+                self._refresh()
+        except Exception as e:
+            # The cache is an optimization; never fail embedding because of it
+            logger.warning(f"Disk embedding cache write failed: {e}")
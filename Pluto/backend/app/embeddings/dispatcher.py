@@ -0,0 +1,133 @@
+"""
+Dynamic micro-batching dispatcher for concurrent embedding requests
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDispatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batches
+
+    Callers submit a text and receive a Future. A background thread takes the
+    first pending request together with everything already queued behind it,
+    runs one batched inference, and resolves every caller's future with its
+    row of the result. A request that finds the queue otherwise idle runs at
+    once; only when others are already waiting does the thread keep
+    collecting until `window_ms` has elapsed or `max_batch` requests are
+    queued. Requests that arrive during an inference form the next batch.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Sequence[np.ndarray]],
+        max_batch: int = 32,
+        window_ms: float = 3.0,
+        name: str = "embedding-dispatcher",
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window_ms) / 1000.0
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding; the future resolves to a float32 vector"""
+        if self._stopped.is_set():
+            raise RuntimeError("EmbeddingDispatcher is stopped")
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str, timeout: float = None) -> np.ndarray:
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(text).result(timeout=timeout)
+
+    def stop(self, timeout: float = 1.0):
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first request, then gather more (within the window under load)"""
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                # A lone request does not wait out the window
+                remaining = deadline - time.monotonic()
+                if len(batch) == 1 or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                self._stopped.set()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+
+        # Fail anything still queued after stop()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("EmbeddingDispatcher is stopped"))
+
+    def _process(self, batch: List[tuple]):
+        # Identical texts in one window are embedded once
+        positions: Dict[str, List[Future]] = {}
+        for text, future in batch:
+            if future.set_running_or_notify_cancel():
+                positions.setdefault(text, []).append(future)
+        if not positions:
+            return
+
+        texts = list(positions.keys())
+        try:
+            vectors = list(self.embed_fn(texts))
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"Embedding returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            logger.error(f"Batched embedding failed for {len(texts)} texts: {e}")
+            for futures in positions.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            for future in positions[text]:
+                future.set_result(vector)
+
+        self.batches += 1
+        self.requests += len(batch)
+        logger.debug(f"Dispatched batch of {len(texts)} texts ({len(batch)} requests)")
@@ -3,21 +3,41 @@ Embeddings Manager - Unified interface for CLIP embeddings with caching
 """
 import logging
 import io
-import hashlib
-from typing import List, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
+import numpy as np
 from PIL import Image
 
 from app.embeddings.models.multimodal_embedder import MultimodalEmbedder
+from app.embeddings.cache import EmbeddingLRUCache
+from app.embeddings.process_pool import EmbeddingProcessPool
+from app.embeddings.dispatcher import EmbeddingDispatcher
+from app.embeddings.disk_cache import DiskEmbeddingCache, content_hash
+from app.core.model_registry import model_registry
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+CLIP_IMAGE_SIZE = 224  # ViT-B/32 input resolution
+
+
+def _as_vector(embedding) -> np.ndarray:
+    """Contiguous, read-only float32 vector (safe to share from caches)"""
+    vector = np.ascontiguousarray(embedding, dtype=np.float32).reshape(-1)
+    vector.setflags(write=False)
+    return vector
+
 
 class EmbeddingsManager:
     """
     Centralized manager for generating CLIP embeddings
-    Supports: text, images (path, PIL, bytes)
+    Supports: text, images (path, PIL, numpy, bytes)
+    
+    Embeddings are returned as contiguous float32 numpy arrays (2-D matrices
+    for text batches); conversion to Python lists happens only at the Qdrant
+    wire boundary in VectorStore.
     """
     
     _instance = None
@@ -32,13 +52,80 @@ class EmbeddingsManager:
         if self._initialized:
             return
         
-        self.embedder = MultimodalEmbedder()
-        self._text_cache = {}
-        self._cache_max_size = 1000
+        # CLIP is owned by the model registry and resolved on first use
+        self._embedder = None
+        self._text_cache = EmbeddingLRUCache("text", settings.embedding_text_cache_mb * 1024 * 1024)
+        self._image_cache = EmbeddingLRUCache("image", settings.embedding_image_cache_mb * 1024 * 1024)
+        # Persistent caches shared by all workers, opened on first use
+        # (see _disk_cache)
+        self._disk_caches: Dict[str, Optional[DiskEmbeddingCache]] = {}
+        self._disk_cache_lock = threading.Lock()
+        
+        # Optional worker processes for bulk (ingestion) batches
+        self._process_pool = None
+        if settings.embedding_process_workers > 0:
+            self._process_pool = EmbeddingProcessPool(
+                workers=settings.embedding_process_workers,
+                threads_per_worker=settings.embedding_worker_threads,
+            )
+        
+        # Coalesce concurrent embed_text misses into batched inference
+        self._dispatcher = None
+        if settings.embedding_dispatch_enabled:
+            self._dispatcher = EmbeddingDispatcher(
+                self._embed_text_batch,
+                max_batch=settings.embedding_dispatch_max_batch,
+                window_ms=settings.embedding_dispatch_window_ms,
+            )
+        
         self._initialized = True
         logger.info("EmbeddingsManager initialized with caching")
     
-    def embed_text(self, text: str, use_cache: bool = True) -> List[float]:
+    @property
+    def embedder(self) -> MultimodalEmbedder:
+        """Shared CLIP embedder (loaded once by the model registry)"""
+        if self._embedder is None:
+            self._embedder = model_registry.get("clip")
+        return self._embedder
+    
+    @embedder.setter
+    def embedder(self, embedder: MultimodalEmbedder):
+        self._embedder = embedder
+    
+    def _disk_cache(self, namespace: str) -> Optional[DiskEmbeddingCache]:
+        """
+        Persistent cache of a namespace ('text' or 'image'), None when disabled
+        
+        Keyed by the precision the embedder actually loaded: an int8 request
+        served by fp32 (older fastembed) must not fill the int8 cache.
+        """
+        if namespace in self._disk_caches:
+            return self._disk_caches[namespace]
+        with self._disk_cache_lock:
+            if namespace not in self._disk_caches:
+                cache = None
+                if settings.embedding_disk_cache_enabled:
+                    model_name = settings.embedding_model if namespace == "text" else settings.image_embedding_model
+                    precision = getattr(self.embedder, f"{namespace}_precision", settings.embedding_precision)
+                    try:
+                        cache = DiskEmbeddingCache(namespace, model_name, precision=precision)
+                    except Exception as e:
+                        logger.warning(f"Disk embedding cache unavailable: {e}")
+                self._disk_caches[namespace] = cache
+        return self._disk_caches[namespace]
+    
+    def _embed_text_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Uncached batched text inference (used by the dispatcher)"""
+        return list(self.embedder.text_model.embed(texts, batch_size=len(texts)))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction statistics for the in-memory caches"""
+        return {
+            "text": self._text_cache.stats(),
+            "image": self._image_cache.stats(),
+        }
+    
+    def embed_text(self, text: str, use_cache: bool = True) -> np.ndarray:
         """
         Generate CLIP embedding for text
         
@@ -47,24 +134,36 @@ class EmbeddingsManager:
             use_cache: Whether to use cache
             
         Returns:
-            512-dimensional embedding vector
+            512-dimensional float32 embedding vector
         """
         try:
-            # Check cache
+            # Check memory cache, then disk cache
             if use_cache:
-                text_hash = hashlib.md5(text.encode()).hexdigest()
-                if text_hash in self._text_cache:
-                    return self._text_cache[text_hash]
+                text_hash = content_hash(text.encode())
+                cached = self._text_cache.get(text_hash)
+                if cached is not None:
+                    return cached
+                
+                disk_cache = self._disk_cache("text")
+                if disk_cache is not None:
+                    cached = disk_cache.get(text_hash)
+                    if cached is not None:
+                        embedding = _as_vector(cached)
+                        self._text_cache.put(text_hash, embedding)
+                        return embedding
             
-            # Generate embedding
-            embedding = self.embedder.embed(text)
+            # Generate embedding (batched with concurrent callers when dispatching)
+            if self._dispatcher is not None:
+                embedding = _as_vector(self._dispatcher.embed(text))
+            else:
+                embedding = _as_vector(self.embedder.embed(text))
             
             # Store in cache
             if use_cache:
-                if len(self._text_cache) >= self._cache_max_size:
-                    first_key = next(iter(self._text_cache))
-                    del self._text_cache[first_key]
-                self._text_cache[text_hash] = embedding
+                self._text_cache.put(text_hash, embedding)
+                disk_cache = self._disk_cache("text")
+                if disk_cache is not None:
+                    disk_cache.put(text_hash, embedding)
             
             return embedding
             
@@ -72,31 +171,27 @@ class EmbeddingsManager:
             logger.error(f"Failed to embed text: {e}")
             raise
     
-    def embed_image(self, image: Union[str, Path, Image.Image]) -> List[float]:
+    def embed_image(self, image: Union[str, Path, Image.Image, np.ndarray]) -> np.ndarray:
         """
         Generate CLIP embedding for image
         
         Args:
-            image: PIL Image or path to image file
+            image: PIL Image, HxWxC uint8 numpy array or path to image file
             
         Returns:
-            512-dimensional embedding vector
+            512-dimensional float32 embedding vector
         """
         try:
             if isinstance(image, (str, Path)):
                 image = Image.open(image)
             
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            embedding = self.embedder.embed(image)
-            return embedding
+            return _as_vector(self.embedder.embed(image))
             
         except Exception as e:
             logger.error(f"Failed to embed image: {e}")
             raise
     
-    def embed_image_bytes(self, image_bytes: bytes) -> List[float]:
+    def embed_image_bytes(self, image_bytes: bytes) -> np.ndarray:
         """
         Generate CLIP embedding from image bytes
         
@@ -104,27 +199,230 @@ class EmbeddingsManager:
             image_bytes: Raw image bytes (PNG, JPEG, etc.)
             
         Returns:
-            512-dimensional embedding vector
+            512-dimensional float32 embedding vector
         """
         try:
+            image_hash = content_hash(image_bytes)
+            cached = self._image_cache.get(image_hash)
+            if cached is not None:
+                return cached
+            
+            disk_cache = self._disk_cache("image")
+            if disk_cache is not None:
+                cached = disk_cache.get(image_hash)
+                if cached is not None:
+                    embedding = _as_vector(cached)
+                    self._image_cache.put(image_hash, embedding)
+                    return embedding
+            
+            # Decode once in memory; the embedder feeds PIL straight to CLIP
             image = Image.open(io.BytesIO(image_bytes))
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            embedding = _as_vector(self.embedder.embed(image))
             
-            embedding = self.embedder.embed(image)
+            self._image_cache.put(image_hash, embedding)
+            if disk_cache is not None:
+                disk_cache.put(image_hash, embedding)
             return embedding
             
         except Exception as e:
             logger.error(f"Failed to embed image bytes: {e}")
             raise
     
-    def embed_batch_text(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
-        """Batch text embedding for efficiency"""
-        embeddings = []
+    @staticmethod
+    def _decode_image(image_bytes: bytes) -> Image.Image:
+        """Decode and pre-resize an image to CLIP's input scale (runs in worker threads)"""
+        image = Image.open(io.BytesIO(image_bytes))
+        image.draft('RGB', (CLIP_IMAGE_SIZE * 2, CLIP_IMAGE_SIZE * 2))  # JPEG DCT downscale
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # Shortest side -> CLIP input size; fastembed's own resize/crop then
+        # works on a small image instead of the full-resolution original
+        width, height = image.size
+        scale = CLIP_IMAGE_SIZE / min(width, height)
+        if scale < 1.0:
+            image = image.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                Image.BICUBIC
+            )
+        return image
+    
+    def embed_images_batch(
+        self,
+        images: List[bytes],
+        batch_size: int = None,
+        use_cache: bool = True
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Batch CLIP embedding for encoded images (PNG, JPEG, etc.)
+        
+        Cached images are served from the cache; the rest are decoded and
+        resized in parallel worker threads and embedded together through the
+        vision model.
+        
+        Args:
+            images: Raw image bytes
+            batch_size: ONNX batch size (defaults to settings.embedding_batch_size)
+            use_cache: Whether to use cache
+            
+        Returns:
+            List of 512-dimensional float32 vectors aligned with images
+            (None for images that could not be decoded)
+        """
+        if not images:
+            return []
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            for text in batch:
-                embeddings.append(self.embed_text(text))
+        batch_size = batch_size or settings.embedding_batch_size
+        embeddings: List[Optional[np.ndarray]] = [None] * len(images)
         
+        miss_positions: Dict[str, List[int]] = {}
+        for idx, image_bytes in enumerate(images):
+            image_hash = content_hash(image_bytes)
+            cached = self._image_cache.get(image_hash) if use_cache else None
+            if cached is not None:
+                embeddings[idx] = cached
+            else:
+                miss_positions.setdefault(image_hash, []).append(idx)
+        
+        disk_cache = self._disk_cache("image") if use_cache else None
+        if miss_positions and disk_cache is not None:
+            hashes = list(miss_positions.keys())
+            for image_hash, cached in zip(hashes, disk_cache.get_many(hashes)):
+                if cached is None:
+                    continue
+                embedding = _as_vector(cached)
+                for idx in miss_positions.pop(image_hash):
+                    embeddings[idx] = embedding
+                self._image_cache.put(image_hash, embedding)
+        
+        if not miss_positions:
+            return embeddings
+        
+        miss_hashes = list(miss_positions.keys())
+        miss_images = [images[miss_positions[h][0]] for h in miss_hashes]
+        
+        try:
+            if self._process_pool is not None:
+                # Worker processes decode and embed; bytes travel via shared memory
+                vectors = self._process_pool.embed_images(miss_images)
+                encoded = [(h, v) for h, v in zip(miss_hashes, vectors) if v is not None]
+            else:
+                encoded = self._embed_images_local(miss_hashes, miss_images, batch_size)
+            
+            new_hashes = []
+            new_embeddings = []
+            for image_hash, vector in encoded:
+                embedding = _as_vector(vector)
+                new_hashes.append(image_hash)
+                new_embeddings.append(embedding)
+                for idx in miss_positions[image_hash]:
+                    embeddings[idx] = embedding
+                if use_cache:
+                    self._image_cache.put(image_hash, embedding)
+            
+            if disk_cache is not None:
+                disk_cache.put_many(new_hashes, new_embeddings)
+        except Exception as e:
+            logger.error(f"Failed to embed image batch: {e}")
+            raise
+        
+        logger.debug(f"Batch embedded {len(miss_images)} images")
         return embeddings
+    
+    def _embed_images_local(
+        self,
+        image_hashes: List[str],
+        images: List[bytes],
+        batch_size: int
+    ) -> List[tuple]:
+        """Decode/resize in worker threads, then embed in this process"""
+        # PIL releases the GIL while decoding
+        with ThreadPoolExecutor(max_workers=settings.embedding_image_decode_workers) as pool:
+            futures = [pool.submit(self._decode_image, image_bytes) for image_bytes in images]
+        
+        decoded_hashes = []
+        decoded_images = []
+        for image_hash, future in zip(image_hashes, futures):
+            try:
+                decoded_images.append(future.result())
+                decoded_hashes.append(image_hash)
+            except Exception as e:
+                logger.warning(f"Failed to decode image {image_hash[:8]}: {e}")
+        
+        vectors = self.embedder.encode_images(decoded_images, batch_size=batch_size)
+        return list(zip(decoded_hashes, vectors))
+    
+    def embed_batch_text(self, texts: List[str], batch_size: int = None, use_cache: bool = True) -> np.ndarray:
+        """
+        Batch text embedding for efficiency
+        
+        Cached texts are served from the cache; all misses are embedded
+        together through the fastembed text model and merged back in order.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: ONNX batch size (defaults to settings.embedding_batch_size)
+            use_cache: Whether to use cache
+            
+        Returns:
+            float32 matrix of shape (len(texts), 512), rows aligned with texts
+        """
+        if not texts:
+            return np.empty((0, settings.embedding_dimension), dtype=np.float32)
+        
+        batch_size = batch_size or settings.embedding_batch_size
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        # Split cached and uncached texts (identical misses are embedded once)
+        miss_positions: Dict[str, List[int]] = {}
+        for idx, text in enumerate(texts):
+            text_hash = content_hash(text.encode())
+            cached = self._text_cache.get(text_hash) if use_cache else None
+            if cached is not None:
+                embeddings[idx] = cached
+            else:
+                miss_positions.setdefault(text_hash, []).append(idx)
+        
+        # Second tier: persistent disk cache
+        disk_cache = self._disk_cache("text") if use_cache else None
+        if miss_positions and disk_cache is not None:
+            hashes = list(miss_positions.keys())
+            for text_hash, cached in zip(hashes, disk_cache.get_many(hashes)):
+                if cached is None:
+                    continue
+                embedding = _as_vector(cached)
+                for idx in miss_positions.pop(text_hash):
+                    embeddings[idx] = embedding
+                self._text_cache.put(text_hash, embedding)
+        
+        if miss_positions:
+            miss_hashes = list(miss_positions.keys())
+            miss_texts = [texts[miss_positions[h][0]] for h in miss_hashes]
+            
+            try:
+                new_embeddings = []
+                if self._process_pool is not None:
+                    vectors = self._process_pool.embed_texts(miss_texts)
+                else:
+                    vectors = self.embedder.text_model.embed(miss_texts, batch_size=batch_size)
+                for text_hash, vector in zip(miss_hashes, vectors):
+                    embedding = _as_vector(vector)
+                    new_embeddings.append(embedding)
+                    for idx in miss_positions[text_hash]:
+                        embeddings[idx] = embedding
+                    
+                    if use_cache:
+                        self._text_cache.put(text_hash, embedding)
+                
+                if disk_cache is not None:
+                    disk_cache.put_many(miss_hashes, new_embeddings)
+            except Exception as e:
+                logger.error(f"Failed to embed text batch: {e}")
+                raise
+            
+            logger.debug(
+                f"Batch embedded {len(miss_texts)} texts "
+                f"({len(texts) - sum(len(p) for p in miss_positions.values())} cache hits)"
+            )
+        
+        return np.stack(embeddings)
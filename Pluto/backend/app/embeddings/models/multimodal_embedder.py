@@ -0,0 +1,128 @@
+from fastembed import ImageEmbedding, TextEmbedding
+import numpy as np
+from typing import List, Sequence, Tuple, Union
+from PIL import Image
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ONNX-backed CLIP models (running on CPU to save VRAM for Llama)
+CPU_PROVIDER = ["CPUExecutionProvider"]
+
+
+def _load_model(model_cls, model_name: str, precision: str = None, threads: int = None) -> Tuple[object, str]:
+    """
+    Load a fastembed model at the configured precision (fp32 or int8)
+
+    Returns:
+        (model, precision it was loaded at): int8 falls back to fp32 on a
+        fastembed release that cannot load the quantized copy
+    """
+    precision = precision or settings.embedding_precision
+    if precision == "int8":
+        from app.embeddings.quantization import MIN_FASTEMBED, quantized_model_dir
+        try:
+            # Lazy fp32 instance only resolves/downloads the model directory
+            fp32 = model_cls(model_name=model_name, providers=CPU_PROVIDER, lazy_load=True)
+        except TypeError as e:
+            logger.warning(
+                f"embedding_precision=int8 needs fastembed>={MIN_FASTEMBED} ({e}); "
+                f"loading {model_name} in fp32"
+            )
+            fp32 = None
+        model_dir = quantized_model_dir(fp32) if fp32 is not None else None
+        if model_dir is not None:
+            model = model_cls(
+                model_name=model_name,
+                providers=CPU_PROVIDER,
+                threads=threads,
+                specific_model_path=str(model_dir),
+            )
+            return model, "int8"
+        precision = "fp32"
+    if precision != "fp32":
+        raise ValueError(f"Unsupported embedding precision: {precision}")
+    return model_cls(model_name=model_name, providers=CPU_PROVIDER, threads=threads), "fp32"
+
+
+def load_text_model(precision: str = None, threads: int = None) -> TextEmbedding:
+    return _load_model(TextEmbedding, settings.embedding_model, precision, threads)[0]
+
+
+def load_image_model(precision: str = None, threads: int = None) -> ImageEmbedding:
+    return _load_model(ImageEmbedding, settings.image_embedding_model, precision, threads)[0]
+
+
+class MultimodalEmbedder:
+    def __init__(self, precision: str = None):
+        # Precisions actually loaded; the disk caches are keyed by them
+        requested = precision or settings.embedding_precision
+        self.text_model, self.text_precision = _load_model(TextEmbedding, settings.embedding_model, requested)
+        self.image_model, self.image_precision = _load_model(
+            ImageEmbedding, settings.image_embedding_model, requested
+        )
+        self.precision = self.text_precision if self.text_precision == self.image_precision else "mixed"
+        logger.info(f"[fastembed] CLIP text/vision loaded ({self.text_precision}/{self.image_precision})")
+
+    def encode_text(self, text: Union[str, List[str]]) -> Union[np.ndarray, List[np.ndarray]]:
+        texts = [text] if isinstance(text, str) else text
+        embeddings = list(self.text_model.embed(texts))
+        return embeddings[0] if isinstance(text, str) else embeddings
+
+    def encode_image(self, image_path: Union[str, List[str]]) -> Union[np.ndarray, List[np.ndarray]]:
+        paths = [image_path] if isinstance(image_path, str) else image_path
+        embeddings = list(self.image_model.embed(paths))
+        return embeddings[0] if isinstance(image_path, str) else embeddings
+
+    @staticmethod
+    def _to_pil(image: Union[Image.Image, np.ndarray]) -> Image.Image:
+        """Normalize an in-memory image (PIL or HxW[xC] uint8 array) to RGB PIL"""
+        if isinstance(image, np.ndarray):
+            if image.dtype != np.uint8:
+                image = np.clip(image, 0, 255).astype(np.uint8)
+            image = Image.fromarray(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return image
+
+    def encode_images(
+        self,
+        images: Sequence[Union[Image.Image, np.ndarray]],
+        batch_size: int = 16
+    ) -> List[np.ndarray]:
+        """
+        Embed in-memory images in batches.
+        
+        Images are handed to fastembed's CLIP preprocessing (resize, crop,
+        normalize) directly, without a round trip through the filesystem.
+        """
+        pil_images = [self._to_pil(image) for image in images]
+        if not pil_images:
+            return []
+        return list(self.image_model.embed(pil_images, batch_size=batch_size))
+
+    def embed(self, input_data: Union[str, Image.Image, np.ndarray]) -> np.ndarray:
+        """
+        Embed text or image into a 512D vector using fastembed.
+        
+        Args:
+            input_data: str (text), PIL.Image or numpy array (image)
+        Returns:
+            np.ndarray: contiguous float32 vector of 512 values
+        """
+        if isinstance(input_data, str):
+            logger.debug(f"[fastembed] Embedding text: {input_data[:50]}...")
+            embedding = self.encode_text(input_data)
+            result = np.ascontiguousarray(embedding, dtype=np.float32)
+            logger.debug(f"[fastembed] Generated text embedding: {len(result)}D")
+            return result
+        elif isinstance(input_data, (Image.Image, np.ndarray)):
+            logger.debug("[fastembed] Embedding image")
+            embedding = self.encode_images([input_data])[0]
+            result = np.ascontiguousarray(embedding, dtype=np.float32)
+            logger.debug(f"[fastembed] Generated image embedding: {len(result)}D")
+            return result
+        else:
+            raise ValueError("Input must be a string (text), PIL.Image or numpy array (image)")
@@ -0,0 +1,197 @@
+"""
+Process-pool embedding workers for multi-core ingestion throughput
+
+Each worker process owns its own fastembed text and vision ONNX sessions with
+a fixed number of intra-op threads, so N workers x T threads can saturate a
+many-core ingest node without contending on the GIL.
+
+Batches are shipped through shared memory: the parent allocates one output
+block for the whole request and every task writes its rows in place. Image
+bytes are packed into a shared input block with an offsets table, so only
+small descriptors are pickled across the process boundary.
+"""
+import atexit
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, populated by _worker_init in each worker
+_worker_threads = None
+_text_model = None
+_image_model = None
+
+
+def _worker_init(threads: int):
+    global _worker_threads
+    _worker_threads = threads
+
+
+def _get_text_model():
+    global _text_model
+    if _text_model is None:
+        from app.embeddings.models.multimodal_embedder import load_text_model
+        _text_model = load_text_model(threads=_worker_threads)
+    return _text_model
+
+
+def _get_image_model():
+    global _image_model
+    if _image_model is None:
+        from app.embeddings.models.multimodal_embedder import load_image_model
+        _image_model = load_image_model(threads=_worker_threads)
+    return _image_model
+
+
+def _embed_texts_task(texts: List[str], out_name: str, out_rows: int, start: int, dim: int) -> int:
+    """Embed texts and write rows [start, start + len(texts)) of the shared output"""
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        out = np.ndarray((out_rows, dim), dtype=np.float32, buffer=out_shm.buf)
+        for offset, vector in enumerate(_get_text_model().embed(texts, batch_size=len(texts))):
+            out[start + offset] = vector
+        del out
+    finally:
+        out_shm.close()
+    return len(texts)
+
+
+def _embed_images_task(
+    in_name: str,
+    offsets: List[Tuple[int, int]],
+    out_name: str,
+    out_rows: int,
+    start: int,
+    dim: int
+) -> List[int]:
+    """Decode images packed in the shared input block and embed them in place"""
+    from app.embeddings.manager import EmbeddingsManager
+
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    failed = []
+    try:
+        images = []
+        rows = []
+        for offset, (begin, end) in enumerate(offsets):
+            try:
+                images.append(EmbeddingsManager._decode_image(bytes(in_shm.buf[begin:end])))
+                rows.append(start + offset)
+            except Exception:
+                failed.append(start + offset)
+
+        if images:
+            out = np.ndarray((out_rows, dim), dtype=np.float32, buffer=out_shm.buf)
+            vectors = _get_image_model().embed(images, batch_size=len(images))
+            for row, vector in zip(rows, vectors):
+                out[row] = vector
+            del out
+    finally:
+        in_shm.close()
+        out_shm.close()
+    return failed
+
+
+class EmbeddingProcessPool:
+    """
+    Pool of embedding worker processes
+
+    Args:
+        workers: Number of worker processes
+        threads_per_worker: ONNX intra-op threads per worker session
+        chunk_size: Items per task (defaults to settings.embedding_batch_size)
+    """
+
+    def __init__(self, workers: int, threads_per_worker: int = 1, chunk_size: int = None):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size or settings.embedding_batch_size
+        self.dimension = settings.embedding_dimension
+
+        # spawn: forking after ONNX Runtime has started its thread pools is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(threads_per_worker,),
+        )
+        atexit.register(self.shutdown)
+        logger.info(f"Embedding process pool started: {workers} workers x {threads_per_worker} threads")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _allocate_output(self, rows: int) -> shared_memory.SharedMemory:
+        return shared_memory.SharedMemory(create=True, size=max(1, rows * self.dimension * 4))
+
+    def _read_output(self, shm: shared_memory.SharedMemory, rows: int) -> np.ndarray:
+        view = np.ndarray((rows, self.dimension), dtype=np.float32, buffer=shm.buf)
+        result = view.copy()
+        del view
+        return result
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts across workers; returns a (len(texts), dim) float32 matrix"""
+        rows = len(texts)
+        if not rows:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        out_shm = self._allocate_output(rows)
+        try:
+            futures = [
+                self._executor.submit(
+                    _embed_texts_task, list(texts[start:start + self.chunk_size]),
+                    out_shm.name, rows, start, self.dimension
+                )
+                for start in range(0, rows, self.chunk_size)
+            ]
+            for future in futures:
+                future.result()
+            return self._read_output(out_shm, rows)
+        finally:
+            out_shm.close()
+            out_shm.unlink()
+
+    def embed_images(self, images: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Decode and embed encoded images across workers (None for undecodable images)"""
+        rows = len(images)
+        if not rows:
+            return []
+
+        offsets = []
+        position = 0
+        for image_bytes in images:
+            offsets.append((position, position + len(image_bytes)))
+            position += len(image_bytes)
+
+        in_shm = shared_memory.SharedMemory(create=True, size=max(1, position))
+        out_shm = self._allocate_output(rows)
+        try:
+            for (begin, end), image_bytes in zip(offsets, images):
+                in_shm.buf[begin:end] = image_bytes
+
+            futures = [
+                self._executor.submit(
+                    _embed_images_task, in_shm.name, offsets[start:start + self.chunk_size],
+                    out_shm.name, rows, start, self.dimension
+                )
+                for start in range(0, rows, self.chunk_size)
+            ]
+            failed = set()
+            for future in futures:
+                failed.update(future.result())
+
+            matrix = self._read_output(out_shm, rows)
+            return [None if row in failed else matrix[row] for row in range(rows)]
+        finally:
+            in_shm.close()
+            in_shm.unlink()
+            out_shm.close()
+            out_shm.unlink()
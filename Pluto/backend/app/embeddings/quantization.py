@@ -0,0 +1,88 @@
+"""
+Dynamic int8 quantization of the fastembed CLIP ONNX models
+
+The quantized copy of a model directory (tokenizer/preprocessor files plus an
+int8 model.onnx) is written once under settings.models_dir / "quantized" and
+loaded through fastembed's specific_model_path.
+"""
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "int8")
+
+# First fastembed release with lazy_load, specific_model_path and the
+# model_description / _model_dir attributes the int8 path relies on
+MIN_FASTEMBED = "0.6.0"
+
+# Weight quantization applied for each precision; part of cache namespaces so
+# vectors from different model variants are never mixed
+PRECISION_VARIANTS = {"fp32": "fp32", "int8": "int8-dynamic-qint8"}
+
+
+def precision_variant(precision: str = None) -> str:
+    """Cache slug of a precision (defaults to settings.embedding_precision)"""
+    precision = precision or settings.embedding_precision
+    if precision not in PRECISION_VARIANTS:
+        raise ValueError(f"Unknown embedding precision {precision!r}; expected one of {PRECISIONS}")
+    return PRECISION_VARIANTS[precision]
+
+
+def quantized_model_dir(model) -> Optional[Path]:
+    """
+    Return a directory holding an int8 dynamically-quantized copy of a model
+
+    Args:
+        model: fastembed TextEmbedding or ImageEmbedding (fp32, may be lazy-loaded)
+
+    Returns:
+        The directory, or None when this fastembed release does not expose
+        the model directory and file (the caller keeps fp32)
+    """
+    try:
+        inner = model.model
+        source_dir = Path(inner._model_dir)
+        model_file = inner.model_description.model_file
+    except AttributeError as e:
+        logger.warning(
+            f"embedding_precision=int8 needs fastembed>={MIN_FASTEMBED} (model directory and "
+            f"description not exposed: {e}); falling back to fp32"
+        )
+        return None
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    slug = inner.model_name.replace('/', '__')
+    target_dir = Path(settings.models_dir) / "quantized" / f"{slug}-int8"
+    target_file = target_dir / model_file
+    if target_file.exists():
+        return target_dir
+
+    logger.info(f"Quantizing {inner.model_name} to int8 -> {target_dir}")
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    # Tokenizer / preprocessor configs are needed next to the model
+    for item in source_dir.rglob('*'):
+        relative = item.relative_to(source_dir)
+        if item.is_dir() or relative == Path(model_file) or item.suffix == '.onnx':
+            continue
+        destination = target_dir / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(item, destination)
+
+    # Write to a temp name and rename so concurrent workers never load a partial model
+    tmp_file = target_file.with_name(f"{target_file.stem}.{os.getpid()}.tmp.onnx")
+    target_file.parent.mkdir(parents=True, exist_ok=True)
+    quantize_dynamic(
+        model_input=str(source_dir / model_file),
+        model_output=str(tmp_file),
+        weight_type=QuantType.QInt8,
+    )
+    os.replace(tmp_file, target_file)
+    return target_dir
@@ -1,6 +1,7 @@
 """
 Retrieval Agent - Handles document retrieval using hybrid search
 """
+import asyncio
 import logging
 from typing import Dict, Any, List
 
@@ -45,8 +46,9 @@ class RetrievalAgent(BaseAgent):
             )
         
         try:
-            # Perform hybrid retrieval
-            results = self.retriever.retrieve(
+            # Perform hybrid retrieval (embedding and search block: run in a worker thread)
+            results = await asyncio.to_thread(
+                self.retriever.retrieve,
                 query=query,
                 session_id=session_id,
                 top_k=top_k,
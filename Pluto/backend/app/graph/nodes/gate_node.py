@@ -19,6 +19,7 @@ class CompatibilityGateNode:
     def __init__(self):
         self.vector_store = VectorStore()
         self.llm = None  # Lazy-loaded on first semantic check
+        self._normalized_catalog = (None, [], [])  # (catalog version, topics, concepts)
 
     def _get_llm(self):
         """Lazy load LLM only when needed for semantic fallback"""
@@ -27,6 +28,17 @@ class CompatibilityGateNode:
             self.llm = LlamaReasoner()
         return self.llm
 
+    def _catalog_terms(self):
+        """Normalized catalog topics/concepts, recomputed only when the catalog version changes"""
+        catalog = self.vector_store.get_knowledge_catalog()
+        if self._normalized_catalog[0] != catalog["version"]:
+            self._normalized_catalog = (
+                catalog["version"],
+                [normalize_topic(t) for t in catalog["topics"]],
+                [normalize_topic(c) for c in catalog["concepts"]],
+            )
+        return self._normalized_catalog[1], self._normalized_catalog[2]
+
     def check_semantic_relationship(self, query_topic: str, doc_topics: list) -> bool:
         """
         Asks LLM if the topics are related to handle synonyms/typos.
@@ -66,10 +78,8 @@ Respond with exactly YES or NO."""
             query_topic = normalize_topic(state.get("query_topic", ""))
             query_concepts = [normalize_topic(c) for c in state.get("query_concepts", [])]
             
-            # Fetch current Knowledge Catalog from Qdrant
-            catalog = self.vector_store.get_knowledge_catalog()
-            doc_topics = [normalize_topic(t) for t in catalog["topics"]]
-            doc_concepts = [normalize_topic(c) for c in catalog["concepts"]]
+            # Current Knowledge Catalog (in memory, cached by version)
+            doc_topics, doc_concepts = self._catalog_terms()
 
             logger.info(f"[GATE] Checking Query Topic: '{query_topic}' against Doc Topics: {doc_topics}")
 
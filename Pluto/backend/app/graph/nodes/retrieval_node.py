@@ -2,7 +2,10 @@ from app.retrieval.orchestrator import RetrievalOrchestrator
 from app.retrieval.strategies.multimodal_strategy import multimodal_retrieve
 from app.retrieval.query.multi_query_generator import generate_multi_queries
 from app.reasoning.llm.llama_reasoner import LlamaReasoner
+from app.embeddings.manager import EmbeddingsManager
+from app.storage.async_vector_store import AsyncVectorStore
 from app.graph.state import GraphState
+from app.config import settings
 from app.utils.logging_utils import safe_text
 import logging
 import asyncio
@@ -16,6 +19,36 @@ class RetrievalNode:
         self.orchestrator = orchestrator
         self.executor = ThreadPoolExecutor(max_workers=4)  # Parallel queries
         self.llama_client = LlamaReasoner()  # Initialize LlamaReasoner for query generation
+        self.embeddings_manager = EmbeddingsManager()
+        self.vector_store = AsyncVectorStore()
+    
+    async def _search(self, query: str, session_id: str, top_k: int) -> dict:
+        """
+        Embed one query variant and search; concurrent variants share an embedding batch
+
+        Results carry metadata only: chunk bodies are hydrated once for the
+        merged top-k in run().
+        """
+        loop = asyncio.get_running_loop()
+        query_embedding = await loop.run_in_executor(
+            self.executor, self.embeddings_manager.embed_text, query
+        )
+        if settings.bm25_enabled:
+            # Dense + BM25 in one round trip; falls back to dense for term-less queries
+            return await self.vector_store.query_hybrid(
+                query,
+                query_embedding,
+                session_id=session_id,
+                vector_spaces=["text_embedding"],
+                n_results=top_k,
+                hydrate=False
+            )
+        return await self.vector_store.query(
+            query_embedding,
+            session_id=session_id,
+            n_results=top_k,
+            hydrate=False
+        )
     
     async def run(self, state: GraphState) -> GraphState:
         """Parallel multi-query retrieval"""
@@ -29,17 +62,7 @@ class RetrievalNode:
         # Execute queries in parallel
         logger.info(f"Executing {len(queries)} queries in parallel")
         
-        loop = asyncio.get_event_loop()
-        tasks = [
-            loop.run_in_executor(
-                self.executor,
-                self.orchestrator.vector_store.query,
-                q,
-                session_id,
-                top_k
-            )
-            for q in queries
-        ]
+        tasks = [self._search(q, session_id, top_k) for q in queries]
         
         # Wait for all queries to complete
         results_list = await asyncio.gather(*tasks)
@@ -63,13 +86,23 @@ class RetrievalNode:
                         'id': doc_id,
                         'content': documents[i],
                         'metadata': metadatas[i] if i < len(metadatas) else {},
+                        # Distances stay on the cosine scale for rank-fused hybrid results
                         'score': 1.0 - distances[i] if i < len(distances) else 0.0,
                         'modality': metadatas[i].get('modality', 'text') if i < len(metadatas) else 'text'
                     })
         
         # Sort by score and limit
         all_results.sort(key=lambda x: x['score'], reverse=True)
-        state["retrieved_documents"] = all_results[:top_k]
+        top_results = all_results[:top_k]
+        
+        hydrated = await self.vector_store.hydrate({
+            'ids': [r['id'] for r in top_results],
+            'documents': [r['content'] for r in top_results],
+            'metadatas': [r['metadata'] for r in top_results],
+        })
+        for result, content in zip(top_results, hydrated.get('documents', [])):
+            result['content'] = content
+        state["retrieved_documents"] = top_results
         
         logger.info(f"Retrieved {len(state['retrieved_documents'])} unique documents")
         return state
@@ -0,0 +1,96 @@
+"""
+Content-addressed image dedup for ingestion
+
+Logos, headers and watermarks repeat across pages and documents. Images are
+keyed by the hash of their encoded bytes (the same key the embedding caches
+use), so each unique image is described by the vision model once and embedded
+once; repeats reuse the stored description and the cached embedding.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageDescriptionStore:
+    """
+    Persistent corpus-wide map of image hash -> vision model description
+
+    Backed by SQLite (WAL) so API and worker processes share it. Descriptions
+    are namespaced by kind because PDF and standalone images use different
+    prompts. Only real model descriptions are stored, never fallbacks.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ImageDescriptionStore, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.db_path = Path(settings.cache_dir) / "image_descriptions.sqlite"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_descriptions ("
+            " image_hash TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " description TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (image_hash, kind))"
+        )
+        self._conn.commit()
+
+        self._initialized = True
+        logger.info(f"Image description store at {self.db_path}")
+
+    def get(self, image_hash: str, kind: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description FROM image_descriptions WHERE image_hash = ? AND kind = ?",
+                (image_hash, kind)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, image_hash: str, kind: str, description: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_descriptions VALUES (?, ?, ?, ?)",
+                (image_hash, kind, description, time.time())
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM image_descriptions").fetchone()[0]
+
+
+def summarize_image_dedup(chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Per-document image dedup statistics from processed chunks
+
+    Image chunks carry 'occurrence_count' (how many times the image appeared
+    in the document) and 'description_reused' (description came from the
+    corpus store instead of the vision model).
+    """
+    image_chunks = [c for c in chunks if c.get('image_hash')]
+    occurrences = sum(c.get('occurrence_count', 1) for c in image_chunks)
+    return {
+        "images_found": occurrences,
+        "unique_images": len(image_chunks),
+        "deduplicated": occurrences - len(image_chunks),
+        "descriptions_reused": sum(1 for c in image_chunks if c.get('description_reused')),
+    }
@@ -2,11 +2,17 @@
 Ingestion Orchestrator - Routes files to appropriate processors and stores embeddings
 """
 import uuid
+from collections import Counter
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 
+import numpy as np
+
 from app.config import settings
 from app.core.logging_config import get_safe_logger
+from app.ingestion.image_dedup import summarize_image_dedup
+from app.storage.content_store import chunk_point_id, content_hash, document_hash
+from app.storage.sparse_encoder import encode_document
 
 logger = get_safe_logger(__name__)
 
@@ -87,9 +93,11 @@ class IngestionOrchestrator:
         """
         Main ingestion pipeline:
         1. Determine file type and get processor
-        2. Process file into chunks
-        3. Generate CLIP embeddings
-        4. Store in Qdrant with metadata
+        2. Return early when the same file is already indexed in the session
+        3. Process file into chunks
+        4. Derive deterministic point ids and skip chunks already stored
+        5. Generate CLIP embeddings for the new chunks
+        6. Store in Qdrant with metadata
         """
         file_path = Path(file_path)
         metadata = metadata or {}
@@ -103,6 +111,21 @@ class IngestionOrchestrator:
             
             logger.info(f"[ANALYZE] Using {processor_name} for {file_path.suffix}")
             
+            # An unchanged file already indexed in this session skips
+            # processing (and captioning) altogether
+            doc_hash = self._document_hash(file_path)
+            indexed = self._indexed_document(session_id, doc_hash)
+            if indexed:
+                logger.info(f"[SKIP] {file_path.name} already indexed ({len(indexed)} chunks)")
+                self._move_to_source(indexed, file_path, session_id)
+                return {
+                    "status": "success",
+                    "message": f"{file_path.name} already indexed",
+                    "chunks": len(indexed),
+                    "indexed": 0,
+                    "skipped": len(indexed),
+                }
+            
             # Process file into chunks
             chunks = processor.process(str(file_path), metadata)
             
@@ -117,6 +140,23 @@ class IngestionOrchestrator:
             
             logger.info(f"[OK] Extracted {len(chunks)} chunks")
             
+            # Re-ingesting an unchanged file maps to the same point ids;
+            # chunks already in the collection skip embedding and upsert
+            self._assign_point_ids(chunks, session_id, doc_hash)
+            existing = self._existing_chunk_ids(chunks)
+            if existing:
+                logger.info(f"[SKIP] {len(existing)} of {len(chunks)} chunks already indexed")
+                self._move_to_source(existing, file_path, session_id)
+            if len(existing) == len(chunks):
+                return {
+                    "status": "success",
+                    "message": f"{file_path.name} already indexed",
+                    "chunks": len(chunks),
+                    "indexed": 0,
+                    "skipped": len(existing),
+                    "image_dedup": summarize_image_dedup(chunks)
+                }
+            
             # Extract document knowledge (topic, concepts) using LLM
             document_topic, document_concepts = self._extract_document_knowledge(
                 chunks, file_path
@@ -134,7 +174,8 @@ class IngestionOrchestrator:
                 document_topic=document_topic,
                 document_concepts=document_concepts,
                 source_file=str(file_path),
-                metadata=metadata
+                metadata=metadata,
+                existing_ids=existing
             )
             
             # Log summary by modality
@@ -152,14 +193,17 @@ class IngestionOrchestrator:
             
             if result.get('status') == 'success':
                 logger.info(f"[OK] Indexed {result.get('indexed', 0)} documents")
+                self._warm_session_cache(session_id)
                 return {
                     "status": "success",
                     "message": f"Ingested {file_path.name}",
                     "chunks": len(prepared),
                     "indexed": result.get('indexed', 0),
+                    "skipped": len(existing),
                     "topic": document_topic,
                     "concepts": document_concepts,
-                    "modalities": modality_counts
+                    "modalities": modality_counts,
+                    "image_dedup": summarize_image_dedup(chunks)
                 }
             else:
                 raise Exception(result.get('message', 'Storage error'))
@@ -168,6 +212,69 @@ class IngestionOrchestrator:
             logger.error(f"[FAIL] Ingestion failed for {file_path.name}: {e}")
             raise
     
+    @staticmethod
+    def _document_hash(file_path: Path) -> str:
+        """SHA-256 of the file bytes"""
+        return document_hash(file_path)
+    
+    @staticmethod
+    def _assign_point_ids(chunks: List[Dict[str, Any]], session_id: str, document_hash: str):
+        """
+        Replace the processors' random chunk ids with deterministic point ids
+        
+        Identical chunks of one document are told apart by their occurrence
+        index, so ids stay stable across re-ingests without merging repeats.
+        Image chunks are identified by their image hash: their content names
+        the saved upload file, which changes on every upload.
+        The document hash is kept in the payload for duplicate cleanup.
+        """
+        occurrences = Counter()
+        for chunk in chunks:
+            chunk['document_hash'] = document_hash
+            modality = chunk.get('modality', 'text')
+            if chunk.get('image_hash'):
+                text_hash = f"image:{chunk['image_hash']}"
+            else:
+                text_hash = content_hash(chunk.get('content', ''))
+            key = (modality, text_hash)
+            chunk['chunk_id'] = chunk_point_id(session_id, document_hash, text_hash, modality, occurrences[key])
+            occurrences[key] += 1
+    
+    def _existing_chunk_ids(self, chunks: List[Dict[str, Any]]) -> set:
+        """Chunk ids already in the collection (empty when the check fails)"""
+        try:
+            return self.vector_store.existing_ids([chunk['chunk_id'] for chunk in chunks])
+        except Exception as e:
+            logger.warning(f"[WARN] Existing chunk lookup failed, embedding all chunks: {e}")
+            return set()
+    
+    def _indexed_document(self, session_id: str, document_hash: str) -> Optional[List[str]]:
+        """Point ids of the document when fully indexed in the session (None when the check fails)"""
+        try:
+            return self.vector_store.indexed_document(session_id, document_hash)
+        except Exception as e:
+            logger.warning(f"[WARN] Indexed document lookup failed, processing the file: {e}")
+            return None
+    
+    def _move_to_source(self, point_ids, file_path: Path, session_id: str):
+        """
+        Point already stored chunks at the latest upload
+        
+        Uploads are saved under a new name each time; a failure only leaves
+        the chunks on the earlier copy, so it is logged and ingestion goes on.
+        """
+        try:
+            self.vector_store.move_to_source(point_ids, str(file_path), session_id)
+        except Exception as e:
+            logger.warning(f"[WARN] Moving stored chunks to {file_path.name} failed: {e}")
+    
+    def _warm_session_cache(self, session_id: str):
+        """Load the session into the in-process vector cache ahead of its first query"""
+        try:
+            self.vector_store.warm_session_cache(session_id)
+        except Exception as e:
+            logger.warning(f"[WARN] Session cache warm-up failed: {e}")
+    
     def _get_processor(self, file_path: Path):
         """Get appropriate processor for file type"""
         suffix = file_path.suffix.lower()
@@ -292,42 +399,42 @@ Response:"""
         document_topic: str,
         document_concepts: List[str],
         source_file: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        existing_ids: Optional[set] = None
     ) -> List[Dict[str, Any]]:
         """
         Prepare chunks with CLIP embeddings:
         - Text content -> text embedding
         - Image data -> image embedding
         - Audio transcription -> text embedding
+        - Text content -> BM25 sparse vector (lexical matching in hybrid search)
+        
+        Chunks whose chunk_id is in existing_ids are left out entirely (no
+        embedding, no point); chunk_index still refers to the whole document.
         """
         prepared = []
         total = len(chunks)
+        existing_ids = existing_ids or set()
+        pending = [i for i, chunk in enumerate(chunks) if chunk.get('chunk_id') not in existing_ids]
+        pending_chunks = [chunks[i] for i in pending]
         
-        for i, chunk in enumerate(chunks):
+        # 1. Text embeddings (for text content - works for all modalities),
+        #    generated in one batched pass instead of one ONNX call per chunk
+        text_embeddings = {pending[j]: e for j, e in self._embed_chunk_texts(pending_chunks).items()}
+        
+        # 2. Image embeddings (only for chunks with image_data), batched per document
+        image_embeddings = {pending[j]: e for j, e in self._embed_chunk_images(pending_chunks).items()}
+        
+        for i in pending:
+            chunk = chunks[i]
             try:
                 content = chunk.get('content', '')
                 modality = chunk.get('modality', 'text')
                 chunk_id = chunk.get('chunk_id', str(uuid.uuid4()))
                 
                 # Generate embeddings using CLIP
-                text_embedding = None
-                image_embedding = None
-                
-                # 1. Text embedding (for text content - works for all modalities)
-                if content and len(content.strip()) > 10:
-                    try:
-                        text_embedding = self.embeddings_manager.embed_text(content)
-                    except Exception as e:
-                        logger.warning(f"[WARN] Text embedding failed for chunk {i}: {e}")
-                
-                # 2. Image embedding (only for image modality with image_data)
-                if chunk.get('image_data'):
-                    try:
-                        image_embedding = self.embeddings_manager.embed_image_bytes(
-                            chunk['image_data']
-                        )
-                    except Exception as e:
-                        logger.warning(f"[WARN] Image embedding failed for chunk {i}: {e}")
+                text_embedding = text_embeddings.get(i)
+                image_embedding = image_embeddings.get(i)
                 
                 # Skip if no embeddings generated
                 if text_embedding is None and image_embedding is None:
@@ -338,6 +445,7 @@ Response:"""
                 payload = {
                     'chunk_id': chunk_id,
                     'content': content[:5000],  # Limit content size
+                    'content_hash': content_hash(content),  # Duplicate detection without bodies
                     'modality': modality,
                     'source_type': chunk.get('source_type', modality),
                     'source_file': source_file,
@@ -352,9 +460,10 @@ Response:"""
                 # Add processor-specific metadata for source justification
                 metadata_keys = [
                     'page_number', 'total_pages', 'pdf_id', 'source_pdf',
-                    'image_path', 'image_filename', 'width', 'height', 
+                    'image_path', 'image_filename', 'image_hash', 'occurrence_pages',
+                    'width', 'height', 
                     'description', 'ocr_text', 'ocr_confidence',
-                    'transcription', 'duration',
+                    'transcription', 'duration', 'document_hash',
                 ]
                 for key in metadata_keys:
                     if key in chunk:
@@ -365,10 +474,79 @@ Response:"""
                     'text_embedding': text_embedding,
                     'image_embedding': image_embedding,
                     'audio_embedding': None,  # Audio uses text embedding of transcription
+                    'sparse_embedding': encode_document(content) if settings.bm25_enabled else None,
                     'payload': payload
                 })
                 
             except Exception as e:
                 logger.error(f"[FAIL] Chunk {i} preparation failed: {e}")
         
-        return prepared
\ No newline at end of file
+        return prepared
+    
+    def _embed_chunk_texts(self, chunks: List[Dict[str, Any]]) -> Dict[int, np.ndarray]:
+        """
+        Batch-embed the text content of all chunks
+        
+        Returns:
+            Mapping of chunk index -> text embedding (chunks without
+            embeddable text are absent)
+        """
+        indices = []
+        texts = []
+        for i, chunk in enumerate(chunks):
+            content = chunk.get('content', '')
+            if content and len(content.strip()) > 10:
+                indices.append(i)
+                texts.append(content)
+        
+        if not texts:
+            return {}
+        
+        try:
+            # Rows of one contiguous float32 matrix
+            embeddings = self.embeddings_manager.embed_batch_text(texts)
+            return dict(zip(indices, embeddings))
+        except Exception as e:
+            logger.warning(f"[WARN] Batch text embedding failed, falling back to per-chunk: {e}")
+        
+        # Fallback: embed individually so one bad chunk doesn't drop the document
+        text_embeddings = {}
+        for i, text in zip(indices, texts):
+            try:
+                text_embeddings[i] = self.embeddings_manager.embed_text(text)
+            except Exception as e:
+                logger.warning(f"[WARN] Text embedding failed for chunk {i}: {e}")
+        return text_embeddings
+    
+    def _embed_chunk_images(self, chunks: List[Dict[str, Any]]) -> Dict[int, np.ndarray]:
+        """
+        Batch-embed the image data of all image chunks
+        
+        Returns:
+            Mapping of chunk index -> image embedding (chunks without
+            image_data or with undecodable images are absent)
+        """
+        indices = [i for i, chunk in enumerate(chunks) if chunk.get('image_data')]
+        if not indices:
+            return {}
+        
+        try:
+            embeddings = self.embeddings_manager.embed_images_batch(
+                [chunks[i]['image_data'] for i in indices]
+            )
+            return {
+                i: embedding for i, embedding in zip(indices, embeddings)
+                if embedding is not None
+            }
+        except Exception as e:
+            logger.warning(f"[WARN] Batch image embedding failed, falling back to per-chunk: {e}")
+        
+        image_embeddings = {}
+        for i in indices:
+            try:
+                image_embeddings[i] = self.embeddings_manager.embed_image_bytes(
+                    chunks[i]['image_data']
+                )
+            except Exception as e:
+                logger.warning(f"[WARN] Image embedding failed for chunk {i}: {e}")
+        return image_embeddings
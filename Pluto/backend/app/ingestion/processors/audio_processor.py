@@ -24,18 +24,11 @@ class AudioProcessor(BaseProcessor):
     
     @property
     def whisper_model(self):
-        """Lazy load Whisper model"""
+        """Shared Whisper model from the model registry (loaded once per process)"""
         if self._whisper_model is None:
             try:
-                from faster_whisper import WhisperModel
-                
-                # Use CPU with int8 for VRAM efficiency
-                self._whisper_model = WhisperModel(
-                    "base",
-                    device="cpu",
-                    compute_type="int8"
-                )
-                logger.info("[OK] Faster-Whisper model loaded (CPU, int8)")
+                from app.core.model_registry import model_registry
+                self._whisper_model = model_registry.get("whisper")
             except Exception as e:
                 logger.error(f"[FAIL] Whisper init failed: {e}")
                 self._whisper_model = False
@@ -1,7 +1,6 @@
 """
 Image Processor - Handles standalone images with OCR and visual description
 """
-import io
 import base64
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -11,6 +10,8 @@ import requests
 from PIL import Image
 
 from app.core.logging_config import get_safe_logger
+from app.embeddings.disk_cache import content_hash
+from app.ingestion.image_dedup import ImageDescriptionStore
 from app.ingestion.processors.base_processor import BaseProcessor
 from app.config import settings
 
@@ -46,14 +47,15 @@ class ImageProcessor(BaseProcessor):
             if mode not in ['RGB', 'L']:
                 img = img.convert('RGB')
             
-            # Get image as bytes for CLIP embedding
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            image_data = img_bytes.getvalue()
+            # Original file bytes for CLIP embedding (decoded in memory, no re-encode)
+            image_data = file_path.read_bytes()
+            image_hash = content_hash(image_data)
             
-            # Get image description using Ollama vision or fallback
-            description = self._describe_image(file_path, img)
+            # Reuse the description of an identical image already in the corpus
+            description = ImageDescriptionStore().get(image_hash, "image")
+            description_reused = description is not None
+            if not description_reused:
+                description = self._describe_image(file_path, img, image_hash)
             
             # Try OCR for text extraction
             ocr_text, ocr_confidence = self._extract_ocr_text(file_path)
@@ -87,6 +89,8 @@ class ImageProcessor(BaseProcessor):
                 'description': description,
                 'ocr_text': ocr_text,
                 'ocr_confidence': ocr_confidence,
+                'image_hash': image_hash,
+                'description_reused': description_reused,
                 'image_data': image_data,  # For CLIP image embedding
             }
             
@@ -96,7 +100,7 @@ class ImageProcessor(BaseProcessor):
             logger.error(f"[FAIL] Image processing failed: {e}")
             raise
     
-    def _describe_image(self, file_path: Path, img: Image.Image) -> str:
+    def _describe_image(self, file_path: Path, img: Image.Image, image_hash: str) -> str:
         """Get image description using Ollama vision model or fallback"""
         # Try Ollama vision first
         try:
@@ -123,6 +127,7 @@ class ImageProcessor(BaseProcessor):
                         desc = response.json().get('response', '').strip()
                         if desc:
                             logger.info(f"[OK] Image described using {model}")
+                            ImageDescriptionStore().put(image_hash, "image", desc)
                             return desc
                 except Exception:
                     continue
@@ -1,6 +1,7 @@
 """
 PDF Processor - Extract BOTH text AND images from PDFs
-- Images are saved to data/extracted_images/
+- Images are saved to data/extracted_images/ (content-addressed)
+- Repeated images are extracted, described and embedded once
 - Images are described using vision model
 - Text and images get CLIP embeddings
 - Metadata links content to source PDF and page
@@ -8,13 +9,15 @@ PDF Processor - Extract BOTH text AND images from PDFs
 import io
 import base64
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import uuid
 import requests
 
 from PIL import Image
 
 from app.core.logging_config import get_safe_logger
+from app.embeddings.disk_cache import content_hash
+from app.ingestion.image_dedup import ImageDescriptionStore, summarize_image_dedup
 from app.ingestion.processors.base_processor import BaseProcessor
 from app.config import settings
 
@@ -76,6 +79,10 @@ class PDFProcessor(BaseProcessor):
             text_chunk_count = 0
             image_chunk_count = 0
             
+            # Per-document dedup state for repeated images (logos, headers, watermarks)
+            seen_images: Dict[str, Dict[str, Any]] = {}
+            xref_hashes: Dict[int, Optional[str]] = {}
+            
             # Process each page
             for page_num in range(total_pages):
                 page = doc[page_num]
@@ -98,7 +105,8 @@ class PDFProcessor(BaseProcessor):
                 
                 # 2. Extract IMAGES from page
                 image_chunks = self._extract_page_images(
-                    doc, page, page_num, file_path, page_metadata, pdf_id
+                    doc, page, page_num, file_path, page_metadata, pdf_id,
+                    seen_images, xref_hashes
                 )
                 all_chunks.extend(image_chunks)
                 image_chunk_count += len(image_chunks)
@@ -112,6 +120,13 @@ class PDFProcessor(BaseProcessor):
             
             logger.info(f"[PDF] Extracted {text_chunk_count} text chunks + {image_chunk_count} image chunks")
             
+            dedup = summarize_image_dedup(all_chunks)
+            if dedup['deduplicated'] or dedup['descriptions_reused']:
+                logger.info(
+                    f"[PDF] Image dedup: {dedup['images_found']} found, {dedup['unique_images']} unique, "
+                    f"{dedup['descriptions_reused']} descriptions reused"
+                )
+            
             return all_chunks
             
         except ImportError:
@@ -202,9 +217,21 @@ class PDFProcessor(BaseProcessor):
         page_num: int,
         file_path: Path,
         page_metadata: Dict[str, Any],
-        pdf_id: str
+        pdf_id: str,
+        seen_images: Dict[str, Dict[str, Any]],
+        xref_hashes: Dict[int, Optional[str]]
     ) -> List[Dict[str, Any]]:
-        """Extract images from page, save them, and create chunks"""
+        """
+        Extract images from page, save them, and create chunks
+        
+        Each unique image (by content hash) yields one chunk per document;
+        repeats on later pages are recorded on that chunk instead of being
+        extracted, captioned and embedded again.
+        
+        Args:
+            seen_images: Image hash -> chunk for images already in this document
+            xref_hashes: PDF xref -> image hash (None for skipped images)
+        """
         chunks = []
         
         try:
@@ -213,6 +240,15 @@ class PDFProcessor(BaseProcessor):
             for img_idx, img_info in enumerate(image_list):
                 try:
                     xref = img_info[0]
+                    
+                    # Same xref referenced from several pages: extract once per document
+                    if xref in xref_hashes:
+                        image_hash = xref_hashes[xref]
+                        if image_hash is not None:
+                            self._record_repeat(seen_images[image_hash], page_num)
+                        continue
+                    xref_hashes[xref] = None
+                    
                     base_image = doc.extract_image(xref)
                     
                     if not base_image:
@@ -220,6 +256,13 @@ class PDFProcessor(BaseProcessor):
                     
                     image_bytes = base_image["image"]
                     image_ext = base_image.get("ext", "png")
+                    image_hash = content_hash(image_bytes)
+                    
+                    # Identical bytes stored under another xref
+                    if image_hash in seen_images:
+                        xref_hashes[xref] = image_hash
+                        self._record_repeat(seen_images[image_hash], page_num)
+                        continue
                     
                     # Load image
                     img = Image.open(io.BytesIO(image_bytes))
@@ -229,26 +272,23 @@ class PDFProcessor(BaseProcessor):
                     if width < self.min_image_size or height < self.min_image_size:
                         continue
                     
-                    # Save extracted image to disk
-                    image_filename = f"{pdf_id}_page{page_num + 1}_img{img_idx + 1}.{image_ext}"
-                    image_save_path = self.extracted_images_dir / image_filename
-                    
-                    with open(image_save_path, 'wb') as f:
-                        f.write(image_bytes)
-                    
-                    logger.info(f"[PDF] Saved image: {image_filename} ({width}x{height})")
+                    xref_hashes[xref] = image_hash
                     
-                    # Get image description
-                    description = self._describe_image(image_save_path)
+                    # Content-addressed file: identical images share one file across documents
+                    image_filename = f"{image_hash}.{image_ext}"
+                    image_save_path = self.extracted_images_dir / image_filename
                     
-                    # Prepare image data for CLIP embedding
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
+                    if not image_save_path.exists():
+                        with open(image_save_path, 'wb') as f:
+                            f.write(image_bytes)
+                        logger.info(f"[PDF] Saved image: {image_filename} ({width}x{height})")
                     
-                    img_buffer = io.BytesIO()
-                    img.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-                    image_data = img_buffer.getvalue()
+                    # Get image description (reused if this image was seen in the corpus)
+                    description, description_reused = self._describe_image(
+                        image_hash,
+                        image_bytes,
+                        fallback=f"Image extracted from PDF ({file_path.name} page {page_num + 1})"
+                    )
                     
                     # Create content for text embedding
                     content = f"Image from {file_path.name} page {page_num + 1}: {description}"
@@ -266,13 +306,18 @@ class PDFProcessor(BaseProcessor):
                         'image_path': str(image_save_path),
                         'image_filename': image_filename,
                         'image_index': img_idx + 1,
+                        'image_hash': image_hash,
+                        'occurrence_pages': [page_num + 1],
+                        'occurrence_count': 1,
+                        'description_reused': description_reused,
                         'width': width,
                         'height': height,
                         'description': description,
-                        'image_data': image_data,  # For CLIP image embedding
+                        'image_data': image_bytes,  # Raw extracted bytes for CLIP image embedding
                         **page_metadata,
                     }
                     
+                    seen_images[image_hash] = chunk
                     chunks.append(chunk)
                     
                 except Exception as e:
@@ -284,11 +329,27 @@ class PDFProcessor(BaseProcessor):
         
         return chunks
     
-    def _describe_image(self, image_path: Path) -> str:
-        """Describe image using Ollama vision model"""
+    def _record_repeat(self, chunk: Dict[str, Any], page_num: int):
+        """Note another occurrence of an already extracted image"""
+        chunk['occurrence_count'] += 1
+        if page_num + 1 not in chunk['occurrence_pages']:
+            chunk['occurrence_pages'].append(page_num + 1)
+    
+    def _describe_image(self, image_hash: str, image_bytes: bytes, fallback: str) -> Tuple[str, bool]:
+        """
+        Describe image using Ollama vision model
+        
+        Returns:
+            (description, reused) - reused is True when the description came
+            from the corpus-wide store instead of a vision model call
+        """
+        store = ImageDescriptionStore()
+        stored = store.get(image_hash, "pdf")
+        if stored:
+            return stored, True
+        
         try:
-            with open(image_path, 'rb') as f:
-                image_base64 = base64.b64encode(f.read()).decode('utf-8')
+            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
             
             # Try vision models
             vision_models = ['llava', 'llava:7b', 'bakllava']
@@ -310,15 +371,16 @@ class PDFProcessor(BaseProcessor):
                     if response.status_code == 200:
                         desc = response.json().get('response', '').strip()
                         if desc:
-                            return desc
+                            store.put(image_hash, "pdf", desc)
+                            return desc, False
                 except Exception:
                     continue
                     
         except Exception as e:
             logger.debug(f"Vision description failed: {e}")
         
-        # Fallback
-        return f"Image extracted from PDF ({image_path.stem})"
+        # Fallback (not stored, so a later run can still get a real description)
+        return fallback, False
     
     def _clean_text(self, text: str) -> str:
         """Clean extracted text"""
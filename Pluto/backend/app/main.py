@@ -14,6 +14,7 @@ warnings.filterwarnings("ignore", category=UserWarning)
 """
 Main FastAPI application for the Multimodal RAG System
 """
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
 
@@ -24,7 +25,7 @@ from rich.table import Table
 from fastapi import FastAPI, Request
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.api.v1.router import api_router
 from app.config import settings
@@ -33,6 +34,51 @@ console = Console()
 logger = logging.getLogger("app.main")
 
 
+async def _report_warmup(registry):
+    """Print per-model load times and the knowledge base size once loading finishes"""
+    await asyncio.to_thread(registry.wait)
+    
+    table = Table(title="Model Warmup")
+    table.add_column("Model", style="cyan")
+    table.add_column("Status", style="magenta")
+    table.add_column("Load Time", justify="right")
+    for status in registry.status().values():
+        load_time = f"{status['load_seconds']:.2f}s" if status['load_seconds'] is not None else "-"
+        state = status['state'] if not status['error'] else f"failed ({status['error'][:60]})"
+        table.add_row(status['description'], state, load_time)
+    console.print(table)
+    
+    cold_start = registry.cold_start_seconds
+    if cold_start is not None:
+        console.print(f"[green][OK] Cold start: {cold_start:.2f}s[/green]")
+    
+    if registry.is_ready("vision") and not registry.get("vision"):
+        console.print("[yellow]   • Vision models: None found (image descriptions will use fallback)[/yellow]")
+        console.print("[yellow]     Run: ollama pull llava[/yellow]")
+    
+    if registry.is_ready("qdrant"):
+        try:
+            info = registry.get("qdrant").get_collection_info()
+            points = info.get('points_count', 0)
+            if points > 0:
+                console.print(f"[green][OK] Knowledge base: {points} vectors indexed[/green]")
+            else:
+                console.print("[yellow][INFO] Knowledge base empty - upload documents to begin[/yellow]")
+        except Exception as e:
+            console.print(f"[yellow][WARN] Vector store: {e}[/yellow]")
+
+
+async def _rebuild_catalog(registry):
+    """Reconcile the persisted knowledge catalog with Qdrant once the store is up (startup only)"""
+    await asyncio.to_thread(registry.wait, ["qdrant"])
+    while not registry.is_ready("qdrant"):
+        await asyncio.sleep(5)  # is_ready() retries a failed load once its backoff elapsed
+    try:
+        await asyncio.to_thread(registry.get("qdrant").rebuild_catalog)
+    except Exception as e:
+        logger.warning(f"[WARN] Knowledge catalog rebuild failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan context manager"""
@@ -85,82 +131,29 @@ async def lifespan(app: FastAPI):
     table.add_row("Version", settings.app_version)
     table.add_row("Debug Mode", str(settings.debug))
     table.add_row("Hardware", gpu_info.get('device', 'cpu'))
-    table.add_row("Qdrant Host", f"{settings.qdrant_host}:{settings.qdrant_port}")
+    from app.storage.qdrant.connection import describe_backend
+    table.add_row("Qdrant", describe_backend())
     table.add_row("Models Path", str(settings.models_dir))
     console.print(table)
     
-    # Warmup models
-    console.print("\n[yellow]🔥 Warming up models...[/yellow]")
-    try:
-        # 1. CLIP embeddings
-        from app.embeddings.models.multimodal_embedder import MultimodalEmbedder
-        console.print("[dim]   • Initializing CLIP...[/dim]")
-        embedder = MultimodalEmbedder()
-        test_embed = embedder.encode_text("test")
-        console.print(f"[dim]   • CLIP ready: {len(test_embed)}D vectors[/dim]")
-        
-        # 2. Whisper (lazy load via property access)
-        from app.ingestion.processors.audio_processor import AudioProcessor
-        console.print("[dim]   • Initializing Whisper...[/dim]")
-        audio_proc = AudioProcessor()
-        _ = audio_proc.whisper_model  # Triggers lazy load
-        console.print("[dim]   • Whisper ready[/dim]")
-        
-        # 3. Ollama LLM
-        from app.reasoning.llm.ollama_reasoner import OllamaReasoner
-        console.print("[dim]   • Initializing Ollama LLM...[/dim]")
-        reasoner = OllamaReasoner()
-        console.print(f"[dim]   • Ollama ready: {settings.ollama_model}[/dim]")
-        
-        # 4. Check Ollama Vision Models
-        console.print("[dim]   • Checking vision models...[/dim]")
-        try:
-            import requests
-            response = requests.get(f"{settings.ollama_host}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = [m['name'] for m in response.json().get('models', [])]
-                vision_models = ['llava', 'llava:7b', 'llava:latest', 'bakllava', 'bakllava:latest', 'llama3.2-vision', 'llama3.2-vision:latest']
-                available_vision = [m for m in models if any(v in m for v in ['llava', 'bakllava', 'vision'])]
-                
-                if available_vision:
-                    console.print(f"[dim]   • Vision models: {', '.join(available_vision)}[/dim]")
-                else:
-                    console.print("[yellow]   • Vision models: None found (image descriptions will use fallback)[/yellow]")
-                    console.print("[yellow]     Run: ollama pull llava[/yellow]")
-                
-                # Show all available models
-                other_models = [m for m in models if m not in available_vision and settings.ollama_model not in m]
-                if other_models:
-                    console.print(f"[dim]   • Other Ollama models: {', '.join(other_models[:5])}{'...' if len(other_models) > 5 else ''}[/dim]")
-            else:
-                console.print("[yellow]   • Vision models: Could not check[/yellow]")
-        except Exception as e:
-            console.print(f"[yellow]   • Vision models: Check failed ({e})[/yellow]")
-        
-        console.print("[green][OK] All models ready![/green]")
-        
-    except Exception as e:
-        console.print(f"[yellow][WARN] Warmup: {e}[/yellow]")
-    
-    # Check vector store
-    console.print("\n[yellow]📚 Checking knowledge base...[/yellow]")
-    try:
-        from app.storage.vector_store import VectorStore
-        vs = VectorStore()
-        info = vs.get_collection_info()
-        points = info.get('points_count', 0)
-        if points > 0:
-            console.print(f"[green][OK] Knowledge base: {points} vectors indexed[/green]")
-        else:
-            console.print("[yellow][INFO] Knowledge base empty - upload documents to begin[/yellow]")
-    except Exception as e:
-        console.print(f"[yellow][WARN] Vector store: {e}[/yellow]")
+    # Load models concurrently in the background; routes gate on readiness
+    from app.core.model_registry import model_registry
+    console.print("\n[yellow]🔥 Loading models in background...[/yellow]")
+    model_registry.start()
+    warmup_report = asyncio.create_task(_report_warmup(model_registry))
+    catalog_rebuild = asyncio.create_task(_rebuild_catalog(model_registry))
     
     root_logger.info(f"Application version: {settings.app_version}")
     console.print("\n[green][OK] Application startup complete![/green]\n")
     
     yield
     
+    warmup_report.cancel()
+    catalog_rebuild.cancel()
+    
+    from app.storage.async_vector_store import AsyncVectorStore
+    if AsyncVectorStore._initialized:
+        await AsyncVectorStore().close()
     console.print("\n[yellow]⏹️  Shutting down...[/yellow]")
     root_logger.info("Shutting down Multimodal RAG System...")
 
@@ -190,13 +183,22 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    from app.core.model_registry import model_registry
     return {
         "status": "healthy",
         "version": settings.app_version,
+        "models": {name: status["state"] for name, status in model_registry.status().items()},
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
@@ -5,9 +5,9 @@ import logging
 import math
 from typing import List, Dict, Any, Optional
 from collections import Counter
-import re
 
 from app.config import settings
+from app.storage.sparse_encoder import tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -63,24 +63,7 @@ class BM25Retriever:
         Returns:
             List of lowercase tokens
         """
-        if not text:
-            return []
-        
-        # Convert to lowercase and extract words
-        text = text.lower()
-        tokens = re.findall(r'\b[a-z0-9]+\b', text)
-        
-        # Remove stopwords
-        stopwords = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
-            'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'it', 'its', 'as', 'if', 'then', 'so', 'than'
-        }
-        
-        tokens = [t for t in tokens if t not in stopwords and len(t) > 1]
-        return tokens
+        return tokenize(text)
 
     def index_documents(self, documents: List[Dict[str, Any]]):
         """
@@ -34,6 +34,7 @@ class HybridRetriever:
         use_mmr: bool = True,
         filters: Dict[str, Any] = None,
         use_multimodal_search: bool = True,
+        use_bm25: bool = None,
     ) -> Dict[str, Any]:
         """
         Retrieve relevant documents for a query
@@ -47,6 +48,8 @@ class HybridRetriever:
             use_mmr: Apply MMR reranking
             filters: Additional filters
             use_multimodal_search: Use unified multimodal search (recommended)
+            use_bm25: Fuse BM25 lexical matches into the multimodal search
+                (default settings.bm25_enabled)
             
         Returns:
             Dict with documents, scores, metadata
@@ -54,6 +57,7 @@ class HybridRetriever:
         top_k = top_k or self.default_top_k
         modalities = modalities or ['text', 'image', 'audio']  # Now includes audio
         min_score = min_score or settings.similarity_threshold
+        use_bm25 = settings.bm25_enabled if use_bm25 is None else use_bm25
         
         logger.info(f"[SEARCH] Query: '{query[:50]}...' | Modalities: {modalities}")
         
@@ -65,15 +69,27 @@ class HybridRetriever:
             vector_spaces = [f"{m}_embedding" for m in modalities]
             
             if use_multimodal_search:
-                # Use the new unified multimodal search
-                results = self.vector_store.query_multimodal(
-                    query_embedding=query_embedding,
-                    session_id=session_id,
-                    vector_spaces=vector_spaces,
-                    n_results=top_k * 2 if use_mmr else top_k,
-                    score_threshold=min_score,
-                    filters=filters
-                )
+                if use_bm25:
+                    # Dense spaces + BM25, fused by Qdrant in one request
+                    results = self.vector_store.query_hybrid(
+                        query_text=query,
+                        query_embedding=query_embedding,
+                        session_id=session_id,
+                        vector_spaces=vector_spaces,
+                        n_results=top_k * 2 if use_mmr else top_k,
+                        score_threshold=min_score,
+                        filters=filters
+                    )
+                else:
+                    # Use the new unified multimodal search
+                    results = self.vector_store.query_multimodal(
+                        query_embedding=query_embedding,
+                        session_id=session_id,
+                        vector_spaces=vector_spaces,
+                        n_results=top_k * 2 if use_mmr else top_k,
+                        score_threshold=min_score,
+                        filters=filters
+                    )
                 
                 if results.get('status') != 'success':
                     return {
@@ -83,7 +99,9 @@ class HybridRetriever:
                         "count": 0
                     }
                 
-                # Format results
+                # Format results; fused rank scores (BM25 + RRF) order the
+                # results, evidence weighing keeps the dense similarity
+                similarities = results.get('similarities', results['scores'])
                 all_results = []
                 for idx in range(len(results.get('ids', []))):
                     meta = results['metadatas'][idx]
@@ -91,7 +109,8 @@ class HybridRetriever:
                         'id': results['ids'][idx],
                         'content': results['documents'][idx],
                         'metadata': meta,
-                        'score': results['scores'][idx],
+                        'score': similarities[idx],
+                        'rank_score': results['scores'][idx],
                         'modality': meta.get('modality', 'text'),
                         'source_type': meta.get('source_type', 'unknown'),
                         'matched_spaces': meta.get('matched_spaces', []),
@@ -137,8 +156,8 @@ class HybridRetriever:
                     "message": "No relevant documents found"
                 }
             
-            # Sort by score
-            all_results.sort(key=lambda x: x['score'], reverse=True)
+            # Sort by score (fused rank when there is one)
+            all_results.sort(key=lambda x: x.get('rank_score', x['score']), reverse=True)
             
             # Apply MMR reranking for diversity
             if use_mmr and len(all_results) > 1:
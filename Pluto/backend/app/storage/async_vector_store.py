@@ -0,0 +1,466 @@
+"""
+Async Qdrant Vector Store - AsyncQdrantClient-backed variant for request handlers
+
+The sync VectorStore remains the API for scripts and creates/maintains the
+collection; this store assumes the collection exists and never blocks the
+event loop on network I/O. Knowledge catalog and content store calls (SQLite)
+run in worker threads.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+from qdrant_client.http import models as qmodels
+
+from app.config import settings
+from app.core.logging_config import get_safe_logger
+from app.storage.content_store import CONTENT_FIELDS
+from app.storage.knowledge_catalog import CATALOG_FIELDS
+from app.storage.qdrant.connection import create_async_client, is_embedded
+from app.storage.session_cache import SessionVectorCache
+from app.storage.vector_store import (
+    MODALITIES, VECTOR_SPACES, BaseVectorStore, PointBatch, VectorStore, build_search_params
+)
+
+logger = get_safe_logger(__name__)
+
+
+class AsyncVectorStore(BaseVectorStore):
+    """
+    Async Qdrant Vector Store with multi-vector support
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncVectorStore, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if AsyncVectorStore._initialized:
+            return
+
+        self.collection_name = settings.collection_name
+        self.qdrant_client = create_async_client()
+        self.search_params = None if is_embedded() else build_search_params()
+        self.exact_search_params = None if is_embedded() else build_search_params(exact=True)
+
+        AsyncVectorStore._initialized = True
+        logger.info(f"[OK] AsyncVectorStore initialized: {self.collection_name}")
+
+    @property
+    def session_shards(self) -> int:
+        """Session shard keys, as discovered by the sync store that owns the collection"""
+        if VectorStore._initialized:
+            return VectorStore().session_shards
+        return 0 if is_embedded() else settings.qdrant_session_shards
+
+    @property
+    def sparse_vectors(self) -> bool:
+        """Whether points carry BM25 vectors, as checked against the collection by the sync store"""
+        if VectorStore._initialized:
+            return VectorStore().sparse_vectors
+        return settings.bm25_enabled
+
+    @property
+    def session_cache(self) -> Optional[SessionVectorCache]:
+        """The sync store's in-process session cache (shared, so one copy per process)"""
+        if VectorStore._initialized:
+            return VectorStore().session_cache
+        return None
+
+    async def _cached_search(self, *args) -> Optional[List[List[qmodels.ScoredPoint]]]:
+        """_query_session_cache off the event loop (a miss may load the session)"""
+        if self.session_cache is None:
+            return None
+        return await asyncio.to_thread(self._query_session_cache, *args)
+
+    def _invalidate_session_cache(self, session_ids: Optional[List[str]] = None):
+        """Drop written sessions from the sync store's in-process cache (all when None)"""
+        if VectorStore._initialized:
+            VectorStore().invalidate_session_cache(session_ids)
+
+    async def add_documents(self, documents: List[Dict[str, Any]], batch_size: int = None) -> Dict[str, Any]:
+        """
+        Add documents with embeddings to Qdrant
+
+        Points are built off the event loop. Anything larger than one batch
+        goes through the pipelined bulk_upsert; either way all points are
+        applied when this returns.
+        """
+        if not documents:
+            return {"status": "success", "indexed": 0}
+
+        batch_size = batch_size or settings.qdrant_upsert_batch_size
+        try:
+            if len(documents) > batch_size:
+                total_indexed = (await self.bulk_upsert(documents, batch_size=batch_size))["indexed"]
+            else:
+                batch = await asyncio.to_thread(self._build_points, documents)
+                total_indexed = await self._upsert_with_retry(batch, wait=True) if batch else 0
+
+            if not total_indexed:
+                return {"status": "warning", "indexed": 0, "message": "No valid points"}
+
+            logger.info(f"[OK] Indexed {total_indexed} documents")
+            return {"status": "success", "indexed": total_indexed}
+
+        except Exception as e:
+            logger.error(f"[FAIL] Add documents failed: {e}")
+            raise
+
+    async def bulk_upsert(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = None,
+        max_in_flight: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Pipelined bulk load of prepared documents (see VectorStore.bulk_upsert)
+
+        Up to `max_in_flight` wait=False upserts run as tasks while the next
+        batches are built in worker threads; each shard's latest batch is
+        sent last with wait=True.
+        """
+        batch_size = batch_size or settings.qdrant_upsert_batch_size
+        max_in_flight = max(1, max_in_flight or settings.qdrant_upsert_max_in_flight)
+        stats = self._load_stats()
+        started = time.perf_counter()
+        indexed = 0
+        in_flight: Deque[asyncio.Task] = deque()
+        pending: Dict[Optional[str], PointBatch] = {}  # Latest batch per shard key, sent last with wait=True
+
+        try:
+            for chunk in self._document_chunks(documents, batch_size):
+                batch = await asyncio.to_thread(self._build_points, chunk)
+                for held in self._hold_back(pending, batch):
+                    if len(in_flight) >= max_in_flight:
+                        indexed += await in_flight.popleft()
+                    in_flight.append(asyncio.create_task(self._upsert_with_retry(held, False, stats)))
+
+            while in_flight:
+                indexed += await in_flight.popleft()
+
+            for group in pending.values():
+                indexed += await self._upsert_with_retry(group, True, stats)
+        except Exception:
+            for task in in_flight:
+                task.cancel()
+            raise
+        finally:
+            self._invalidate_session_cache(stats["sessions"])  # After the final writes (or a failure)
+
+        return self._load_report(indexed, stats, started)
+
+    async def _upsert_with_retry(
+        self,
+        points: List[qmodels.PointStruct],
+        wait: bool,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Upsert one batch, retrying transient errors with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                for shard_key, group in self._group_by_shard(points):
+                    await self.qdrant_client.upsert(
+                        collection_name=self.collection_name,
+                        points=group,
+                        wait=wait,
+                        shard_key_selector=shard_key,
+                    )
+                break
+            except Exception as e:
+                if attempt >= settings.qdrant_upsert_retries or not self._is_transient(e):
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                logger.warning(f"[WARN] Upsert of {len(points)} points failed ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        sessions = await asyncio.to_thread(self._record_upsert, points, attempt, stats)
+        if stats is None:
+            self._invalidate_session_cache(sessions)
+        return len(points)
+
+    async def query(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str] = None,
+        vector_name: str = "text_embedding",
+        n_results: int = 10,
+        score_threshold: float = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hydrate: bool = True,
+    ) -> Dict[str, Any]:
+        """Query a single vector space (hydrate=False returns metadata without chunk bodies)"""
+        try:
+            cached = await self._cached_search(
+                query_embedding, session_id, [vector_name], n_results, score_threshold, filters
+            )
+            if cached is not None:
+                result = self._format_points(cached[0], vector_name)
+                return await self.hydrate(result) if hydrate else result
+
+            search_params = await asyncio.to_thread(self._search_params_for, session_id)
+            response = await self.qdrant_client.query_points(
+                collection_name=self.collection_name,
+                query=self._to_wire(query_embedding),
+                using=vector_name,
+                query_filter=self._build_filter(session_id, filters),
+                limit=n_results,
+                score_threshold=score_threshold or settings.similarity_threshold,
+                search_params=search_params,
+                shard_key_selector=self._shard_key(session_id),
+                with_payload=self.result_payload,
+            )
+            result = self._format_points(response.points, vector_name)
+            return await self.hydrate(result) if hydrate else result
+
+        except Exception as e:
+            logger.error(f"[FAIL] Query failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def query_multimodal(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str] = None,
+        vector_spaces: List[str] = None,
+        n_results: int = 10,
+        score_threshold: float = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hydrate: bool = True,
+    ) -> Dict[str, Any]:
+        """Query across multiple vector spaces in one batch request and merge results"""
+        if vector_spaces is None:
+            vector_spaces = ["text_embedding", "image_embedding", "audio_embedding"]
+
+        try:
+            cached = await self._cached_search(
+                query_embedding, session_id, vector_spaces, n_results, score_threshold, filters
+            )
+            if cached is not None:
+                responses = [qmodels.QueryResponse(points=points) for points in cached]
+            else:
+                # Request building looks up the session size in the catalog
+                requests = await asyncio.to_thread(
+                    self._multimodal_requests, query_embedding, session_id, vector_spaces,
+                    n_results, score_threshold, filters
+                )
+                responses = await self.qdrant_client.query_batch_points(
+                    collection_name=self.collection_name, requests=requests
+                )
+        except Exception as e:
+            logger.error(f"[FAIL] Multimodal query failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+        result = self._merge_spaces(vector_spaces, responses, n_results)
+        return await self.hydrate(result) if hydrate else result
+
+    async def query_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str] = None,
+        vector_spaces: List[str] = None,
+        n_results: int = 10,
+        score_threshold: float = None,
+        filters: Optional[Dict[str, Any]] = None,
+        fusion: str = None,
+        hydrate: bool = True,
+    ) -> Dict[str, Any]:
+        """Dense + BM25 search fused by Qdrant in one request (see VectorStore.query_hybrid)"""
+        vector_spaces = vector_spaces or list(VECTOR_SPACES)
+        try:
+            branches = await asyncio.to_thread(
+                self._hybrid_branches, query_text, query_embedding, session_id,
+                vector_spaces, n_results, score_threshold, filters
+            )
+            if branches is None:
+                return await self.query_multimodal(
+                    query_embedding, session_id, vector_spaces, n_results, score_threshold, filters, hydrate
+                )
+            fused = None
+            cached = await self._cached_search(
+                query_embedding, session_id, vector_spaces, branches[-1].limit, score_threshold, filters
+            )
+            if cached is not None:
+                sparse = await self.qdrant_client.query_points(**self._sparse_request(branches, session_id))
+                fused = await asyncio.to_thread(
+                    self._fuse, cached, sparse.points, query_embedding, session_id,
+                    vector_spaces, n_results, score_threshold, fusion
+                )
+            if fused is None:
+                points = (await self.qdrant_client.query_points(**self._hybrid_request(
+                    branches, query_embedding, session_id, vector_spaces, n_results, score_threshold, fusion
+                ))).points
+                fused = self._hybrid_points(points, query_embedding, vector_spaces, fusion)
+        except Exception as e:
+            logger.error(f"[FAIL] Hybrid query failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+        result = self._format_hybrid(*fused)
+        return await self.hydrate(result) if hydrate else result
+
+    async def hydrate(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach chunk bodies to a query result (see VectorStore.hydrate)"""
+        if not self._needs_bodies(result):
+            return result
+        ids = result["ids"]
+        bodies = await asyncio.to_thread(self.content_store.get_many, ids)
+        missing = [self._point_id(i) for i in ids if i not in bodies]
+        if missing:
+            records = await self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=missing,
+                with_payload=CONTENT_FIELDS,
+                with_vectors=False,
+            )
+            bodies.update({str(r.id): r.payload for r in records if r.payload})
+        return self._apply_bodies(result, bodies)
+
+    async def count(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        exact: bool = True
+    ) -> int:
+        """Count points matching a session and payload filters"""
+        result = await self.qdrant_client.count(
+            collection_name=self.collection_name,
+            count_filter=self._build_filter(session_id, filters),
+            exact=exact,
+        )
+        return result.count
+
+    async def get_stats(self, session_id: Optional[str] = None, exact: bool = True) -> Dict[str, Any]:
+        """Point counts, total and per modality, counted concurrently (see VectorStore.get_stats)"""
+        cached = await asyncio.to_thread(self._stats_cache_get, session_id, exact)
+        if cached is not None:
+            return cached
+
+        version = await asyncio.to_thread(lambda: self.catalog.version)
+        total, *counts = await asyncio.gather(
+            self.count(session_id, exact=exact),
+            *(self.count(session_id, {"modality": m}, exact=exact) for m in MODALITIES),
+        )
+        return self._stats_cache_put(session_id, exact, version, total, dict(zip(MODALITIES, counts)))
+
+    async def delete(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Delete all points matching a session and payload filters"""
+        query_filter = self._build_filter(session_id, filters)
+        if query_filter is None:
+            return {"status": "error", "message": "Refusing to delete without a filter"}
+
+        try:
+            deleted = await self.count(session_id, filters)
+            
+            # Other filters than a whole session/document delete page by page
+            # and release the catalog and content-store refs of each page, so
+            # memory stays constant whatever the number of matched points
+            by_page = bool(filters) and set(filters) != {"source_file"}
+            if by_page:
+                async for page in self.scroll_pages(session_id, filters, page_size=1000, with_payload=CATALOG_FIELDS):
+                    point_ids = [point.id for point in page]
+                    await self.qdrant_client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=qmodels.PointIdsList(points=point_ids),
+                    )
+                    await asyncio.to_thread(self.catalog.remove_points, [point.payload for point in page])
+                    await asyncio.to_thread(self.content_store.delete, point_ids=point_ids)
+            
+            # Whole sessions/documents (and points written during the pages
+            # above) go with one filter delete
+            await self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=qmodels.FilterSelector(filter=query_filter),
+            )
+            if deleted:
+                await asyncio.to_thread(self.catalog.touch)  # Invalidate stats even if the catalog did not know the points
+                self._invalidate_session_cache([session_id] if session_id else None)
+            
+            if filters and not by_page:
+                await asyncio.to_thread(self.catalog.remove_source, filters["source_file"], session_id)
+                await asyncio.to_thread(self.content_store.delete, session_id, filters["source_file"])
+            elif not filters:
+                await asyncio.to_thread(self.catalog.remove_session, session_id)
+                await asyncio.to_thread(self.content_store.delete, session_id)
+            logger.info(f"[OK] Deleted {deleted} documents ({session_id or filters})")
+            return {"status": "success", "deleted": deleted}
+        except Exception as e:
+            logger.error(f"[FAIL] Delete failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def delete_by_session(self, session_id: str) -> Dict[str, Any]:
+        """Delete all documents for a session"""
+        return await self.delete(session_id=session_id)
+
+    async def delete_by_source(self, source_file: str, session_id: Optional[str] = None) -> int:
+        """Delete every point of a source file with one filter delete; returns the count"""
+        result = await self.delete(session_id=session_id, filters={"source_file": source_file})
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+        return result["deleted"]
+
+    async def scroll_pages(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = 256,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> AsyncIterator[List[qmodels.Record]]:
+        """Page through all matching points, one request per page (see VectorStore.scroll_pages)"""
+        offset = None
+        query_filter = self._build_filter(session_id, filters)
+        while True:
+            points, offset = await self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=query_filter,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload if isinstance(with_payload, bool) else list(with_payload),
+                with_vectors=with_vectors if isinstance(with_vectors, bool) else list(with_vectors),
+            )
+            if points:
+                yield points
+            if offset is None:
+                break
+
+    async def scroll(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = 256,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> AsyncIterator[qmodels.Record]:
+        """Iterate over all matching points, one page per request"""
+        async for page in self.scroll_pages(session_id, filters, page_size, with_payload, with_vectors):
+            for point in page:
+                yield point
+
+    async def get_collection_info(self) -> Dict[str, Any]:
+        """Get information about the collection"""
+        try:
+            info = await self.qdrant_client.get_collection(self.collection_name)
+            return {
+                "name": self.collection_name,
+                "points_count": info.points_count,
+                "indexed_vectors_count": getattr(info, 'indexed_vectors_count', 'N/A'),
+                "status": str(info.status),
+            }
+        except Exception as e:
+            logger.error(f"[FAIL] Failed to get collection info: {e}")
+            return {"error": str(e)}
+
+    async def close(self):
+        await self.qdrant_client.close()
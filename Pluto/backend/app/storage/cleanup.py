@@ -0,0 +1,376 @@
+"""
+Vector store cleanup - orphaned sources and duplicate chunks
+
+Streams the collection one scroll page at a time:
+- orphans: points whose source_file no longer exists on disk. Each distinct
+  source is checked once, and all of its points go in one filter delete.
+- duplicates: the same chunk of the same document stored twice in a session
+  (re-uploads of a file from before point ids were deterministic), keyed by
+  (session_id, document hash, chunk index, modality, content hash, image
+  hash). Repeated chunks inside one document and shared boilerplate across
+  documents differ in chunk index or document hash and are kept. The first
+  point seen is kept; the others are deleted by id in batches.
+
+Seen keys and the scroll offset live in a SQLite state file, so memory stays
+constant and an interrupted run resumes where it stopped. A points-per-second
+limit lets the cleaner run next to live traffic.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from qdrant_client.http import models as qmodels
+
+from app.config import settings
+from app.storage.content_store import content_hash, document_hash
+from app.storage.knowledge_catalog import CATALOG_FIELDS
+from app.storage.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Chunk bodies stay out of the scan: only legacy points without content_hash
+# need theirs, and _legacy_bodies fetches those separately
+SCAN_FIELDS = sorted(
+    set(CATALOG_FIELDS) | {"modality", "content_hash", "image_hash", "document_hash", "chunk_index"}
+)
+
+
+class CleanupState:
+    """Resumable cleanup progress: scroll offset, running totals and seen duplicate keys"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS progress (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY, point_id TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sources (source_file TEXT PRIMARY KEY, orphan INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS source_hashes (source_file TEXT PRIMARY KEY, digest TEXT NOT NULL)")
+        self._conn.commit()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT value FROM progress WHERE key = 'run'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, run: Dict[str, Any]):
+        self._conn.execute("INSERT OR REPLACE INTO progress VALUES ('run', ?)", (json.dumps(run),))
+        self._conn.commit()
+
+    def owners(self, digests: List[bytes]) -> Dict[bytes, str]:
+        """Point ids already holding these duplicate keys"""
+        if not digests:
+            return {}
+        placeholders = ",".join("?" * len(digests))
+        rows = self._conn.execute(
+            f"SELECT digest, point_id FROM seen WHERE digest IN ({placeholders})", digests
+        ).fetchall()
+        return dict(rows)
+
+    def claim(self, rows: List[Tuple[bytes, str]]):
+        self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", rows)
+
+    def source_status(self, sources: List[str]) -> Dict[str, bool]:
+        if not sources:
+            return {}
+        placeholders = ",".join("?" * len(sources))
+        rows = self._conn.execute(
+            f"SELECT source_file, orphan FROM sources WHERE source_file IN ({placeholders})", sources
+        ).fetchall()
+        return {source: bool(orphan) for source, orphan in rows}
+
+    def record_sources(self, status: Dict[str, bool]):
+        self._conn.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?)", [(s, int(o)) for s, o in status.items()])
+
+    def source_hashes(self, sources: List[str]) -> Dict[str, str]:
+        if not sources:
+            return {}
+        placeholders = ",".join("?" * len(sources))
+        rows = self._conn.execute(
+            f"SELECT source_file, digest FROM source_hashes WHERE source_file IN ({placeholders})", sources
+        ).fetchall()
+        return dict(rows)
+
+    def record_source_hashes(self, digests: Dict[str, str]):
+        self._conn.executemany("INSERT OR REPLACE INTO source_hashes VALUES (?, ?)", list(digests.items()))
+
+    def commit(self):
+        self._conn.commit()
+
+    def reset(self):
+        for table in ("progress", "seen", "sources", "source_hashes"):
+            self._conn.execute(f"DELETE FROM {table}")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class VectorStoreCleaner:
+    """
+    Streaming orphan/duplicate cleanup over the Qdrant collection
+
+    Args:
+        vector_store: Store to clean (defaults to the VectorStore singleton)
+        dry_run: Report what would be deleted without deleting
+        page_size: Points per scroll page
+        max_points_per_s: Scan throughput limit (0 = unlimited)
+        delete_batch_size: Ids/sources per delete request
+        state_path: SQLite progress file (defaults to cache_dir/vector_cleanup.sqlite)
+        max_orphan_fraction: Abort when more than this fraction of the sources
+            seen are missing, which usually means an unmounted upload volume
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore = None,
+        dry_run: bool = True,
+        page_size: int = 512,
+        max_points_per_s: float = 0,
+        delete_batch_size: int = 256,
+        state_path: Path = None,
+        max_orphan_fraction: float = 0.5,
+    ):
+        self.store = vector_store or VectorStore()
+        self.dry_run = dry_run
+        self.page_size = page_size
+        self.max_points_per_s = max_points_per_s
+        self.delete_batch_size = delete_batch_size
+        self.max_orphan_fraction = max_orphan_fraction
+        suffix = "_dry_run" if dry_run else ""
+        self.state = CleanupState(
+            state_path or Path(settings.cache_dir) / f"vector_cleanup{suffix}.sqlite"
+        )
+
+    def run(self, resume: bool = True, max_pages: int = None) -> Dict[str, Any]:
+        """
+        Scan the collection (or continue an interrupted scan)
+
+        Args:
+            resume: Continue from the saved offset; False starts over
+            max_pages: Stop after this many pages (the run stays resumable)
+
+        Returns:
+            Report with status, scanned, orphan_sources, orphaned_points,
+            duplicates, deleted and a sample of orphaned sources
+        """
+        run = self.state.load() if resume else None
+        if run is None or run.get("status") == "complete":
+            self.state.reset()
+            run = {
+                "status": "running", "offset": None, "scanned": 0, "pages": 0,
+                "sources_checked": 0, "orphan_sources": 0, "orphaned_points": 0,
+                "duplicates": 0, "deleted": 0, "orphan_sample": [], "dry_run": self.dry_run,
+            }
+        else:
+            logger.info(f"Resuming cleanup at offset {run['offset']} ({run['scanned']} points scanned)")
+
+        if not Path(settings.upload_dir).exists():
+            run["status"] = "aborted"
+            run["message"] = f"Upload directory {settings.upload_dir} is missing; refusing to treat every source as orphaned"
+            logger.error(f"[FAIL] Cleanup aborted: {run['message']}")
+            return run
+
+        started = time.monotonic()
+        scanned_this_run = 0
+        pages_this_run = 0
+        while True:
+            points, next_offset = self.store.qdrant_client.scroll(
+                collection_name=self.store.collection_name,
+                limit=self.page_size,
+                offset=run["offset"],
+                with_payload=SCAN_FIELDS,
+                with_vectors=False,
+            )
+            if points:
+                self._process_page(points, run)
+                if run["status"] == "aborted":
+                    self.state.save(run)
+                    return run
+
+            run["offset"] = next_offset
+            run["scanned"] += len(points)
+            run["pages"] += 1
+            run["status"] = "complete" if next_offset is None else "running"
+            self.state.commit()
+            self.state.save(run)
+
+            scanned_this_run += len(points)
+            pages_this_run += 1
+            if next_offset is None or (max_pages and pages_this_run >= max_pages):
+                break
+            self._throttle(scanned_this_run, started)
+
+        level = "Would delete" if self.dry_run else "[OK] Deleted"
+        logger.info(
+            f"{level} {run['orphaned_points']} orphaned points from {run['orphan_sources']} sources "
+            f"and {run['duplicates']} duplicates ({run['scanned']} scanned, status={run['status']})"
+        )
+        return run
+
+    def _throttle(self, scanned: int, started: float):
+        if self.max_points_per_s > 0:
+            ahead = scanned / self.max_points_per_s - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def _process_page(self, points: List[qmodels.Record], run: Dict[str, Any]):
+        orphaned = self._check_sources(points, run)
+        if run["status"] == "aborted":
+            return
+
+        duplicates = self._find_duplicates(
+            [p for p in points if (p.payload or {}).get("source_file") not in orphaned]
+        )
+        run["duplicates"] += len(duplicates)
+
+        if self.dry_run:
+            run["orphaned_points"] += sum(self.store.count(filters={"source_file": s}) for s in orphaned)
+            return
+        for i in range(0, len(orphaned), self.delete_batch_size):
+            deleted = self._delete_sources(orphaned[i:i + self.delete_batch_size])
+            run["orphaned_points"] += deleted
+            run["deleted"] += deleted
+        for i in range(0, len(duplicates), self.delete_batch_size):
+            run["deleted"] += self._delete_points(duplicates[i:i + self.delete_batch_size])
+
+    def _check_sources(self, points: List[qmodels.Record], run: Dict[str, Any]) -> List[str]:
+        """Newly seen sources that are missing on disk (each source is checked once per run)"""
+        sources = sorted({(p.payload or {}).get("source_file") for p in points} - {None, ""})
+        known = self.state.source_status(sources)
+        status = {source: not Path(source).exists() for source in sources if source not in known}
+        if not status:
+            return []
+        self.state.record_sources(status)
+
+        orphans = [source for source, orphan in status.items() if orphan]
+        run["sources_checked"] += len(status)
+        run["orphan_sources"] += len(orphans)
+        if (
+            run["sources_checked"] >= 10
+            and run["orphan_sources"] > self.max_orphan_fraction * run["sources_checked"]
+        ):
+            run["status"] = "aborted"
+            run["message"] = (
+                f"{run['orphan_sources']} of {run['sources_checked']} sources are missing; "
+                f"refusing to delete (is {settings.upload_dir} mounted?)"
+            )
+            logger.error(f"[FAIL] Cleanup aborted: {run['message']}")
+            return []
+
+        run["orphan_sample"].extend(orphans[:50 - len(run["orphan_sample"])])
+        return orphans
+
+    def _find_duplicates(self, points: List[qmodels.Record]) -> List[qmodels.Record]:
+        """Points whose duplicate key is held by another point"""
+        # Without a chunk index, repeated chunks of one document cannot be
+        # told apart from copies: such points are never treated as duplicates
+        points = [p for p in points if (p.payload or {}).get("chunk_index") is not None]
+
+        # Points ingested before content_hash existed: hash their bodies
+        bodies = self._legacy_bodies([p for p in points if "content_hash" not in (p.payload or {})])
+        # Points ingested before document_hash existed: hash their source file
+        file_hashes = self._source_hashes(sorted({
+            (p.payload or {}).get("source_file") or "" for p in points if "document_hash" not in (p.payload or {})
+        } - {""}))
+
+        keyed = []
+        for point in points:
+            payload = point.payload or {}
+            text_hash = payload.get("content_hash")
+            if text_hash is None:
+                text_hash = content_hash(bodies.get(str(point.id), ""))
+            if text_hash == content_hash("") and not payload.get("image_hash"):
+                continue  # Nothing to compare
+            doc_hash = payload.get("document_hash") or file_hashes.get(payload.get("source_file") or "")
+            if not doc_hash:
+                continue  # Unknown document
+            key = "\x1f".join([
+                payload.get("session_id") or "", doc_hash, str(payload["chunk_index"]),
+                payload.get("modality") or "", text_hash, payload.get("image_hash") or "",
+            ])
+            keyed.append((hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest(), point))
+
+        owners = self.state.owners([digest for digest, _ in keyed])
+        duplicates, claims = [], []
+        for digest, point in keyed:
+            owner = owners.get(digest)
+            if owner is None:
+                owners[digest] = str(point.id)
+                claims.append((digest, str(point.id)))
+            elif owner != str(point.id):
+                duplicates.append(point)
+        self.state.claim(claims)
+        return duplicates
+
+    def _legacy_bodies(self, points: List[qmodels.Record]) -> Dict[str, str]:
+        """
+        Chunk bodies of points without content_hash, by point id
+
+        One content-store lookup per page; points it does not hold keep their
+        body in the payload and are fetched with a single retrieve.
+        """
+        if not points:
+            return {}
+        stored = self.store.content_store.get_many([str(p.id) for p in points])
+        bodies = {point_id: row.get("content", "") for point_id, row in stored.items()}
+        inline = [p.id for p in points if str(p.id) not in bodies]
+        if inline:
+            records = self.store.qdrant_client.retrieve(
+                collection_name=self.store.collection_name,
+                ids=inline,
+                with_payload=["content"],
+                with_vectors=False,
+            )
+            bodies.update({str(r.id): (r.payload or {}).get("content", "") for r in records})
+        return bodies
+
+    def _source_hashes(self, sources: List[str]) -> Dict[str, str]:
+        """Document hashes of source files (each file is read once per run; unreadable ones are absent)"""
+        known = self.state.source_hashes(sources)
+        digests = {}
+        for source in sources:
+            if source in known:
+                continue
+            try:
+                digests[source] = document_hash(source)
+            except OSError as e:
+                logger.warning(f"[WARN] Cannot hash {source}, skipping its duplicates: {e}")
+        self.state.record_source_hashes(digests)
+        return {**known, **digests}
+
+    def _delete_sources(self, sources: List[str]) -> int:
+        """One filter delete for a batch of orphaned sources"""
+        source_filter = qmodels.Filter(must=[
+            qmodels.FieldCondition(key="source_file", match=qmodels.MatchAny(any=sources))
+        ])
+        deleted = self.store.qdrant_client.count(
+            collection_name=self.store.collection_name, count_filter=source_filter, exact=True
+        ).count
+        self.store.qdrant_client.delete(
+            collection_name=self.store.collection_name,
+            points_selector=qmodels.FilterSelector(filter=source_filter),
+            wait=True,
+        )
+        for source in sources:
+            self.store.catalog.remove_source(source)
+            self.store.content_store.delete(source_file=source)
+        self.store.catalog.touch()
+        self.store.invalidate_session_cache()
+        return deleted
+
+    def _delete_points(self, points: List[qmodels.Record]) -> int:
+        self.store.qdrant_client.delete(
+            collection_name=self.store.collection_name,
+            points_selector=qmodels.PointIdsList(points=[p.id for p in points]),
+            wait=True,
+        )
+        self.store.catalog.remove_points(p.payload for p in points)
+        self.store.content_store.delete(point_ids=[p.id for p in points])
+        self.store.catalog.touch()
+        self.store.invalidate_session_cache({(p.payload or {}).get("session_id") for p in points})
+        return len(points)
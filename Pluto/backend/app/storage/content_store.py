@@ -0,0 +1,192 @@
+"""
+Chunk Content Store - chunk bodies kept outside the Qdrant payload
+
+Qdrant payloads hold only the fields used for filtering and result metadata.
+The bulky text of a chunk (content, OCR text, descriptions, transcriptions)
+lives here, keyed by point id, and is fetched only for the final top-k of a
+query.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Payload fields moved out of Qdrant
+CONTENT_FIELDS = ["content", "description", "ocr_text", "transcription"]
+
+# Payload fields returned with search results (bodies are hydrated separately)
+RESULT_FIELDS = [
+    "chunk_id", "modality", "source_type", "source_file", "file_name", "session_id",
+    "document_topic", "chunk_index", "total_chunks",
+    "page_number", "total_pages", "pdf_id", "source_pdf",
+    "image_path", "image_filename", "image_hash", "occurrence_pages",
+    "width", "height", "ocr_confidence", "duration",
+]
+
+# uuid5 namespace of chunk point ids (changing it re-keys every collection)
+POINT_ID_NAMESPACE = uuid.UUID("6f0c2a52-3a4e-5d1b-9c77-2f4e8a1d9b30")
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of chunk text (whitespace-normalized), kept in the lean payload"""
+    return hashlib.sha1(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+def document_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of a source file's bytes (read in 1 MB blocks)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_point_id(
+    session_id: str,
+    document_hash: str,
+    text_hash: str,
+    modality: str,
+    occurrence: int = 0
+) -> str:
+    """
+    Deterministic point id of a chunk
+
+    The same file ingested twice into a session yields the same ids, so
+    re-ingest overwrites instead of duplicating and existing chunks can be
+    skipped before embedding.
+
+    Args:
+        session_id: Owning session
+        document_hash: Digest of the source file bytes
+        text_hash: content_hash of the chunk text (the image hash for images)
+        modality: Chunk modality
+        occurrence: Index among identical chunks of the same document, so
+            repeated boilerplate (page headers, logos) keeps one point each
+    """
+    key = "\x1f".join([session_id or "", document_hash, modality or "", text_hash, str(occurrence)])
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+def split_payload(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a payload into (lean Qdrant payload, body fields for the content store)"""
+    lean = {k: v for k, v in payload.items() if k not in CONTENT_FIELDS}
+    body = {k: payload[k] for k in CONTENT_FIELDS if payload.get(k)}
+    return lean, body
+
+
+class ChunkContentStore:
+    """
+    Persistent map of point id -> chunk body fields
+
+    Backed by SQLite (WAL) so API and worker processes share it. Rows carry
+    session_id and source_file so deletes can follow the Qdrant filter deletes
+    without scrolling the collection.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ChunkContentStore, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, path: Path = None):
+        if self._initialized:
+            return
+
+        self.db_path = Path(path or Path(settings.cache_dir) / "chunk_content.sqlite")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_content ("
+            " point_id TEXT PRIMARY KEY,"
+            " session_id TEXT,"
+            " source_file TEXT,"
+            " body TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunk_content_source ON chunk_content (session_id, source_file)"
+        )
+        self._conn.commit()
+
+        self._initialized = True
+        logger.info(f"Chunk content store at {self.db_path}")
+
+    def put_many(self, rows: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        """Store (point_id, lean payload, body) rows in one transaction"""
+        records = [
+            (str(point_id), payload.get("session_id"), payload.get("source_file"),
+             json.dumps(body, ensure_ascii=False))
+            for point_id, payload, body in rows if body
+        ]
+        if not records:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chunk_content VALUES (?, ?, ?, ?)", records)
+            self._conn.commit()
+
+    def get_many(self, point_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Body fields of the given points (points without a stored body are absent)"""
+        point_ids = [str(p) for p in point_ids]
+        if not point_ids:
+            return {}
+        placeholders = ",".join("?" * len(point_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT point_id, body FROM chunk_content WHERE point_id IN ({placeholders})",
+                point_ids
+            ).fetchall()
+        return {point_id: json.loads(body) for point_id, body in rows}
+
+    def move(self, point_ids: Iterable[str], source_file: str) -> int:
+        """Re-assign bodies to another source file (a re-upload of the same document)"""
+        rows = [(source_file, str(p)) for p in point_ids]
+        with self._lock:
+            cursor = self._conn.executemany("UPDATE chunk_content SET source_file = ? WHERE point_id = ?", rows)
+            self._conn.commit()
+        return cursor.rowcount
+
+    def delete(
+        self,
+        session_id: Optional[str] = None,
+        source_file: Optional[str] = None,
+        point_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """Delete bodies by point ids, or by session and/or source file"""
+        if point_ids is not None:
+            ids = [(str(p),) for p in point_ids]
+            with self._lock:
+                cursor = self._conn.executemany("DELETE FROM chunk_content WHERE point_id = ?", ids)
+                self._conn.commit()
+            return cursor.rowcount
+
+        conditions, params = [], []
+        if session_id:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if source_file:
+            conditions.append("source_file = ?")
+            params.append(source_file)
+        if not conditions:
+            raise ValueError("Refusing to delete without a filter")
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM chunk_content WHERE {' AND '.join(conditions)}", params
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunk_content").fetchone()[0]
@@ -0,0 +1,373 @@
+"""
+Knowledge Catalog - incrementally maintained topics/concepts of the knowledge base
+
+The graph nodes consult the catalog several times per query, so it lives in
+memory and is updated as points are written and deleted instead of scanning
+the collection. Each document (session_id, source_file) holds a refcount of
+its points; topics and concepts are refcounted by documents, globally and per
+session. The catalog is reconciled against Qdrant with a paginated scroll on
+startup.
+
+The documents live in SQLite (WAL) under cache_dir, shared by every API
+worker and script: each write is a per-row upsert that bumps a shared version
+counter, and each process keeps the derived refcounts in memory, refreshed
+from the rows changed since the version it last saw (checked at most every
+settings.knowledge_catalog_refresh_s on reads, at once after its own writes).
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DocumentKey = Tuple[str, str]  # (session_id, source_file)
+
+CATALOG_FIELDS = ["session_id", "source_file", "document_topic", "document_concepts"]
+
+
+class _CatalogState:
+    """Documents plus the topic/concept refcounts derived from them"""
+
+    def __init__(self):
+        self.documents: Dict[DocumentKey, Dict[str, Any]] = {}
+        self.topics: Counter = Counter()
+        self.concepts: Counter = Counter()
+        self.session_topics: Dict[str, Counter] = {}
+        self.session_concepts: Dict[str, Counter] = {}
+        self.session_documents: Counter = Counter()
+        self.session_points: Counter = Counter()
+
+    def add_document(self, key: DocumentKey, topic: str, concepts: List[str], points: int):
+        session_id = key[0]
+        self.session_points[session_id] += points
+        document = self.documents.get(key)
+        if document is not None:
+            document["points"] += points
+            return
+
+        concepts = list(dict.fromkeys(c for c in concepts if c))
+        self.documents[key] = {"topic": topic, "concepts": concepts, "points": points}
+        self.session_documents[session_id] += 1
+        if topic:
+            self.topics[topic] += 1
+            self.session_topics.setdefault(session_id, Counter())[topic] += 1
+        for concept in concepts:
+            self.concepts[concept] += 1
+            self.session_concepts.setdefault(session_id, Counter())[concept] += 1
+
+    def remove_document(self, key: DocumentKey):
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+
+        session_id = key[0]
+        _decrement(self.session_documents, session_id)
+        _decrement(self.session_points, session_id, document["points"])
+        if document["topic"]:
+            _decrement(self.topics, document["topic"])
+            _decrement(self.session_topics.get(session_id), document["topic"])
+        for concept in document["concepts"]:
+            _decrement(self.concepts, concept)
+            _decrement(self.session_concepts.get(session_id), concept)
+        if not self.session_documents.get(session_id):
+            self.session_topics.pop(session_id, None)
+            self.session_concepts.pop(session_id, None)
+
+
+def _decrement(counter: Optional[Counter], key: str, amount: int = 1):
+    if counter is None or key not in counter:
+        return
+    counter[key] -= amount
+    if counter[key] <= 0:
+        del counter[key]
+
+
+def _document_key(payload: Dict[str, Any]) -> Optional[DocumentKey]:
+    source_file = payload.get("source_file") or payload.get("file_name")
+    if not source_file:
+        return None
+    return payload.get("session_id") or "", source_file
+
+
+class KnowledgeCatalog:
+    """
+    Versioned catalog of topics and concepts, shared across processes
+
+    Reads are served from memory: snapshots are cached per session and
+    invalidated by the version counter, which increases on every change made
+    by any process. Other processes' changes are picked up by a version check
+    at most every settings.knowledge_catalog_refresh_s (own writes at once).
+    Callers can cache derived data against get()["version"].
+
+    Removed documents stay as tombstones (points = 0) until the next rebuild,
+    so other processes see the removal when they refresh.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(KnowledgeCatalog, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, path: Path = None):
+        if self._initialized:
+            return
+
+        self.path = Path(path or Path(settings.cache_dir) / "knowledge_catalog.sqlite")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._state = _CatalogState()
+        self._version = 0
+        self._refreshed_at = float("-inf")
+        self._snapshots: Dict[Optional[str], Dict[str, Any]] = {}
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS catalog_documents ("
+            " session_id TEXT NOT NULL,"
+            " source_file TEXT NOT NULL,"
+            " topic TEXT NOT NULL,"
+            " concepts TEXT NOT NULL,"
+            " points INTEGER NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " PRIMARY KEY (session_id, source_file))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_catalog_documents_version ON catalog_documents (version)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute(
+            "INSERT OR IGNORE INTO catalog_meta VALUES ('version', 0), ('rebuilt_at', 0)"
+        )
+
+        self._refresh(force=True)
+        logger.info(f"Knowledge catalog loaded: {len(self._state.documents)} documents")
+        self._initialized = True
+
+    @property
+    def version(self) -> int:
+        """Shared version of the catalog (bumped by every process's writes)"""
+        self._refresh()
+        return self._version
+
+    def get(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Topics and concepts of the whole knowledge base, or of one session
+
+        Returns:
+            Dict with topics, concepts (sorted), document_count, point_count and version
+        """
+        self._refresh()
+        snapshot = self._snapshots.get(session_id)
+        if snapshot is not None and snapshot["version"] == self._version:
+            return snapshot
+
+        with self._lock:
+            state = self._state
+            if session_id is None:
+                topics, concepts = state.topics, state.concepts
+                document_count = len(state.documents)
+                point_count = sum(state.session_points.values())
+            else:
+                topics = state.session_topics.get(session_id, Counter())
+                concepts = state.session_concepts.get(session_id, Counter())
+                document_count = state.session_documents.get(session_id, 0)
+                point_count = state.session_points.get(session_id, 0)
+
+            snapshot = {
+                "topics": sorted(topics),
+                "concepts": sorted(concepts),
+                "document_count": document_count,
+                "point_count": point_count,
+                "version": self._version,
+            }
+            self._snapshots[session_id] = snapshot
+        return snapshot
+
+    def session_point_count(self, session_id: str) -> int:
+        """Number of points stored for a session"""
+        self._refresh()
+        return self._state.session_points.get(session_id, 0)
+
+    def add_points(self, payloads: Iterable[Dict[str, Any]]):
+        """Register newly written points (called once their upsert succeeded)"""
+        grouped: Dict[DocumentKey, List[Any]] = {}
+        for payload in payloads:
+            key = _document_key(payload or {})
+            if key is None:
+                continue
+            entry = grouped.get(key)
+            if entry is None:
+                grouped[key] = [payload.get("document_topic") or "", payload.get("document_concepts") or [], 1]
+            else:
+                entry[2] += 1
+
+        if not grouped:
+            return
+        with self._write() as version:
+            # A document keeps the topic/concepts it was first registered with
+            self._conn.executemany(
+                "INSERT INTO catalog_documents VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, source_file) DO UPDATE SET "
+                " topic = CASE WHEN points > 0 THEN topic ELSE excluded.topic END,"
+                " concepts = CASE WHEN points > 0 THEN concepts ELSE excluded.concepts END,"
+                " points = points + excluded.points,"
+                " version = excluded.version",
+                [
+                    (key[0], key[1], topic, json.dumps(concepts, ensure_ascii=False), points, version)
+                    for key, (topic, concepts, points) in grouped.items()
+                ],
+            )
+
+    def remove_session(self, session_id: str):
+        """Drop every document of a session"""
+        with self._write() as version:
+            self._conn.execute(
+                "UPDATE catalog_documents SET points = 0, version = ? WHERE session_id = ? AND points > 0",
+                (version, session_id),
+            )
+
+    def remove_source(self, source_file: str, session_id: Optional[str] = None):
+        """Drop a document (from one session, or from all sessions)"""
+        with self._write() as version:
+            if session_id is None:
+                self._conn.execute(
+                    "UPDATE catalog_documents SET points = 0, version = ? WHERE source_file = ? AND points > 0",
+                    (version, source_file),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE catalog_documents SET points = 0, version = ? "
+                    "WHERE session_id = ? AND source_file = ? AND points > 0",
+                    (version, session_id, source_file),
+                )
+
+    def remove_points(self, payloads: Iterable[Dict[str, Any]]):
+        """Release individual points; documents disappear when their last point does"""
+        released = Counter(k for k in (_document_key(p or {}) for p in payloads) if k is not None)
+        if not released:
+            return
+        with self._write() as version:
+            self._conn.executemany(
+                "UPDATE catalog_documents SET points = MAX(points - ?, 0), version = ? "
+                "WHERE session_id = ? AND source_file = ? AND points > 0",
+                [(points, version, key[0], key[1]) for key, points in released.items()],
+            )
+
+    def touch(self):
+        """Bump the version for a collection change the document refcounts did not see"""
+        with self._write():
+            pass
+
+    def rebuild(self, records: Iterable[Any]):
+        """
+        Rebuild from scrolled Qdrant records (payloads restricted to CATALOG_FIELDS)
+
+        The scroll runs without holding the database. Documents written or
+        removed meanwhile (by any process) carry a newer row version; their
+        live rows are kept as they are, since the scroll may have seen any
+        part of those writes. Every other row is replaced by the scrolled
+        counts.
+        """
+        with self._lock:
+            started_at = self._shared_version()
+
+        state = _CatalogState()
+        total = 0
+        for record in records:
+            payload = record.payload if hasattr(record, "payload") else record
+            key = _document_key(payload or {})
+            total += 1
+            if key is not None:
+                state.add_document(
+                    key, payload.get("document_topic") or "",
+                    payload.get("document_concepts") or [], 1
+                )
+
+        with self._write() as version:
+            changed = {
+                (session_id, source_file) for session_id, source_file in self._conn.execute(
+                    "SELECT session_id, source_file FROM catalog_documents WHERE version > ?", (started_at,)
+                )
+            }
+            self._conn.execute("DELETE FROM catalog_documents WHERE version <= ?", (started_at,))
+            self._conn.executemany(
+                "INSERT INTO catalog_documents VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key[0], key[1], document["topic"], json.dumps(document["concepts"], ensure_ascii=False),
+                     document["points"], version)
+                    for key, document in state.documents.items() if key not in changed
+                ],
+            )
+            self._conn.execute("UPDATE catalog_meta SET value = ? WHERE key = 'rebuilt_at'", (version,))
+        logger.info(
+            f"[OK] Knowledge catalog rebuilt: {len(self._state.documents)} documents, "
+            f"{len(self._state.topics)} topics from {total} points"
+        )
+
+    @contextmanager
+    def _write(self) -> Iterator[int]:
+        """Write transaction at a new shared version; local state is refreshed after commit"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+                yield self._shared_version()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._refresh(force=True)
+
+    def _shared_version(self) -> int:
+        return self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+
+    def _refresh(self, force: bool = False):
+        """
+        Apply rows changed by any process since the version this one last saw
+
+        Without force, the shared version is checked at most every
+        settings.knowledge_catalog_refresh_s, so hot-path reads cost no query.
+        """
+        if not force and time.monotonic() - self._refreshed_at < settings.knowledge_catalog_refresh_s:
+            return
+        with self._lock:
+            self._refreshed_at = time.monotonic()
+            version, rebuilt_at = self._conn.execute(
+                "SELECT MAX(CASE WHEN key = 'version' THEN value END),"
+                " MAX(CASE WHEN key = 'rebuilt_at' THEN value END) FROM catalog_meta"
+            ).fetchone()
+            if version == self._version:
+                return
+
+            if rebuilt_at > self._version:
+                self._state = _CatalogState()  # Rows may have been dropped: reload them all
+                rows = self._conn.execute(
+                    "SELECT session_id, source_file, topic, concepts, points FROM catalog_documents WHERE points > 0"
+                )
+            else:
+                rows = self._conn.execute(
+                    "SELECT session_id, source_file, topic, concepts, points FROM catalog_documents WHERE version > ?",
+                    (self._version,),
+                )
+            for session_id, source_file, topic, concepts, points in rows.fetchall():
+                key = (session_id, source_file)
+                self._state.remove_document(key)
+                if points > 0:
+                    self._state.add_document(key, topic, json.loads(concepts), points)
+            self._version = version
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,12 +2,12 @@
 Qdrant client for vector storage with Named Vectors architecture
 """
 import logging
-from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+from typing import List, Dict, Any, Iterator, Optional
 from qdrant_client.http import models
 import requests
 
 from app.config import settings
+from app.storage.qdrant.connection import create_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +26,7 @@ class QdrantClientWrapper:
     
     def __init__(self):
         if self._client is None:
-            self._client = QdrantClient(
-                host=settings.qdrant_host,
-                port=settings.qdrant_port,
+            self._client = create_client(
                 timeout=30.0,
                 prefer_grpc=False  # Use HTTP for better compatibility
             )
@@ -145,8 +143,25 @@ class QdrantClientWrapper:
             logger.error(f"Failed to delete collection: {e}")
             raise
 
+    def iter_points(self, filter_conditions: Optional[models.Filter] = None, page_size: int = 1000,
+                    with_payload=True, with_vectors=False) -> Iterator[models.Record]:
+        """Lazily iterate over all (matching) points, one page per request"""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=settings.collection_name,
+                scroll_filter=filter_conditions,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=with_vectors
+            )
+            yield from points
+            if offset is None:
+                return
+
     def scroll_all_points(self, limit: int = 10000) -> List[models.Record]:
-        """Scroll through all points in collection"""
+        """Scroll through up to `limit` points in the collection (iter_points reads all of them lazily)"""
         try:
             scroll_result = self.client.scroll(
                 collection_name=settings.collection_name,
@@ -159,7 +174,7 @@ class QdrantClientWrapper:
             return []
 
     def scroll_points(self, filter_conditions: Optional[models.Filter] = None, limit: int = 1000) -> List[models.Record]:
-        """Scroll through points with optional filtering"""
+        """Scroll through up to `limit` matching points (iter_points reads all of them lazily)"""
         try:
             scroll_result = self.client.scroll(
                 collection_name=settings.collection_name,
@@ -170,4 +185,4 @@ class QdrantClientWrapper:
             return scroll_result[0]  # Return points, ignore next_page_offset
         except Exception as e:
             logger.error(f"Failed to scroll points: {e}")
-            return []
\ No newline at end of file
+            return []
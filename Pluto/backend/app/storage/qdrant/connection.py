@@ -0,0 +1,133 @@
+"""
+Qdrant connection factory - server or embedded local mode
+
+settings.qdrant_mode selects the backend:
+- server: QdrantClient/AsyncQdrantClient against qdrant_host:qdrant_port
+- local:  qdrant-client's embedded mode persisted to settings.qdrant_local_dir
+- memory: embedded mode held in process memory (tests, offline benchmarks)
+
+Embedded storage belongs to a single client per process (a path is locked by
+the client that opens it, and each ':memory:' client is its own database), so
+every store in the process shares one embedded client. Its calls are
+serialized, and async callers reach it through a thread-offloading adapter.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from typing import Any, Optional, Union
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+QDRANT_MODES = ("server", "local", "memory")
+
+_embedded_client: Optional["EmbeddedQdrantClient"] = None
+_embedded_lock = threading.Lock()
+
+
+class EmbeddedQdrantClient:
+    """
+    Thread-safe proxy over an embedded QdrantClient
+
+    Exposes the QdrantClient API; each call holds a re-entrant lock because
+    the embedded engine is not designed for concurrent writers.
+    """
+
+    def __init__(self, client: QdrantClient, location: str):
+        self._client = client
+        self._lock = threading.RLock()
+        self.location = location
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return call
+
+
+class AsyncEmbeddedQdrantClient:
+    """AsyncQdrantClient-compatible adapter running embedded calls off the event loop"""
+
+    def __init__(self, client: EmbeddedQdrantClient):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+    async def close(self):
+        """The embedded client is shared with the sync stores and outlives this adapter"""
+
+
+def qdrant_mode() -> str:
+    mode = settings.qdrant_mode.lower()
+    if mode not in QDRANT_MODES:
+        raise ValueError(f"Unknown qdrant_mode '{mode}', expected one of {QDRANT_MODES}")
+    return mode
+
+
+def is_embedded() -> bool:
+    """Embedded mode searches by brute force: no payload indexes or HNSW search params"""
+    return qdrant_mode() != "server"
+
+
+def describe_backend() -> str:
+    """Human-readable location of the configured backend"""
+    mode = qdrant_mode()
+    if mode == "server":
+        return f"{settings.qdrant_host}:{settings.qdrant_port}"
+    if mode == "memory":
+        return "embedded (in-memory)"
+    return f"embedded ({settings.qdrant_local_dir})"
+
+
+def get_embedded_client() -> EmbeddedQdrantClient:
+    """The process-wide embedded client for 'local' or 'memory' mode"""
+    global _embedded_client
+    with _embedded_lock:
+        if _embedded_client is None:
+            if qdrant_mode() == "memory":
+                location = ":memory:"
+                client = QdrantClient(location=location)
+            else:
+                settings.qdrant_local_dir.mkdir(parents=True, exist_ok=True)
+                location = str(settings.qdrant_local_dir)
+                client = QdrantClient(path=location)
+            _embedded_client = EmbeddedQdrantClient(client, location)
+            logger.info(f"[OK] Embedded Qdrant opened at {location}")
+        return _embedded_client
+
+
+def create_client(**kwargs) -> Union[QdrantClient, EmbeddedQdrantClient]:
+    """
+    Sync client for the configured backend
+
+    Args:
+        **kwargs: Extra QdrantClient options for server mode (e.g. timeout)
+    """
+    if qdrant_mode() != "server":
+        return get_embedded_client()
+    kwargs.setdefault("prefer_grpc", settings.qdrant_prefer_grpc)
+    return QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port, **kwargs)
+
+
+def create_async_client(**kwargs) -> Union[AsyncQdrantClient, AsyncEmbeddedQdrantClient]:
+    """Async client for the configured backend (see create_client)"""
+    if qdrant_mode() != "server":
+        return AsyncEmbeddedQdrantClient(get_embedded_client())
+    kwargs.setdefault("prefer_grpc", settings.qdrant_prefer_grpc)
+    return AsyncQdrantClient(host=settings.qdrant_host, port=settings.qdrant_port, **kwargs)
@@ -0,0 +1,316 @@
+"""
+Session Vector Cache - in-process brute-force search over small sessions
+
+Most sessions hold a few hundred to a few thousand chunks. For those, one
+matrix-vector product over a contiguous float32 matrix is cheaper than a
+Qdrant round trip plus a filtered search. Each cached session keeps one
+L2-normalized matrix per named vector space together with the result payloads;
+sessions are loaded on first query (or right after an ingest) and evicted
+least-recently-used by total bytes. Sessions above the point limit, and
+queries with filters on fields the cache does not hold, go to Qdrant.
+
+Entries are dropped when this process writes to their session and reloaded
+after ttl_s at the latest, which bounds staleness from writes made by other
+processes.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from qdrant_client.http import models as qmodels
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(stored: Any, value: Any) -> bool:
+    """Qdrant MatchValue semantics: equality, or membership for array payloads"""
+    if isinstance(stored, list):
+        return value in stored
+    return stored == value
+
+
+class SessionVectors:
+    """Vectors and result payloads of one session"""
+
+    def __init__(self, records: List[qmodels.Record], vector_spaces: Sequence[str], fields: Optional[Sequence[str]]):
+        self.ids = [record.id for record in records]
+        self.positions = {point_id: i for i, point_id in enumerate(self.ids)}
+        self.payloads = [record.payload or {} for record in records]
+        self.fields = None if fields is None else frozenset(fields)  # None = full payloads
+        self.loaded_at = time.monotonic()
+
+        # Per space: positions of the points carrying that vector, and their rows
+        self.spaces: Dict[str, tuple] = {}
+        self.row_of: Dict[str, np.ndarray] = {}  # Per space: point position -> matrix row (-1 = no vector)
+        for space in vector_spaces:
+            rows, vectors = [], []
+            for i, record in enumerate(records):
+                vector = (record.vector or {}).get(space) if isinstance(record.vector, dict) else None
+                if vector:
+                    rows.append(i)
+                    vectors.append(vector)
+            if not rows:
+                continue
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1.0)
+            self.spaces[space] = (np.asarray(rows, dtype=np.int64), matrix)
+            row_of = np.full(len(records), -1, dtype=np.int64)
+            row_of[rows] = np.arange(len(rows))
+            self.row_of[space] = row_of
+
+        self.nbytes = sum(rows.nbytes + matrix.nbytes for rows, matrix in self.spaces.values()) + sum(
+            row_of.nbytes for row_of in self.row_of.values()
+        ) + sum(len(json.dumps(payload, default=str)) for payload in self.payloads)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def supports(self, filters: Optional[Dict[str, Any]]) -> bool:
+        """Whether every filter field is held in the cached payloads"""
+        return not filters or self.fields is None or set(filters) <= self.fields
+
+    def filter_mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        return np.fromiter(
+            (all(_matches(payload.get(key), value) for key, value in filters.items()) for payload in self.payloads),
+            dtype=bool,
+            count=len(self.payloads),
+        )
+
+    def search(
+        self,
+        query: np.ndarray,
+        space: str,
+        n_results: int,
+        score_threshold: float,
+        mask: Optional[np.ndarray]
+    ) -> List[qmodels.ScoredPoint]:
+        """Top n_results points of one space by cosine similarity, best first"""
+        if space not in self.spaces or n_results <= 0:
+            return []
+        rows, matrix = self.spaces[space]
+        scores = matrix @ query
+        valid = scores >= score_threshold
+        if mask is not None:
+            valid &= mask[rows]
+        candidates = np.flatnonzero(valid)
+        if len(candidates) > n_results:
+            candidates = candidates[np.argpartition(-scores[candidates], n_results - 1)[:n_results]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            qmodels.ScoredPoint(
+                id=self.ids[rows[j]],
+                version=0,
+                score=float(scores[j]),
+                payload=dict(self.payloads[rows[j]]),  # Callers hydrate result metadata in place
+            )
+            for j in candidates
+        ]
+
+    def similarities(self, query: np.ndarray, space: str, point_ids: Sequence[Any]) -> List[qmodels.ScoredPoint]:
+        """Cosine similarity of the given points in one space (points without that vector are left out)"""
+        if space not in self.spaces:
+            return []
+        matrix = self.spaces[space][1]
+        row_of = self.row_of[space]
+        scored = []
+        for point_id in point_ids:
+            row = row_of[self.positions[point_id]]
+            if row >= 0:
+                scored.append(qmodels.ScoredPoint(id=point_id, version=0, score=float(matrix[row] @ query)))
+        return scored
+
+
+def _unit_query(query_embedding: Union[np.ndarray, List[float]]) -> Optional[np.ndarray]:
+    query = np.asarray(query_embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(query)
+    return query / norm if norm else None
+
+
+class SessionVectorCache:
+    """
+    LRU cache of SessionVectors, bounded by total bytes
+
+    Args:
+        store: VectorStore the sessions are loaded from (scroll_pages)
+        max_bytes: Budget across all cached sessions
+        max_points: Sessions larger than this are never cached
+        ttl_s: Age after which an entry is reloaded
+    """
+
+    def __init__(self, store, max_bytes: int = None, max_points: int = None, ttl_s: float = None):
+        self.store = store
+        self.max_bytes = max_bytes if max_bytes is not None else settings.session_cache_max_bytes
+        self.max_points = max_points if max_points is not None else settings.session_cache_max_points
+        self.ttl_s = ttl_s if ttl_s is not None else settings.session_cache_ttl_s
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, SessionVectors]" = OrderedDict()
+        self._too_large: Dict[str, float] = {}  # session -> time it was found over max_points
+        self._loading: set = set()
+        self._stale: set = set()  # Loading sessions invalidated mid-load (their result is not kept)
+        self.bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0}
+
+    def search(
+        self,
+        session_id: str,
+        query_embedding: Union[np.ndarray, List[float]],
+        vector_spaces: Sequence[str],
+        n_results: int,
+        score_threshold: float,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[List[qmodels.ScoredPoint]]]:
+        """
+        Scored points per vector space, or None when Qdrant has to answer
+
+        Args:
+            session_id: Session to search (required)
+            query_embedding: Query vector (array or list)
+            vector_spaces: Named vector spaces to search
+            n_results: Results per space
+            score_threshold: Minimum cosine similarity
+            filters: Exact-match payload filters
+
+        Returns:
+            One list of ScoredPoint per vector space, best first
+        """
+        entry = self.get(session_id)
+        if entry is None or not entry.supports(filters):
+            return None
+
+        query = _unit_query(query_embedding)
+        if query is None:
+            return None
+
+        mask = entry.filter_mask(filters)
+        return [entry.search(query, space, n_results, score_threshold, mask) for space in vector_spaces]
+
+    def similarities(
+        self,
+        session_id: str,
+        query_embedding: Union[np.ndarray, List[float]],
+        vector_spaces: Sequence[str],
+        point_ids: Sequence[Any]
+    ) -> Optional[List[List[qmodels.ScoredPoint]]]:
+        """
+        Cosine similarity of specific points, or None when Qdrant has to score them
+
+        Args:
+            session_id: Session holding the points
+            query_embedding: Query vector (array or list)
+            vector_spaces: Named vector spaces to score in
+            point_ids: Points to score (all must be in the cached session)
+
+        Returns:
+            One list of ScoredPoint per vector space, in point_ids order
+        """
+        entry = self.get(session_id)
+        query = _unit_query(query_embedding)
+        if entry is None or query is None or any(point_id not in entry.positions for point_id in point_ids):
+            return None
+        return [entry.similarities(query, space, point_ids) for space in vector_spaces]
+
+    def get(self, session_id: str) -> Optional[SessionVectors]:
+        """Cached vectors of a session, loading them if the session is small enough"""
+        if not session_id:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry.loaded_at < self.ttl_s:
+                self._entries.move_to_end(session_id)
+                self.counters["hits"] += 1
+                return entry
+            self.counters["misses"] += 1
+            flagged = self._too_large.get(session_id)
+            if flagged is not None and now - flagged < self.ttl_s:
+                return None
+            if session_id in self._loading:
+                return None  # Another thread is loading it; Qdrant answers meanwhile
+            self._loading.add(session_id)
+
+        try:
+            return self._load(session_id)
+        finally:
+            with self._lock:
+                self._loading.discard(session_id)
+                self._stale.discard(session_id)
+
+    def _load(self, session_id: str) -> Optional[SessionVectors]:
+        if self.store.catalog.session_point_count(session_id) > self.max_points:
+            self._mark_too_large(session_id)
+            return None
+
+        started = time.perf_counter()
+        payload_fields = self.store.result_payload
+        records: List[qmodels.Record] = []
+        for page in self.store.scroll_pages(
+            session_id,
+            page_size=1000,
+            with_payload=payload_fields,
+            with_vectors=list(self.store.vector_config),
+        ):
+            records.extend(page)
+            if len(records) > self.max_points:  # The catalog may not know the session yet
+                self._mark_too_large(session_id)
+                return None
+
+        entry = SessionVectors(records, list(self.store.vector_config), None if payload_fields is True else payload_fields)
+        if entry.nbytes > self.max_bytes:
+            self._mark_too_large(session_id)
+            return None
+
+        with self._lock:
+            if session_id in self._stale:
+                return entry  # Written to while loading: answer this query, don't keep it
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._entries[session_id] = entry
+            self.bytes += entry.nbytes
+            self._too_large.pop(session_id, None)
+            self.counters["loads"] += 1
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.counters["evictions"] += 1
+
+        logger.info(
+            f"Cached session {session_id}: {len(entry)} points, {entry.nbytes / 1e6:.1f} MB "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return entry
+
+    def _mark_too_large(self, session_id: str):
+        with self._lock:
+            self._too_large[session_id] = time.monotonic()
+
+    def invalidate(self, session_ids: Optional[Sequence[str]] = None):
+        """Drop the given sessions, or every session when None"""
+        with self._lock:
+            if session_ids is None:
+                self._stale |= self._loading
+                self._entries.clear()
+                self._too_large.clear()
+                self.bytes = 0
+                return
+            for session_id in session_ids:
+                entry = self._entries.pop(session_id, None)
+                if entry is not None:
+                    self.bytes -= entry.nbytes
+                self._too_large.pop(session_id, None)
+                if session_id in self._loading:
+                    self._stale.add(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._entries), "bytes": self.bytes, **self.counters}
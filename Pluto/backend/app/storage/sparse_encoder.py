@@ -0,0 +1,89 @@
+"""
+Sparse BM25 encoding - lexical vectors stored next to the dense CLIP vectors
+
+Document vectors carry the BM25 term-frequency part of each term weight
+(saturation k1, length normalization b). The IDF part is applied by Qdrant
+(Modifier.IDF on the sparse vector), from document frequencies over the whole
+collection, so weights never need recomputing as the collection grows.
+Query vectors weight each distinct term 1.0. Terms map to sparse indices by
+CRC32, so no vocabulary has to be stored.
+"""
+import re
+import zlib
+from collections import Counter
+from typing import List, Optional
+
+from qdrant_client.http import models as qmodels
+
+from app.config import settings
+
+# Named sparse vector in the collection
+SPARSE_VECTOR = "text_bm25"
+
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'it', 'its', 'as', 'if', 'then', 'so', 'than'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms without stopwords and single characters"""
+    if not text:
+        return []
+    tokens = re.findall(r'\b[a-z0-9]+\b', text.lower())
+    return [t for t in tokens if t not in STOPWORDS and len(t) > 1]
+
+
+def term_index(term: str) -> int:
+    """Sparse vector index of a term"""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def _sparse_vector(weights: Counter) -> qmodels.SparseVector:
+    # Distinct terms can share a CRC32; their weights add up
+    merged = Counter()
+    for term, weight in weights.items():
+        merged[term_index(term)] += weight
+    indices = sorted(merged)
+    return qmodels.SparseVector(indices=indices, values=[float(merged[i]) for i in indices])
+
+
+def encode_document(
+    text: str,
+    k1: float = None,
+    b: float = None,
+    avg_length: float = None
+) -> Optional[qmodels.SparseVector]:
+    """
+    BM25 term-frequency weights of a chunk
+
+    Args:
+        text: Chunk text
+        k1: Term frequency saturation (default settings.bm25_k1)
+        b: Length normalization (default settings.bm25_b)
+        avg_length: Average chunk length in terms (default settings.bm25_avg_doc_length)
+
+    Returns:
+        Sparse vector, or None when the text has no terms
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    k1 = settings.bm25_k1 if k1 is None else k1
+    b = settings.bm25_b if b is None else b
+    avg_length = avg_length or settings.bm25_avg_doc_length
+
+    norm = k1 * (1 - b + b * len(tokens) / avg_length)
+    counts = Counter(tokens)
+    return _sparse_vector(Counter({term: tf * (k1 + 1) / (tf + norm) for term, tf in counts.items()}))
+
+
+def encode_query(text: str) -> Optional[qmodels.SparseVector]:
+    """Query terms with weight 1.0 each (None when the query has no terms)"""
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    return _sparse_vector(Counter(dict.fromkeys(tokens, 1.0)))
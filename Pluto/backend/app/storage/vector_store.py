@@ -1,19 +1,884 @@
 """
 Qdrant Vector Store - Fixed collection info method
 """
+import json
+import random
+import threading
+import time
 import uuid
-from typing import List, Dict, Any, Optional
-from qdrant_client import QdrantClient
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import List, Dict, Any, Deque, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
 from qdrant_client.http import models as qmodels
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.hybrid.fusion import reciprocal_rank_fusion
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 
 from app.config import settings
 from app.core.logging_config import get_safe_logger
+from app.storage.content_store import CONTENT_FIELDS, RESULT_FIELDS, ChunkContentStore, split_payload
+from app.storage.knowledge_catalog import CATALOG_FIELDS, KnowledgeCatalog
+from app.storage.qdrant.connection import create_client, is_embedded
+from app.storage.session_cache import SessionVectorCache
+from app.storage.sparse_encoder import SPARSE_VECTOR, encode_query
 
 logger = get_safe_logger(__name__)
 
+VECTOR_SPACES = ("text_embedding", "image_embedding", "audio_embedding")
+MODALITIES = ("text", "image", "audio")
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+FUSION_MODES = ("rrf", "weighted")
+RRF_K = 2  # Qdrant's reciprocal-rank constant: rank r (0-based) of a weight-w branch scores 1 / ((r + 1) / w + RRF_K - 1)
+
+
+def quantization_config(mode: str = None) -> Optional[qmodels.QuantizationConfig]:
+    """Quantization config for a named vector ('none', 'scalar' int8 or 'binary')"""
+    mode = (mode or settings.qdrant_quantization).lower()
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+    
+    always_ram = settings.qdrant_quantization_always_ram
+    if mode == "scalar":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=always_ram,
+            )
+        )
+    if mode == "binary":
+        return qmodels.BinaryQuantization(
+            binary=qmodels.BinaryQuantizationConfig(always_ram=always_ram)
+        )
+    return None
+
+
+def build_vector_config(
+    quantization: str = None,
+    m: int = None,
+    ef_construct: int = None,
+    on_disk: bool = None,
+) -> Dict[str, qmodels.VectorParams]:
+    """Named vector params with HNSW and quantization settings (defaults from settings)"""
+    return {
+        name: qmodels.VectorParams(
+            size=settings.embedding_dimension,  # 512 for CLIP
+            distance=qmodels.Distance.COSINE,
+            hnsw_config=qmodels.HnswConfigDiff(
+                m=m or settings.qdrant_hnsw_m,
+                ef_construct=ef_construct or settings.qdrant_hnsw_ef_construct,
+                payload_m=settings.qdrant_hnsw_payload_m,
+            ),
+            quantization_config=quantization_config(quantization),
+            on_disk=settings.qdrant_vectors_on_disk if on_disk is None else on_disk,
+        )
+        for name in VECTOR_SPACES
+    }
+
+
+def build_sparse_vector_config() -> Dict[str, qmodels.SparseVectorParams]:
+    """BM25 sparse vector params: Qdrant applies IDF over the collection at query time"""
+    return {
+        SPARSE_VECTOR: qmodels.SparseVectorParams(
+            index=qmodels.SparseIndexParams(on_disk=settings.qdrant_vectors_on_disk),
+            modifier=qmodels.Modifier.IDF,
+        )
+    }
+
+
+def build_search_params(
+    hnsw_ef: int = None,
+    quantization: str = None,
+    oversampling: float = None,
+    rescore: bool = None,
+    exact: bool = False,
+) -> qmodels.SearchParams:
+    """Search-time HNSW ef and quantization oversampling/rescoring (defaults from settings)"""
+    quantization = (quantization or settings.qdrant_quantization).lower()
+    quantization_params = None
+    if quantization != "none":
+        quantization_params = qmodels.QuantizationSearchParams(
+            rescore=settings.qdrant_quantization_rescore if rescore is None else rescore,
+            oversampling=oversampling or settings.qdrant_quantization_oversampling,
+        )
+    return qmodels.SearchParams(
+        hnsw_ef=hnsw_ef or settings.qdrant_hnsw_ef,
+        exact=exact,
+        quantization=quantization_params,
+    )
+
+
+def session_shard_key(session_id: Optional[str], shards: int) -> Optional[str]:
+    """Custom shard key a session hashes into (None without custom sharding or session)"""
+    if not shards or not session_id:
+        return None
+    return f"sessions_{zlib.crc32(session_id.encode('utf-8')) % shards}"
+
+
+def _max_expression(variables: List[str]) -> qmodels.Expression:
+    """Formula for the largest of the variables, as max(a, b) = (a + b + |a - b|) / 2"""
+    expression = variables[0]
+    for variable in variables[1:]:
+        expression = qmodels.MultExpression(mult=[0.5, qmodels.SumExpression(sum=[
+            expression, variable,
+            qmodels.AbsExpression(abs=qmodels.SumExpression(sum=[expression, qmodels.NegExpression(neg=variable)])),
+        ])])
+    return expression
+
+
+def _fusion_mode(fusion: Optional[str]) -> str:
+    """Validated hybrid fusion mode (default settings.hybrid_fusion)"""
+    fusion = (fusion or settings.hybrid_fusion).lower()
+    if fusion not in FUSION_MODES:
+        raise ValueError(f"Unknown fusion {fusion!r}; expected one of {FUSION_MODES}")
+    return fusion
+
+
+def _rrf_weights(dense_branches: int) -> List[float]:
+    """Reciprocal-rank weights of the hybrid branches, BM25 last"""
+    return [settings.dense_weight] * dense_branches + [settings.bm25_weight]
+
+
+def _rrf_scale(weights: List[float]) -> float:
+    """Factor that maps a weighted RRF score to 1.0 for a candidate ranked first by every branch"""
+    best = sum(1.0 / (1.0 / w + RRF_K - 1) for w in weights if w > 0)
+    return 1.0 / best if best > 0 else 0.0
+
+
+class PointBatch(list):
+    """Points of one upsert, with the content-store rows to write once it succeeded"""
 
-class VectorStore:
+    def __init__(self, points: Iterable[qmodels.PointStruct] = (), bodies: Optional[List[tuple]] = None):
+        super().__init__(points)
+        self.bodies = bodies or []
+
+
+class BaseVectorStore:
+    """
+    Request building and result formatting shared by the sync and async stores
+    """
+    
+    collection_name: str
+    search_params: Optional[qmodels.SearchParams] = None
+    exact_search_params: Optional[qmodels.SearchParams] = None
+    session_shards: int = 0
+    sparse_vectors: bool = False  # Collection has the BM25 sparse vector and bm25_enabled is set
+    session_cache: Optional[SessionVectorCache] = None
+    
+    @property
+    def catalog(self) -> KnowledgeCatalog:
+        return KnowledgeCatalog()
+    
+    def get_knowledge_catalog(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Topics and concepts in the knowledge base (O(1), no collection scan)
+        
+        Args:
+            session_id: Restrict to one session's documents
+            
+        Returns:
+            Dict with topics, concepts, document_count and version
+        """
+        return self.catalog.get(session_id)
+    
+    @property
+    def content_store(self) -> ChunkContentStore:
+        return ChunkContentStore()
+    
+    @property
+    def result_payload(self) -> Union[bool, List[str]]:
+        """Payload selector for search results (lean fields when bodies live in the content store)"""
+        return RESULT_FIELDS if settings.qdrant_external_content else True
+    
+    def _stats_cache_get(self, session_id: Optional[str], exact: bool) -> Optional[Dict[str, Any]]:
+        """Stats computed at the current shared catalog version within the TTL, if any"""
+        cached = getattr(self, "_stats_cache", {}).get((session_id, exact))
+        if cached is None:
+            return None
+        stats, cached_at = cached
+        if stats["version"] != self.catalog.version or time.monotonic() - cached_at >= settings.qdrant_stats_cache_ttl_s:
+            return None
+        return stats
+    
+    def _stats_cache_put(
+        self,
+        session_id: Optional[str],
+        exact: bool,
+        version: int,
+        total: int,
+        modality_counts: Dict[str, int]
+    ) -> Dict[str, Any]:
+        scope = session_id or "all"
+        # The ETag covers the counts themselves, so every worker sends the same
+        # ETag for the same data even if a write bypassed the catalog
+        digest = zlib.crc32(json.dumps([total, modality_counts], sort_keys=True).encode("utf-8"))
+        stats = {
+            "total_documents": total,
+            "modalities": modality_counts,
+            "collection_name": self.collection_name,
+            "embedding_dimension": settings.embedding_dimension,
+            "session_id": session_id,
+            "exact": exact,
+            "version": version,
+            "etag": f'W/"{self.collection_name}-{scope}-{int(exact)}-{version}-{digest:08x}"',
+        }
+        if not hasattr(self, "_stats_cache"):
+            self._stats_cache = {}
+        self._stats_cache[(session_id, exact)] = (stats, time.monotonic())
+        return stats
+    
+    def _search_params_for(self, session_id: Optional[str]) -> Optional[qmodels.SearchParams]:
+        """
+        Exact search for small sessions, HNSW for large ones and unfiltered queries
+        
+        A brute-force scan of a few thousand points is cheaper and more
+        accurate than a filtered graph traversal; session sizes come from the
+        knowledge catalog, so routing costs no request.
+        """
+        if not session_id or self.search_params is None or self.exact_search_params is None:
+            return self.search_params
+        if self.catalog.session_point_count(session_id) <= settings.qdrant_exact_search_max_points:
+            return self.exact_search_params
+        return self.search_params
+    
+    def _shard_key(self, session_id: Optional[str]) -> Optional[str]:
+        return session_shard_key(session_id, self.session_shards)
+    
+    def _group_by_shard(
+        self,
+        points: List[qmodels.PointStruct]
+    ) -> List[Tuple[Optional[str], List[qmodels.PointStruct]]]:
+        """(shard key, points) groups for an upsert; one unkeyed group without custom sharding"""
+        if not self.session_shards:
+            return [(None, points)]
+        groups: Dict[str, List[qmodels.PointStruct]] = {}
+        for point in points:
+            key = self._shard_key((point.payload or {}).get("session_id") or "default")
+            groups.setdefault(key, []).append(point)
+        return list(groups.items())
+    
+    def _split_by_shard(self, batch: PointBatch) -> List[Tuple[Optional[str], PointBatch]]:
+        """_group_by_shard for a built batch, each group keeping its content-store rows"""
+        if not self.session_shards:
+            return [(None, batch)]
+        bodies = {row[0]: row for row in batch.bodies}
+        return [
+            (key, PointBatch(group, [bodies[point.id] for point in group if point.id in bodies]))
+            for key, group in self._group_by_shard(batch)
+        ]
+    
+    @staticmethod
+    def _to_wire(vector: Union[np.ndarray, List[float]]) -> List[float]:
+        """Convert an embedding to the JSON-serializable form Qdrant expects"""
+        if isinstance(vector, np.ndarray):
+            return vector.astype(np.float32, copy=False).ravel().tolist()
+        return list(vector)
+    
+    def _build_point(self, doc: Dict[str, Any]) -> Optional[qmodels.PointStruct]:
+        """Build a PointStruct from a prepared document (None if it has no vectors)"""
+        vectors = {}
+        for vector_name in ('text_embedding', 'image_embedding', 'audio_embedding'):
+            vector = doc.get(vector_name)
+            if vector is not None and len(vector) > 0:
+                vectors[vector_name] = self._to_wire(vector)
+        
+        if not vectors:
+            return None
+        
+        sparse = doc.get('sparse_embedding')
+        if sparse is not None and self.sparse_vectors:
+            vectors[SPARSE_VECTOR] = sparse
+        
+        return qmodels.PointStruct(
+            id=doc.get('id') or str(uuid.uuid4()),
+            vector=vectors,
+            payload=doc.get('payload', {})
+        )
+    
+    def _build_points(self, documents: List[Dict[str, Any]]) -> PointBatch:
+        """
+        Build PointStructs for a batch of prepared documents, skipping vectorless ones
+        
+        With external content enabled, body fields are stripped from the
+        payloads and kept on the batch; _store_bodies writes them once the
+        upsert succeeded, so a failed upsert leaves no orphan rows.
+        """
+        batch = PointBatch(point for point in map(self._build_point, documents) if point is not None)
+        if settings.qdrant_external_content:
+            for point in batch:
+                point.payload, body = split_payload(point.payload or {})
+                batch.bodies.append((point.id, point.payload, body))
+        return batch
+    
+    def _store_bodies(self, points: List[qmodels.PointStruct]):
+        """Write the content-store rows of an upserted batch (one transaction)"""
+        rows = getattr(points, "bodies", None)
+        if rows:
+            self.content_store.put_many(rows)
+    
+    @staticmethod
+    def _document_chunks(documents: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Lazily split prepared documents into upsert-sized lists"""
+        iterator = iter(documents)
+        while True:
+            chunk = list(islice(iterator, batch_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _hold_back(self, pending: Dict[Optional[str], PointBatch], batch: PointBatch) -> List[PointBatch]:
+        """
+        Queue a bulk-load batch, returning the groups it releases
+        
+        The latest group of every shard key stays in `pending`, to be sent
+        last with wait=True once everything before it was acknowledged; the
+        group it replaces is released for a wait=False upsert.
+        """
+        if not batch:
+            return []
+        released = []
+        for shard_key, group in self._split_by_shard(batch):
+            held = pending.pop(shard_key, None)
+            pending[shard_key] = group
+            if held is not None:
+                released.append(held)
+        return released
+    
+    @staticmethod
+    def _load_stats() -> Dict[str, Any]:
+        """Counters of a bulk load, updated by _record_upsert from any worker"""
+        return {"batches": 0, "retries": 0, "sessions": set(), "lock": threading.Lock()}
+    
+    @staticmethod
+    def _load_report(indexed: int, stats: Dict[str, Any], started: float) -> Dict[str, Any]:
+        """Log and summarize a finished bulk load"""
+        seconds = time.perf_counter() - started
+        logger.info(
+            f"[OK] Bulk upserted {indexed} points in {stats['batches']} batches "
+            f"({stats['retries']} retries, {indexed / max(seconds, 1e-9):.0f} points/s)"
+        )
+        return {
+            "status": "success",
+            "indexed": indexed,
+            "batches": stats["batches"],
+            "retries": stats["retries"],
+            "seconds": seconds,
+        }
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Connection failures, timeouts, throttling and 5xx are worth retrying"""
+        if isinstance(error, ResponseHandlingException):
+            return True
+        if isinstance(error, UnexpectedResponse):
+            return error.status_code in (429, 500, 502, 503, 504)
+        return False
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Jittered exponential backoff before retry `attempt + 1` of an upsert"""
+        return settings.qdrant_upsert_backoff_s * (2 ** attempt) * random.uniform(0.5, 1.5)
+    
+    def _record_upsert(
+        self,
+        points: List[qmodels.PointStruct],
+        attempt: int,
+        stats: Optional[Dict[str, Any]]
+    ) -> set:
+        """
+        Content-store rows, catalog entries and load stats of an acknowledged upsert
+        
+        Returns:
+            The sessions written, for the caller to invalidate (already added
+            to stats, which invalidates them once the whole load is visible)
+        """
+        self._store_bodies(points)
+        self.catalog.add_points(point.payload for point in points)
+        sessions = {(point.payload or {}).get("session_id") for point in points}
+        if stats is not None:
+            with stats["lock"]:
+                stats["batches"] += 1
+                stats["retries"] += attempt
+                stats["sessions"] |= sessions
+        return sessions
+    
+    @staticmethod
+    def _point_id(point_id: str) -> Union[int, str]:
+        """Result ids are strings; Qdrant wants unsigned ints back as ints"""
+        return int(point_id) if point_id.isdigit() else point_id
+    
+    @staticmethod
+    def _apply_bodies(result: Dict[str, Any], bodies: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Fill documents and metadatas of a query result with chunk bodies"""
+        for i, point_id in enumerate(result.get("ids", [])):
+            body = bodies.get(point_id)
+            if body:
+                result["documents"][i] = body.get("content", "")
+                result["metadatas"][i].update(body)
+        return result
+    
+    @staticmethod
+    def _needs_bodies(result: Dict[str, Any]) -> bool:
+        return settings.qdrant_external_content and bool(result.get("ids"))
+    
+    @staticmethod
+    def _build_filter(
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[qmodels.Filter]:
+        """Build a Qdrant filter from a session id and exact-match payload filters"""
+        must_conditions = []
+        
+        if session_id:
+            must_conditions.append(
+                qmodels.FieldCondition(
+                    key="session_id",
+                    match=qmodels.MatchValue(value=session_id)
+                )
+            )
+        
+        if filters:
+            for key, value in filters.items():
+                must_conditions.append(
+                    qmodels.FieldCondition(
+                        key=key,
+                        match=qmodels.MatchValue(value=value)
+                    )
+                )
+        
+        return qmodels.Filter(must=must_conditions) if must_conditions else None
+    
+    @staticmethod
+    def _format_points(points: List[qmodels.ScoredPoint], vector_name: str) -> Dict[str, Any]:
+        """Format scored points from one vector space as a query result"""
+        ids = []
+        documents = []
+        metadatas = []
+        scores = []
+        
+        for result in points:
+            ids.append(str(result.id))
+            payload = result.payload or {}
+            documents.append(payload.get('content', ''))
+            metadatas.append(payload)
+            scores.append(result.score)
+        
+        return {
+            "status": "success",
+            "ids": ids,
+            "documents": documents,
+            "metadatas": metadatas,
+            "scores": scores,
+            "distances": [1.0 - s for s in scores],
+            "vector_space": vector_name
+        }
+    
+    def _multimodal_requests(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        n_results: int,
+        score_threshold: Optional[float],
+        filters: Optional[Dict[str, Any]],
+    ) -> List[qmodels.QueryRequest]:
+        """One search request per vector space, to be sent in a single round trip"""
+        query_vector = self._to_wire(query_embedding)
+        query_filter = self._build_filter(session_id, filters)
+        return [
+            qmodels.QueryRequest(
+                query=query_vector,
+                using=vector_space,
+                filter=query_filter,
+                limit=n_results,  # Get full count from each
+                score_threshold=score_threshold or settings.similarity_threshold,
+                params=self._search_params_for(session_id),
+                shard_key=self._shard_key(session_id),
+                with_payload=self.result_payload,
+            )
+            for vector_space in vector_spaces
+        ]
+    
+    def _hybrid_branches(
+        self,
+        query_text: str,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        n_results: int,
+        score_threshold: Optional[float],
+        filters: Optional[Dict[str, Any]],
+    ) -> Optional[List[qmodels.Prefetch]]:
+        """
+        Candidate branches of a hybrid search: one per dense space, BM25 last
+        
+        Returns:
+            Prefetches, or None when the query has no lexical terms or the
+            collection has no sparse vector
+        """
+        sparse_query = encode_query(query_text) if self.sparse_vectors else None
+        if sparse_query is None:
+            return None
+        
+        query_vector = self._to_wire(query_embedding)
+        query_filter = self._build_filter(session_id, filters)
+        limit = n_results * max(1, settings.hybrid_prefetch_multiplier)
+        branches = [
+            qmodels.Prefetch(
+                query=query_vector,
+                using=vector_space,
+                filter=query_filter,
+                limit=limit,
+                score_threshold=score_threshold or settings.similarity_threshold,
+                params=self._search_params_for(session_id),
+            )
+            for vector_space in vector_spaces
+        ]
+        branches.append(
+            qmodels.Prefetch(query=sparse_query, using=SPARSE_VECTOR, filter=query_filter, limit=limit)
+        )
+        return branches
+    
+    def _hybrid_request(
+        self,
+        branches: List[qmodels.Prefetch],
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        n_results: int,
+        score_threshold: Optional[float],
+        fusion: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        query_points arguments for one-round-trip dense + BM25 retrieval
+        
+        "rrf" ranks by weighted reciprocal rank (dense_weight per space,
+        bm25_weight for BM25) over all branch candidates. Qdrant rescores the
+        candidates by cosine similarity in each dense space with the
+        similarity threshold, and the final formula keeps the fused rank of
+        those that pass it:
+        
+            score = rrf * _rrf_scale(weights) * [cosine >= threshold]  (rrf)
+        
+        i.e. 1.0 for a candidate ranked first by every branch (empty spaces
+        included). These are rank scores, not similarities: the final query
+        returns the dense vectors so _hybrid_points can attach each result's
+        cosine similarity. Candidates below the threshold score 0 and are
+        dropped there (the limit cuts after them, so they never displace a
+        qualifying result).
+        
+        "weighted" keeps the cosine scale and boosts lexical matches:
+        
+            score = cosine + sparse_weight * bm25 / (bm25 + 1) * (1 - cosine)
+        
+        with the threshold applied to the fused score. In both modes cosine
+        is the best over the spaces, so a BM25-only match that shares a
+        single term with the query does not get past the threshold.
+        
+        Returns:
+            Keyword arguments for query_points
+        """
+        fusion = _fusion_mode(fusion)
+        threshold = score_threshold or settings.similarity_threshold
+        candidate_limit = sum(branch.limit for branch in branches)
+        query_vector = self._to_wire(query_embedding)
+        
+        if fusion == "rrf":
+            weights = _rrf_weights(len(vector_spaces))
+            fused = qmodels.Prefetch(
+                prefetch=branches,
+                query=qmodels.RrfQuery(rrf=qmodels.Rrf(weights=weights)),
+                limit=candidate_limit,
+            )
+            prefetch = [
+                qmodels.Prefetch(
+                    prefetch=fused, query=query_vector, using=vector_space,
+                    limit=candidate_limit, score_threshold=threshold,
+                )
+                for vector_space in vector_spaces
+            ]
+            prefetch.append(fused)
+            cosine = _max_expression([f"$score[{i}]" for i in range(len(vector_spaces))])
+            # cosine / cosine is 1 for candidates in a thresholded space, 0 otherwise
+            formula = qmodels.MultExpression(mult=[
+                _rrf_scale(weights),
+                f"$score[{len(vector_spaces)}]",
+                qmodels.DivExpression(div=qmodels.DivParams(left=cosine, right=cosine, by_zero_default=0.0)),
+            ])
+            threshold = None
+        else:
+            prefetch = [
+                qmodels.Prefetch(prefetch=branches, query=query_vector, using=vector_space, limit=candidate_limit)
+                for vector_space in vector_spaces
+            ]
+            cosine = _max_expression([f"$score[{i}]" for i in range(len(vector_spaces))])
+            # The BM25 branch itself is the last prefetch
+            prefetch.append(branches[-1])
+            bm25 = f"$score[{len(vector_spaces)}]"
+            formula = qmodels.SumExpression(sum=[cosine, qmodels.MultExpression(mult=[
+                settings.sparse_weight,
+                qmodels.DivExpression(div=qmodels.DivParams(
+                    left=bm25, right=qmodels.SumExpression(sum=[bm25, 1.0]), by_zero_default=0.0
+                )),
+                qmodels.SumExpression(sum=[1.0, qmodels.NegExpression(neg=cosine)]),
+            ])])
+        
+        return {
+            "collection_name": self.collection_name,
+            "prefetch": prefetch,
+            "query": qmodels.FormulaQuery(
+                formula=formula, defaults={f"$score[{i}]": 0.0 for i in range(len(prefetch))}
+            ),
+            "limit": n_results,
+            "score_threshold": threshold,
+            "shard_key_selector": self._shard_key(session_id),
+            "with_payload": self.result_payload,
+            "with_vectors": list(vector_spaces) if fusion == "rrf" else False,
+        }
+    
+    @staticmethod
+    def _hybrid_points(
+        points: List[qmodels.ScoredPoint],
+        query_embedding: Union[np.ndarray, List[float]],
+        vector_spaces: List[str],
+        fusion: Optional[str]
+    ) -> Tuple[List[qmodels.ScoredPoint], Optional[List[float]]]:
+        """
+        Results of a _hybrid_request and their dense similarities
+        
+        For "rrf", drops the candidates gated out by the threshold and
+        computes each result's best cosine similarity from its returned
+        vectors (which are not passed on). "weighted" scores already are
+        similarities (None).
+        """
+        if _fusion_mode(fusion) != "rrf":
+            return points, None
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) or 1.0)
+        kept, similarities = [], []
+        for point in points:
+            if point.score <= 0:
+                continue
+            vectors = point.vector if isinstance(point.vector, dict) else {}
+            cosines = []
+            for vector_space in vector_spaces:
+                vector = vectors.get(vector_space)
+                if vector is not None:
+                    vector = np.asarray(vector, dtype=np.float32)
+                    cosines.append(float(query @ vector / (np.linalg.norm(vector) or 1.0)))
+            kept.append(point.model_copy(update={"vector": None}))
+            similarities.append(max(cosines, default=0.0))
+        return kept, similarities
+    
+    def _format_hybrid(
+        self,
+        points: List[qmodels.ScoredPoint],
+        similarities: Optional[List[float]]
+    ) -> Dict[str, Any]:
+        """
+        Query result of a hybrid search
+        
+        "scores" are the fused scores. With rank scores ("rrf"), the dense
+        similarity of each result is kept in "similarities" and "distances",
+        for consumers that weigh evidence on the cosine scale.
+        """
+        result = self._format_points(points, "hybrid")
+        if similarities is not None:
+            result["similarities"] = similarities
+            result["distances"] = [1.0 - s for s in similarities]
+        return result
+    
+    def _query_session_cache(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        n_results: int,
+        score_threshold: Optional[float],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[List[List[qmodels.ScoredPoint]]]:
+        """Per-space results from the session cache, or None to query Qdrant"""
+        if self.session_cache is None or not session_id:
+            return None
+        try:
+            return self.session_cache.search(
+                session_id, query_embedding, vector_spaces, n_results,
+                score_threshold or settings.similarity_threshold, filters
+            )
+        except Exception as e:
+            logger.warning(f"[WARN] Session cache search failed, querying Qdrant: {e}")
+            return None
+    
+    def _cached_similarities(
+        self,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        point_ids: List[Any]
+    ) -> Optional[List[List[qmodels.ScoredPoint]]]:
+        """Per-space cosine similarity of given points from the session cache, or None"""
+        if self.session_cache is None or not session_id or not point_ids:
+            return None
+        try:
+            return self.session_cache.similarities(session_id, query_embedding, vector_spaces, point_ids)
+        except Exception as e:
+            logger.warning(f"[WARN] Session cache scoring failed, querying Qdrant: {e}")
+            return None
+    
+    def _sparse_request(self, branches: List[qmodels.Prefetch], session_id: Optional[str]) -> Dict[str, Any]:
+        """query_points arguments for the BM25 branch of a hybrid search alone"""
+        sparse = branches[-1]
+        return {
+            "collection_name": self.collection_name,
+            "query": sparse.query,
+            "using": sparse.using,
+            "query_filter": sparse.filter,
+            "limit": sparse.limit,
+            "shard_key_selector": self._shard_key(session_id),
+            "with_payload": self.result_payload,
+        }
+    
+    def _fuse(
+        self,
+        dense: List[List[qmodels.ScoredPoint]],
+        sparse: List[qmodels.ScoredPoint],
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str],
+        vector_spaces: List[str],
+        n_results: int,
+        score_threshold: Optional[float],
+        fusion: Optional[str]
+    ) -> Optional[Tuple[List[qmodels.ScoredPoint], Optional[List[float]]]]:
+        """
+        Client-side equivalent of _hybrid_request followed by _hybrid_points
+        
+        Candidates are rescored from the session cache; None when the cache
+        cannot score them and the request has to go to Qdrant.
+        
+        Returns:
+            (points, dense similarities for "rrf" or None), or None
+        """
+        fusion = _fusion_mode(fusion)
+        branches = [*dense, sparse]
+        if fusion == "rrf":
+            weights = _rrf_weights(len(dense))
+            candidates = reciprocal_rank_fusion(
+                branches, limit=sum(len(branch) for branch in branches), weights=weights,
+            )
+        else:
+            candidates = list({point.id: point for branch in branches for point in branch}.values())
+        
+        similarities = self._cached_similarities(
+            query_embedding, session_id, vector_spaces, [point.id for point in candidates]
+        )
+        if similarities is None:
+            return None
+        cosine: Dict[Any, float] = {}
+        for scored in similarities:
+            for point in scored:
+                cosine[point.id] = max(cosine.get(point.id, 0.0), point.score)
+        
+        threshold = score_threshold or settings.similarity_threshold
+        scored = []
+        if fusion == "rrf":
+            # Already in fused order
+            scored = [
+                point.model_copy(update={"score": point.score * _rrf_scale(weights)})
+                for point in candidates if cosine.get(point.id, 0.0) >= threshold
+            ][:n_results]
+            return scored, [cosine.get(point.id, 0.0) for point in scored]
+        else:
+            bm25 = {point.id: point.score for point in sparse}
+            for point in candidates:
+                score = cosine.get(point.id, 0.0)
+                if point.id in bm25:
+                    score += settings.sparse_weight * bm25[point.id] / (bm25[point.id] + 1.0) * (1.0 - score)
+                if score >= threshold:
+                    scored.append(point.model_copy(update={"score": score}))
+        scored.sort(key=lambda point: point.score, reverse=True)
+        return scored[:n_results], None
+    
+    @staticmethod
+    def _merge_spaces(
+        vector_spaces: List[str],
+        responses: List[qmodels.QueryResponse],
+        n_results: int
+    ) -> Dict[str, Any]:
+        """Merge per-space responses by ID, keeping the best score and all matched spaces"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for vector_space, response in zip(vector_spaces, responses):
+            for point in response.points:
+                doc_id = str(point.id)
+                result = merged.get(doc_id)
+                
+                if result is None:
+                    payload = point.payload or {}
+                    merged[doc_id] = {
+                        'id': doc_id,
+                        'content': payload.get('content', ''),
+                        'metadata': payload,
+                        'score': point.score,
+                        'matched_vector_space': vector_space,
+                        'matched_spaces': [vector_space]
+                    }
+                    continue
+                
+                if point.score > result['score']:
+                    result['score'] = point.score
+                    result['matched_vector_space'] = vector_space
+                result['matched_spaces'].append(vector_space)
+        
+        all_results = list(merged.values())
+        
+        if not all_results:
+            return {
+                "status": "success",
+                "ids": [],
+                "documents": [],
+                "metadatas": [],
+                "scores": [],
+                "distances": [],
+                "searched_spaces": vector_spaces,
+                "total_results": 0
+            }
+        
+        # Sort by score (highest first)
+        all_results.sort(key=lambda x: x['score'], reverse=True)
+        
+        # Limit to n_results
+        all_results = all_results[:n_results]
+        
+        # Format output
+        ids = [r['id'] for r in all_results]
+        documents = [r['content'] for r in all_results]
+        metadatas = []
+        scores = [r['score'] for r in all_results]
+        
+        for r in all_results:
+            meta = r['metadata'].copy()
+            meta['matched_vector_space'] = r['matched_vector_space']
+            meta['matched_spaces'] = r['matched_spaces']
+            metadatas.append(meta)
+        
+        logger.info(f"[MULTIMODAL SEARCH] Found {len(ids)} unique results across {vector_spaces}")
+        
+        return {
+            "status": "success",
+            "ids": ids,
+            "documents": documents,
+            "metadatas": metadatas,
+            "scores": scores,
+            "distances": [1.0 - s for s in scores],
+            "searched_spaces": vector_spaces,
+            "total_results": len(ids)
+        }
+
+
+class VectorStore(BaseVectorStore):
     """
     Qdrant Vector Store with multi-vector support
     """
@@ -31,27 +896,19 @@ class VectorStore:
             return
         
         self.collection_name = settings.collection_name
-        self.qdrant_client = QdrantClient(
-            host=settings.qdrant_host,
-            port=settings.qdrant_port,
-            prefer_grpc=settings.qdrant_prefer_grpc
-        )
+        self.qdrant_client = create_client()  # Server or embedded, per settings.qdrant_mode
         
-        # Vector configurations for multimodal
-        self.vector_config = {
-            "text_embedding": qmodels.VectorParams(
-                size=settings.embedding_dimension,  # 512 for CLIP
-                distance=qmodels.Distance.COSINE
-            ),
-            "image_embedding": qmodels.VectorParams(
-                size=settings.embedding_dimension,
-                distance=qmodels.Distance.COSINE
-            ),
-            "audio_embedding": qmodels.VectorParams(
-                size=settings.embedding_dimension,
-                distance=qmodels.Distance.COSINE
-            ),
-        }
+        # Vector configurations for multimodal (HNSW + quantization from settings)
+        self.vector_config = build_vector_config()
+        self.sparse_vector_config = build_sparse_vector_config()
+        self.sparse_vectors = settings.bm25_enabled
+        self.search_params = None if is_embedded() else build_search_params()
+        self.exact_search_params = None if is_embedded() else build_search_params(exact=True)
+        self.session_shards = 0 if is_embedded() else settings.qdrant_session_shards
+        
+        # Small hot sessions answered in-process (optional)
+        if settings.session_cache_enabled:
+            self.session_cache = SessionVectorCache(self)
         
         # Ensure collection exists
         self._ensure_collection()
@@ -70,6 +927,8 @@ class VectorStore:
                 self._create_collection()
             else:
                 logger.info(f"[OK] Collection exists: {self.collection_name}")
+                self._load_sharding()
+                self._load_sparse_config()
                 
         except Exception as e:
             logger.error(f"[FAIL] Error with collection: {e}")
@@ -81,11 +940,17 @@ class VectorStore:
             self.qdrant_client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=self.vector_config,
+                sparse_vectors_config=self.sparse_vector_config,
                 optimizers_config=qmodels.OptimizersConfigDiff(
                     indexing_threshold=10000,
                 ),
+                sharding_method=qmodels.ShardingMethod.CUSTOM if self.session_shards else None,
             )
             
+            # Sessions are hashed into a fixed set of shard keys
+            for shard in range(self.session_shards):
+                self.qdrant_client.create_shard_key(self.collection_name, f"sessions_{shard}")
+            
             # Create indexes
             self._create_indexes()
             logger.info(f"[OK] Collection created: {self.collection_name}")
@@ -94,13 +959,78 @@ class VectorStore:
             logger.error(f"[FAIL] Failed to create collection: {e}")
             raise
     
+    def _load_sharding(self):
+        """Adopt the shard keys of an existing collection (sessions must keep hashing the same way)"""
+        if is_embedded():
+            return
+        info = self.qdrant_client.get_collection(self.collection_name)
+        if info.config.params.sharding_method != qmodels.ShardingMethod.CUSTOM:
+            if self.session_shards:
+                logger.warning(
+                    f"[WARN] {self.collection_name} was created without custom sharding; "
+                    f"qdrant_session_shards={self.session_shards} ignored until it is recreated"
+                )
+            self.session_shards = 0
+            return
+        
+        keys = self.qdrant_client.list_shard_keys(self.collection_name).shard_keys or []
+        shards = sum(1 for k in keys if str(k.key).startswith("sessions_"))
+        if shards != self.session_shards:
+            logger.warning(f"[WARN] Using the collection's {shards} session shard keys (settings: {self.session_shards})")
+        self.session_shards = shards
+    
+    def _load_sparse_config(self):
+        """Write and query BM25 vectors only if the existing collection has the sparse vector"""
+        if not self.sparse_vectors:
+            return
+        sparse = self.qdrant_client.get_collection(self.collection_name).config.params.sparse_vectors or {}
+        if SPARSE_VECTOR not in sparse:
+            logger.warning(
+                f"[WARN] {self.collection_name} was created without the {SPARSE_VECTOR} sparse vector; "
+                f"hybrid queries use dense search until it is recreated"
+            )
+            self.sparse_vectors = False
+    
+    def update_index_config(self):
+        """
+        Apply the current HNSW/quantization settings to an existing collection
+        
+        Qdrant rebuilds the affected indexes in the background; searches keep
+        working on the old index meanwhile. Payload indexes are re-created too,
+        which upgrades an older plain session_id index to a tenant index.
+        """
+        quantization = quantization_config()
+        self.qdrant_client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={
+                name: qmodels.VectorParamsDiff(
+                    hnsw_config=params.hnsw_config,
+                    quantization_config=quantization or qmodels.Disabled.DISABLED,
+                    on_disk=params.on_disk,
+                )
+                for name, params in self.vector_config.items()
+            },
+        )
+        self._create_indexes()
+        logger.info(
+            f"[OK] Index config updated: quantization={settings.qdrant_quantization}, "
+            f"m={settings.qdrant_hnsw_m}, ef_construct={settings.qdrant_hnsw_ef_construct}"
+        )
+    
     def _create_indexes(self):
         """Create payload indexes for filtering"""
+        if is_embedded():
+            return
+        
         index_fields = [
-            ("session_id", qmodels.PayloadSchemaType.KEYWORD),
+            # Tenant index: points are co-located per session on disk and
+            # payload_m builds per-session HNSW links
+            ("session_id", qmodels.KeywordIndexParams(type=qmodels.KeywordIndexType.KEYWORD, is_tenant=True)),
             ("modality", qmodels.PayloadSchemaType.KEYWORD),
             ("document_topic", qmodels.PayloadSchemaType.KEYWORD),
             ("file_name", qmodels.PayloadSchemaType.KEYWORD),
+            ("source_file", qmodels.PayloadSchemaType.KEYWORD),
+            ("document_hash", qmodels.PayloadSchemaType.KEYWORD),  # Re-upload check
         ]
         
         for field_name, field_type in index_fields:
@@ -114,51 +1044,30 @@ class VectorStore:
                 pass  # Index may already exist
     
     def add_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Add documents with embeddings to Qdrant"""
+        """
+        Add documents with embeddings to Qdrant
+        
+        Embeddings may be float32 numpy arrays or lists; they are converted to
+        lists only while building each upsert batch, so at most a few batches
+        of boxed floats are alive at a time. Anything larger than one batch
+        goes through the pipelined bulk_upsert; either way all points are
+        applied when this returns.
+        """
         if not documents:
             return {"status": "success", "indexed": 0}
         
         try:
-            points = []
+            batch_size = settings.qdrant_upsert_batch_size
             
-            for doc in documents:
-                point_id = doc.get('id') or str(uuid.uuid4())
-                
-                # Build vectors dict
-                vectors = {}
-                if doc.get('text_embedding'):
-                    vectors['text_embedding'] = doc['text_embedding']
-                if doc.get('image_embedding'):
-                    vectors['image_embedding'] = doc['image_embedding']
-                if doc.get('audio_embedding'):
-                    vectors['audio_embedding'] = doc['audio_embedding']
-                
-                if not vectors:
-                    continue
-                
-                point = qmodels.PointStruct(
-                    id=point_id,
-                    vector=vectors,
-                    payload=doc.get('payload', {})
-                )
-                points.append(point)
+            if len(documents) > batch_size:
+                total_indexed = self.bulk_upsert(documents, batch_size=batch_size)['indexed']
+            else:
+                batch = self._build_points(documents)
+                total_indexed = self._upsert_with_retry(batch, wait=True) if batch else 0
             
-            if not points:
+            if not total_indexed:
                 return {"status": "warning", "indexed": 0, "message": "No valid points"}
             
-            # Upsert in batches
-            batch_size = 100
-            total_indexed = 0
-            
-            for i in range(0, len(points), batch_size):
-                batch = points[i:i + batch_size]
-                self.qdrant_client.upsert(
-                    collection_name=self.collection_name,
-                    points=batch,
-                    wait=True
-                )
-                total_indexed += len(batch)
-            
             logger.info(f"[OK] Indexed {total_indexed} documents")
             return {"status": "success", "indexed": total_indexed}
             
@@ -173,72 +1082,128 @@ class VectorStore:
             logger.error(f"[FAIL] Add documents failed: {e}")
             raise
     
+    def bulk_upsert(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: int = None,
+        max_in_flight: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Pipelined bulk load of prepared documents
+        
+        Batches are sent with wait=False, up to `max_in_flight` at a time, while
+        the next batches are being built. The latest batch of every shard key
+        (the whole batch without custom sharding) is held back and sent with
+        wait=True once everything before it was acknowledged, so each shard's
+        last write is the one that waits until the shard applied it, with no
+        extra request.
+        
+        Args:
+            documents: Prepared documents (any iterable, consumed lazily)
+            batch_size: Points per request (defaults to settings.qdrant_upsert_batch_size)
+            max_in_flight: Concurrent unacknowledged batches
+                (defaults to settings.qdrant_upsert_max_in_flight)
+            
+        Returns:
+            Dict with status, indexed, batches, retries, seconds
+        """
+        batch_size = batch_size or settings.qdrant_upsert_batch_size
+        max_in_flight = max(1, max_in_flight or settings.qdrant_upsert_max_in_flight)
+        stats = self._load_stats()
+        started = time.perf_counter()
+        indexed = 0
+        in_flight: Deque[Future] = deque()
+        pending: Dict[Optional[str], PointBatch] = {}  # Latest batch per shard key, sent last with wait=True
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="qdrant-upsert") as executor:
+            try:
+                for chunk in self._document_chunks(documents, batch_size):
+                    for held in self._hold_back(pending, self._build_points(chunk)):
+                        if len(in_flight) >= max_in_flight:
+                            indexed += in_flight.popleft().result()
+                        in_flight.append(executor.submit(self._upsert_with_retry, held, False, stats))
+                
+                while in_flight:
+                    indexed += in_flight.popleft().result()
+                
+                for group in pending.values():
+                    indexed += self._upsert_with_retry(group, True, stats)
+            except Exception:
+                for future in in_flight:
+                    future.cancel()
+                raise
+            finally:
+                self.invalidate_session_cache(stats["sessions"])  # After the final writes (or a failure)
+        
+        return self._load_report(indexed, stats, started)
+    
+    def _upsert_with_retry(
+        self,
+        points: List[qmodels.PointStruct],
+        wait: bool,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Upsert one batch, retrying transient errors with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                for shard_key, group in self._group_by_shard(points):
+                    self.qdrant_client.upsert(
+                        collection_name=self.collection_name,
+                        points=group,
+                        wait=wait,
+                        shard_key_selector=shard_key,
+                    )
+                break
+            except Exception as e:
+                if attempt >= settings.qdrant_upsert_retries or not self._is_transient(e):
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                logger.warning(f"[WARN] Upsert of {len(points)} points failed ({e}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+        
+        sessions = self._record_upsert(points, attempt, stats)
+        if stats is None:
+            self.invalidate_session_cache(sessions)
+        return len(points)
+    
     def query(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[np.ndarray, List[float]],
         session_id: Optional[str] = None,
         vector_name: str = "text_embedding",
         n_results: int = 10,
         score_threshold: float = None,
         filters: Optional[Dict[str, Any]] = None,
+        hydrate: bool = True,
     ) -> Dict[str, Any]:
-        """Query a single vector space in the vector store"""
+        """Query a single vector space (hydrate=False returns metadata without chunk bodies)"""
         try:
-            # Build filter
-            must_conditions = []
-            
-            if session_id:
-                must_conditions.append(
-                    qmodels.FieldCondition(
-                        key="session_id",
-                        match=qmodels.MatchValue(value=session_id)
-                    )
-                )
-            
-            if filters:
-                for key, value in filters.items():
-                    must_conditions.append(
-                        qmodels.FieldCondition(
-                            key=key,
-                            match=qmodels.MatchValue(value=value)
-                        )
-                    )
+            cached = self._query_session_cache(
+                query_embedding, session_id, [vector_name], n_results, score_threshold, filters
+            )
+            if cached is not None:
+                result = self._format_points(cached[0], vector_name)
+                return self.hydrate(result) if hydrate else result
             
-            query_filter = qmodels.Filter(must=must_conditions) if must_conditions else None
+            query_filter = self._build_filter(session_id, filters)
             
             # Use query_points for qdrant-client >= 1.7.0
             results = self.qdrant_client.query_points(
                 collection_name=self.collection_name,
-                query=query_embedding,
+                query=self._to_wire(query_embedding),
                 using=vector_name,
                 query_filter=query_filter,
                 limit=n_results,
                 score_threshold=score_threshold or settings.similarity_threshold,
-                with_payload=True,
+                search_params=self._search_params_for(session_id),
+                shard_key_selector=self._shard_key(session_id),
+                with_payload=self.result_payload,
             ).points
             
-            # Format results
-            ids = []
-            documents = []
-            metadatas = []
-            scores = []
-            
-            for result in results:
-                ids.append(str(result.id))
-                payload = result.payload or {}
-                documents.append(payload.get('content', ''))
-                metadatas.append(payload)
-                scores.append(result.score)
-            
-            return {
-                "status": "success",
-                "ids": ids,
-                "documents": documents,
-                "metadatas": metadatas,
-                "scores": scores,
-                "distances": [1.0 - s for s in scores],
-                "vector_space": vector_name
-            }
+            result = self._format_points(results, vector_name)
+            return self.hydrate(result) if hydrate else result
             
         except Exception as e:
             logger.error(f"[FAIL] Query failed: {e}")
@@ -246,26 +1211,28 @@ class VectorStore:
     
     def query_multimodal(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[np.ndarray, List[float]],
         session_id: Optional[str] = None,
         vector_spaces: List[str] = None,
         n_results: int = 10,
         score_threshold: float = None,
         filters: Optional[Dict[str, Any]] = None,
+        hydrate: bool = True,
     ) -> Dict[str, Any]:
         """
         Query across multiple vector spaces and merge results.
         
         This searches text_embedding, image_embedding, and audio_embedding
-        spaces and returns deduplicated, ranked results.
+        spaces in one batched request and returns deduplicated, ranked results.
         
         Args:
-            query_embedding: The query vector (from CLIP text encoder)
+            query_embedding: The query vector (from CLIP text encoder, array or list)
             session_id: Filter by session
             vector_spaces: Which spaces to search. Defaults to all.
             n_results: Total number of results to return
             score_threshold: Minimum similarity score
             filters: Additional payload filters
+            hydrate: Attach chunk bodies to the merged top results
             
         Returns:
             Merged and deduplicated results from all vector spaces
@@ -274,100 +1241,296 @@ class VectorStore:
         if vector_spaces is None:
             vector_spaces = ["text_embedding", "image_embedding", "audio_embedding"]
         
-        all_results = []
-        seen_ids = set()
-        
         logger.info(f"[MULTIMODAL SEARCH] Searching {len(vector_spaces)} vector spaces")
         
-        for vector_space in vector_spaces:
-            try:
-                results = self.query(
-                    query_embedding=query_embedding,
-                    session_id=session_id,
-                    vector_name=vector_space,
-                    n_results=n_results,  # Get full count from each
-                    score_threshold=score_threshold,
-                    filters=filters
+        try:
+            cached = self._query_session_cache(
+                query_embedding, session_id, vector_spaces, n_results, score_threshold, filters
+            )
+            if cached is not None:
+                responses = [qmodels.QueryResponse(points=points) for points in cached]
+            else:
+                responses = self.qdrant_client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=self._multimodal_requests(
+                        query_embedding, session_id, vector_spaces,
+                        n_results, score_threshold, filters
+                    ),
                 )
-                
-                if results.get('status') != 'success':
-                    continue
-                
-                # Add results with vector space info
-                for idx in range(len(results.get('ids', []))):
-                    doc_id = results['ids'][idx]
-                    
-                    # Deduplicate by ID (same document may match in multiple spaces)
-                    if doc_id in seen_ids:
-                        # Update score if this space gives higher score
-                        for r in all_results:
-                            if r['id'] == doc_id:
-                                new_score = results['scores'][idx]
-                                if new_score > r['score']:
-                                    r['score'] = new_score
-                                    r['matched_vector_space'] = vector_space
-                                # Track all spaces this document matched
-                                r['matched_spaces'].append(vector_space)
-                                break
-                        continue
-                    
-                    seen_ids.add(doc_id)
-                    
-                    all_results.append({
-                        'id': doc_id,
-                        'content': results['documents'][idx],
-                        'metadata': results['metadatas'][idx],
-                        'score': results['scores'][idx],
-                        'matched_vector_space': vector_space,
-                        'matched_spaces': [vector_space]
-                    })
-                    
-            except Exception as e:
-                logger.warning(f"[WARN] Query failed for {vector_space}: {e}")
-                continue
+        except Exception as e:
+            logger.error(f"[FAIL] Multimodal query failed: {e}")
+            return {"status": "error", "message": str(e)}
         
-        if not all_results:
-            return {
-                "status": "success",
-                "ids": [],
-                "documents": [],
-                "metadatas": [],
-                "scores": [],
-                "distances": [],
-                "searched_spaces": vector_spaces,
-                "total_results": 0
-            }
+        result = self._merge_spaces(vector_spaces, responses, n_results)
+        return self.hydrate(result) if hydrate else result
+    
+    def query_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Union[np.ndarray, List[float]],
+        session_id: Optional[str] = None,
+        vector_spaces: List[str] = None,
+        n_results: int = 10,
+        score_threshold: float = None,
+        filters: Optional[Dict[str, Any]] = None,
+        fusion: str = None,
+        hydrate: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Dense multimodal + BM25 lexical search, fused by Qdrant in one request
         
-        # Sort by score (highest first)
-        all_results.sort(key=lambda x: x['score'], reverse=True)
+        Falls back to query_multimodal when the query has no lexical terms or
+        the collection has no BM25 vectors. For sessions in the session cache
+        the dense branches are searched and the candidates rescored locally,
+        Qdrant runs the BM25 branch alone and the results are fused here the
+        same way. "rrf" scores are the normalized fused rank, with each
+        result's dense similarity in "similarities"; "weighted" scores stay
+        on the cosine scale (see _hybrid_request).
         
-        # Limit to n_results
-        all_results = all_results[:n_results]
+        Args:
+            query_text: Query string (BM25 terms)
+            query_embedding: The query vector (from CLIP text encoder, array or list)
+            session_id: Filter by session
+            vector_spaces: Dense spaces to search. Defaults to all.
+            n_results: Number of fused results
+            score_threshold: Minimum dense similarity ("rrf") or fused score
+                ("weighted") of every result
+            filters: Additional payload filters
+            fusion: "rrf" or "weighted" (default settings.hybrid_fusion)
+            hydrate: Attach chunk bodies to the results
+            
+        Returns:
+            Query result with fused scores ("vector_space": "hybrid")
+        """
+        vector_spaces = vector_spaces or list(VECTOR_SPACES)
+        try:
+            branches = self._hybrid_branches(
+                query_text, query_embedding, session_id, vector_spaces, n_results, score_threshold, filters
+            )
+            if branches is None:
+                return self.query_multimodal(
+                    query_embedding, session_id, vector_spaces, n_results, score_threshold, filters, hydrate
+                )
+            fused = None
+            cached = self._query_session_cache(
+                query_embedding, session_id, vector_spaces, branches[-1].limit, score_threshold, filters
+            )
+            if cached is not None:
+                # Dense branches from the cache; only BM25 goes to Qdrant
+                sparse = self.qdrant_client.query_points(**self._sparse_request(branches, session_id)).points
+                fused = self._fuse(
+                    cached, sparse, query_embedding, session_id, vector_spaces, n_results, score_threshold, fusion
+                )
+            if fused is None:
+                points = self.qdrant_client.query_points(**self._hybrid_request(
+                    branches, query_embedding, session_id, vector_spaces, n_results, score_threshold, fusion
+                )).points
+                fused = self._hybrid_points(points, query_embedding, vector_spaces, fusion)
+        except Exception as e:
+            logger.error(f"[FAIL] Hybrid query failed: {e}")
+            return {"status": "error", "message": str(e)}
         
-        # Format output
-        ids = [r['id'] for r in all_results]
-        documents = [r['content'] for r in all_results]
-        metadatas = []
-        scores = [r['score'] for r in all_results]
+        result = self._format_hybrid(*fused)
+        return self.hydrate(result) if hydrate else result
+    
+    def warm_session_cache(self, session_id: str):
+        """Load a session into the cache ahead of its first query (no-op when disabled)"""
+        if self.session_cache is not None:
+            self.session_cache.get(session_id)
+    
+    def invalidate_session_cache(self, session_ids: Optional[Iterable[Optional[str]]] = None):
+        """Drop cached sessions after a write (all of them when session_ids is None)"""
+        if self.session_cache is None:
+            return
+        if session_ids is None:
+            self.session_cache.invalidate()
+        else:
+            self.session_cache.invalidate([s for s in session_ids if s])
+    
+    def hydrate(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Attach chunk bodies to a query result
         
-        for r in all_results:
-            meta = r['metadata'].copy()
-            meta['matched_vector_space'] = r['matched_vector_space']
-            meta['matched_spaces'] = r['matched_spaces']
-            metadatas.append(meta)
+        Bodies come from the content store; points written before content was
+        externalized still carry theirs in the payload and are fetched from
+        Qdrant for just these ids.
+        """
+        if not self._needs_bodies(result):
+            return result
+        ids = result["ids"]
+        bodies = self.content_store.get_many(ids)
+        missing = [self._point_id(i) for i in ids if i not in bodies]
+        if missing:
+            records = self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=missing,
+                with_payload=CONTENT_FIELDS,
+                with_vectors=False,
+            )
+            bodies.update({str(r.id): r.payload for r in records if r.payload})
+        return self._apply_bodies(result, bodies)
+    
+    def existing_ids(self, point_ids: Sequence[str], batch_size: int = 256) -> set:
+        """
+        Ids among point_ids that are already stored
         
-        logger.info(f"[MULTIMODAL SEARCH] Found {len(ids)} unique results across {vector_spaces}")
+        Batched retrieve without payloads or vectors, so checking a whole
+        document costs a few small requests.
+        """
+        existing = set()
+        point_ids = list(dict.fromkeys(str(p) for p in point_ids))
+        for i in range(0, len(point_ids), batch_size):
+            records = self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=[self._point_id(p) for p in point_ids[i:i + batch_size]],
+                with_payload=False,
+                with_vectors=False,
+            )
+            existing.update(str(r.id) for r in records)
+        return existing
+    
+    def indexed_document(self, session_id: str, document_hash: str) -> Optional[List[str]]:
+        """
+        Point ids of a document fully indexed in a session, or None
         
-        return {
-            "status": "success",
-            "ids": ids,
-            "documents": documents,
-            "metadatas": metadatas,
-            "scores": scores,
-            "distances": [1.0 - s for s in scores],
-            "searched_spaces": vector_spaces,
-            "total_results": len(ids)
+        Every chunk point carries total_chunks, so a re-upload whose stored
+        points reach that count needs no processing at all. Partially stored
+        documents (an interrupted ingest, chunks without embeddings) return
+        None and go through the pipeline, which skips chunk by chunk.
+        """
+        point_ids, total = [], None
+        for page in self.scroll_pages(session_id, {"document_hash": document_hash}, with_payload=["total_chunks"]):
+            for record in page:
+                point_ids.append(str(record.id))
+                total = (record.payload or {}).get("total_chunks", total)
+        if not point_ids or total is None or len(point_ids) < total:
+            return None
+        return point_ids
+    
+    def move_to_source(
+        self,
+        point_ids: Sequence[str],
+        source_file: str,
+        session_id: Optional[str] = None,
+        batch_size: int = 256
+    ) -> int:
+        """
+        Point existing chunks at the file they were re-uploaded as
+        
+        Point ids derive from the file bytes, so a re-upload of an unchanged
+        file maps onto the stored points while /ingest saves it under a new
+        path. Moving source_file (Qdrant payload, catalog and content store)
+        to the new path keeps the chunks owned by the latest upload, so they
+        are not cleaned up as orphans once an earlier copy is removed.
+        
+        Args:
+            point_ids: Stored points of the re-uploaded document
+            source_file: Path the document was saved under
+            session_id: Owning session (selects the shard)
+            batch_size: Points per retrieve/set_payload request
+            
+        Returns:
+            Number of points moved
+        """
+        moved = 0
+        point_ids = list(dict.fromkeys(str(p) for p in point_ids))
+        for i in range(0, len(point_ids), batch_size):
+            records = self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=[self._point_id(p) for p in point_ids[i:i + batch_size]],
+                with_payload=CATALOG_FIELDS,
+                with_vectors=False,
+            )
+            stale = [r for r in records if (r.payload or {}).get("source_file") != source_file]
+            if not stale:
+                continue
+            ids = [r.id for r in stale]
+            self.qdrant_client.set_payload(
+                collection_name=self.collection_name,
+                payload={"source_file": source_file, "file_name": Path(source_file).name},
+                points=ids,
+                shard_key_selector=self._shard_key(session_id),
+                wait=True,
+            )
+            self.catalog.remove_points(r.payload for r in stale)
+            self.catalog.add_points({**(r.payload or {}), "source_file": source_file} for r in stale)
+            self.content_store.move(ids, source_file)
+            moved += len(stale)
+        
+        if moved:
+            self.invalidate_session_cache([session_id] if session_id else None)
+            logger.info(f"[OK] Moved {moved} points to source: {source_file}")
+        return moved
+    
+    def count(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        exact: bool = True
+    ) -> int:
+        """Count points matching a session and payload filters (server-side)"""
+        return self.qdrant_client.count(
+            collection_name=self.collection_name,
+            count_filter=self._build_filter(session_id, filters),
+            exact=exact,
+        ).count
+    
+    def get_stats(self, session_id: Optional[str] = None, exact: bool = True) -> Dict[str, Any]:
+        """
+        Point counts, total and per modality, from Qdrant's count API
+        
+        Counts run on the indexed modality/session_id fields without reading
+        points. Results are cached until the knowledge catalog version, which
+        every process's writes bump, changes, and for at most
+        settings.qdrant_stats_cache_ttl_s, which bounds staleness from writes
+        that bypass the catalog. The ETag is built from that version and the
+        counts.
+        
+        Args:
+            session_id: Restrict to one session
+            exact: Exact counts, or cheaper estimates from index cardinality
+            
+        Returns:
+            Dict with total_documents, modalities, collection_name,
+            embedding_dimension, version and etag
+        """
+        cached = self._stats_cache_get(session_id, exact)
+        if cached is not None:
+            return cached
+        
+        version = self.catalog.version  # Read first: the cache never outlives a write
+        total = self.count(session_id, exact=exact)
+        modality_counts = {
+            modality: self.count(session_id, {"modality": modality}, exact=exact)
+            for modality in MODALITIES
         }
+        return self._stats_cache_put(session_id, exact, version, total, modality_counts)
+    
+    def delete_by_source(self, source_file: str, session_id: Optional[str] = None) -> int:
+        """
+        Delete every point of a source file with one filter delete
+        
+        Args:
+            source_file: Exact source_file payload value
+            session_id: Restrict to one session (all sessions by default)
+            
+        Returns:
+            Number of points deleted
+        """
+        filters = {"source_file": source_file}
+        deleted = self.count(session_id, filters)
+        if deleted:
+            self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=qmodels.FilterSelector(filter=self._build_filter(session_id, filters)),
+                wait=True,
+            )
+            self.catalog.touch()  # Invalidate stats even if the catalog did not know the document
+            self.invalidate_session_cache([session_id] if session_id else None)
+        self.catalog.remove_source(source_file, session_id)
+        self.content_store.delete(session_id, source_file)
+        logger.info(f"[OK] Deleted {deleted} points from source: {source_file}")
+        return deleted
     
     def delete_by_session(self, session_id: str) -> Dict[str, Any]:
         """Delete all documents for a session"""
@@ -385,12 +1548,72 @@ class VectorStore:
                     )
                 )
             )
+            self.catalog.remove_session(session_id)
+            self.content_store.delete(session_id=session_id)
+            self.invalidate_session_cache([session_id])
             logger.info(f"[OK] Deleted documents for session: {session_id}")
             return {"status": "success"}
         except Exception as e:
             logger.error(f"[FAIL] Delete failed: {e}")
             return {"status": "error", "message": str(e)}
     
+    def scroll_pages(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = 256,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> Iterator[List[qmodels.Record]]:
+        """
+        Page through all matching points, following next_page_offset
+        
+        Only one page is held at a time and the next one is requested when
+        the caller asks for it, so whole-collection jobs run in constant
+        memory. Points written during the scroll may or may not be seen.
+        
+        Args:
+            session_id: Restrict to one session
+            filters: Additional exact-match payload filters
+            page_size: Points per scroll request
+            with_payload: True, False or the payload fields to return
+            with_vectors: True, False or the vector names to return
+            
+        Yields:
+            Lists of records, at most page_size each
+        """
+        offset = None
+        query_filter = self._build_filter(session_id, filters)
+        while True:
+            points, offset = self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=query_filter,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload if isinstance(with_payload, bool) else list(with_payload),
+                with_vectors=with_vectors if isinstance(with_vectors, bool) else list(with_vectors),
+            )
+            if points:
+                yield points
+            if offset is None:
+                return
+    
+    def scroll(
+        self,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = 256,
+        with_payload: Union[bool, Sequence[str]] = True,
+        with_vectors: Union[bool, Sequence[str]] = False,
+    ) -> Iterator[qmodels.Record]:
+        """Iterate lazily over all matching points (see scroll_pages)"""
+        for page in self.scroll_pages(session_id, filters, page_size, with_payload, with_vectors):
+            yield from page
+    
+    def rebuild_catalog(self, page_size: int = 1000):
+        """Rebuild the knowledge catalog from a paginated scroll of catalog fields"""
+        self.catalog.rebuild(self.scroll(page_size=page_size, with_payload=CATALOG_FIELDS))
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection"""
         try:
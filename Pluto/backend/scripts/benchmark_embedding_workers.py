@@ -0,0 +1,68 @@
+"""
+Embedding worker scaling benchmark
+
+Measures text embedding throughput of EmbeddingProcessPool for an increasing
+number of worker processes and prints the scaling curve.
+
+Usage:
+    python scripts/benchmark_embedding_workers.py [--texts 4000] [--threads 2] [--max-workers 32]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.embeddings.process_pool import EmbeddingProcessPool
+
+
+def synthetic_texts(count: int):
+    words = ["vector", "retrieval", "embedding", "document", "session", "image",
+             "audio", "chunk", "query", "evidence", "topic", "concept"]
+    return [
+        " ".join(words[(i * 7 + j) % len(words)] for j in range(30)) + f" #{i}"
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark embedding process-pool scaling')
+    parser.add_argument('--texts', type=int, default=4000, help='Texts per run')
+    parser.add_argument('--threads', type=int, default=2, help='ONNX threads per worker')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.texts)
+    worker_counts = []
+    n = 1
+    while n <= args.max_workers:
+        worker_counts.append(n)
+        n *= 2
+
+    print(f"\n{'='*60}")
+    print(f"EMBEDDING WORKER SCALING ({args.texts} texts, {args.threads} threads/worker)")
+    print(f"{'='*60}")
+    print(f"{'workers':>8} {'texts/sec':>12} {'speedup':>10}")
+
+    baseline = None
+    for workers in worker_counts:
+        pool = EmbeddingProcessPool(workers=workers, threads_per_worker=args.threads)
+        try:
+            # Warm up: load ONNX sessions in every worker
+            pool.embed_texts(texts[:workers * pool.chunk_size])
+
+            start = time.perf_counter()
+            pool.embed_texts(texts)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+
+        throughput = len(texts) / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>12.1f} {throughput / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Image embedding throughput benchmark
+
+Builds a synthetic image-heavy PDF, extracts its images the same way
+PDFProcessor does, and compares images/sec for:
+- per-image embedding (one vision-encoder call per image)
+- EmbeddingsManager.embed_images_batch (parallel decode + batched CLIP)
+
+Usage:
+    python scripts/benchmark_image_embedding.py [--images 200] [--size 800]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.embeddings.manager import EmbeddingsManager
+
+
+def build_synthetic_pdf(num_images: int, size: int) -> bytes:
+    """Create a PDF with one distinct JPEG image per page"""
+    import fitz  # PyMuPDF
+
+    rng = np.random.default_rng(0)
+    doc = fitz.open()
+    for _ in range(num_images):
+        pixels = rng.integers(0, 255, size=(size, size, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format='JPEG', quality=85)
+        page = doc.new_page(width=size, height=size)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def extract_images(pdf_bytes: bytes):
+    """Extract raw image bytes like PDFProcessor._extract_page_images"""
+    import fitz  # PyMuPDF
+
+    images = []
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    for page in doc:
+        for img_info in page.get_images(full=True):
+            base_image = doc.extract_image(img_info[0])
+            if base_image:
+                images.append(base_image["image"])
+    doc.close()
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CLIP image embedding throughput')
+    parser.add_argument('--images', type=int, default=200, help='Number of images in the PDF')
+    parser.add_argument('--size', type=int, default=800, help='Image edge length in pixels')
+    args = parser.parse_args()
+
+    print(f"Building synthetic PDF with {args.images} images ({args.size}x{args.size})...")
+    images = extract_images(build_synthetic_pdf(args.images, args.size))
+
+    manager = EmbeddingsManager()
+    # Warm up ONNX sessions so model load is not measured
+    manager.embed_images_batch(images[:2], use_cache=False)
+
+    start = time.perf_counter()
+    for image_bytes in images:
+        manager.embedder.embed(Image.open(io.BytesIO(image_bytes)))
+    per_image = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager.embed_images_batch(images, use_cache=False)
+    batched = time.perf_counter() - start
+
+    print(f"\n{'='*60}")
+    print(f"IMAGE EMBEDDING THROUGHPUT ({len(images)} images)")
+    print(f"{'='*60}")
+    print(f"Per-image calls: {len(images) / per_image:8.1f} images/sec ({per_image:.2f}s)")
+    print(f"Batched:         {len(images) / batched:8.1f} images/sec ({batched:.2f}s)")
+    print(f"Speedup:         {per_image / batched:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Multimodal query latency: sequential per-space searches vs one batch request
+
+Fills a scratch collection on the configured Qdrant with random CLIP-sized
+vectors in the text/image/audio spaces, then reports p50/p95/p99 latency of:
+- sequential: one query_points call per vector space (previous behaviour)
+- batched: VectorStore.query_multimodal (single query_batch_points call)
+
+Usage:
+    python scripts/benchmark_multimodal_query.py [--points 20000] [--queries 200] [--top-k 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.storage.vector_store import VectorStore
+
+SPACES = ["text_embedding", "image_embedding", "audio_embedding"]
+
+
+def percentile_report(name: str, samples_ms):
+    samples = np.asarray(samples_ms)
+    print(
+        f"{name:<12} p50={np.percentile(samples, 50):7.2f}ms  "
+        f"p95={np.percentile(samples, 95):7.2f}ms  p99={np.percentile(samples, 99):7.2f}ms"
+    )
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    store = VectorStore()
+    store.collection_name = f"{settings.collection_name}_bench_query"
+    client = store.qdrant_client
+    dim = settings.embedding_dimension
+    rng = np.random.default_rng(0)
+
+    print(f"Qdrant {settings.qdrant_host}:{settings.qdrant_port} -> {store.collection_name}")
+    if client.collection_exists(store.collection_name):
+        client.delete_collection(store.collection_name)
+    client.create_collection(store.collection_name, vectors_config=store.vector_config)
+    store._create_indexes()
+
+    try:
+        documents = []
+        for start in range(0, args.points, 1000):
+            rows = min(1000, args.points - start)
+            vectors = {space: random_unit(rng, rows, dim) for space in SPACES}
+            for row in range(rows):
+                documents.append({
+                    'id': start + row,
+                    **{space: vectors[space][row] for space in SPACES},
+                    'payload': {'content': f"doc {start + row}", 'session_id': "bench"},
+                })
+        store.add_documents(documents)
+        print(f"Indexed {args.points} points")
+
+        queries = random_unit(rng, args.queries, dim)
+        query_filter = store._build_filter("bench")
+
+        # Warm up both paths
+        for query in queries[:10]:
+            store.query_multimodal(query, session_id="bench", n_results=args.top_k, score_threshold=-1.0)
+
+        sequential, batched = [], []
+        for query in queries:
+            started = time.perf_counter()
+            for space in SPACES:
+                client.query_points(
+                    collection_name=store.collection_name,
+                    query=store._to_wire(query),
+                    using=space,
+                    query_filter=query_filter,
+                    limit=args.top_k,
+                    score_threshold=-1.0,
+                    with_payload=True,
+                )
+            sequential.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            store.query_multimodal(query, session_id="bench", n_results=args.top_k, score_threshold=-1.0)
+            batched.append((time.perf_counter() - started) * 1000)
+
+        print(f"\n{args.queries} queries, top-{args.top_k}, {len(SPACES)} vector spaces")
+        percentile_report("sequential", sequential)
+        percentile_report("batched", batched)
+        print(f"speedup (p50): {np.percentile(sequential, 50) / np.percentile(batched, 50):.2f}x")
+    finally:
+        client.delete_collection(store.collection_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,8 @@ async def test_query_latency(session, query, session_id, iterations=10):
         "mean": mean(latencies),
         "stdev": stdev(latencies) if len(latencies) > 1 else 0,
         "min": min(latencies),
-        "max": max(latencies)
+        "max": max(latencies),
+        "latencies": latencies
     }
 
 async def test_concurrent_users(num_users=10):
@@ -49,6 +50,12 @@ async def test_concurrent_users(num_users=10):
         print(f"Average latency: {mean(all_means):.2f}s")
         print(f"Worst latency: {max(r['max'] for r in results):.2f}s")
         print(f"Best latency: {min(r['min'] for r in results):.2f}s")
+        
+        all_latencies = sorted(l for r in results for l in r['latencies'])
+        p99 = all_latencies[min(len(all_latencies) - 1, int(len(all_latencies) * 0.99))]
+        print(f"p99 latency: {p99:.2f}s")
 
 if __name__ == "__main__":
-    asyncio.run(test_concurrent_users(num_users=10))
\ No newline at end of file
+    import sys
+    num_users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    asyncio.run(test_concurrent_users(num_users=num_users))
\ No newline at end of file
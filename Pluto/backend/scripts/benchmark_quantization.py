@@ -0,0 +1,127 @@
+"""
+fp32 vs int8 CLIP benchmark
+
+Embeds a local sample corpus with the full-precision and the dynamically
+quantized int8 CLIP encoders and reports, per encoder:
+- latency per item and throughput
+- cosine drift between fp32 and int8 vectors of the same input
+- retrieval agreement: top-k overlap of fp32 vs int8 rankings for sample queries
+
+Usage:
+    python scripts/benchmark_quantization.py --corpus data/uploads [--queries 50] [--top-k 10]
+
+Text is read from .txt/.md files (split into CLIP-sized chunks), images from
+.png/.jpg/.jpeg files. Without a corpus, a synthetic one is generated.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.embeddings.models.multimodal_embedder import load_image_model, load_text_model
+
+TEXT_SUFFIXES = {'.txt', '.md'}
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+
+
+def load_corpus(corpus_dir, max_texts: int, max_images: int):
+    texts, images = [], []
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).rglob('*')):
+            suffix = path.suffix.lower()
+            if suffix in TEXT_SUFFIXES and len(texts) < max_texts:
+                words = path.read_text(errors='ignore').split()
+                for i in range(0, len(words), 35):
+                    texts.append(' '.join(words[i:i + 35]))
+            elif suffix in IMAGE_SUFFIXES and len(images) < max_images:
+                images.append(Image.open(path).convert('RGB'))
+
+    if not texts:
+        rng = np.random.default_rng(0)
+        vocab = ["vector", "database", "image", "retrieval", "audio", "transcript",
+                 "session", "neural", "network", "document", "evidence", "query"]
+        texts = [' '.join(rng.choice(vocab, 25)) for _ in range(max_texts)]
+    if not images:
+        rng = np.random.default_rng(1)
+        images = [
+            Image.fromarray(rng.integers(0, 255, (256, 256, 3), dtype=np.uint8))
+            for _ in range(max_images)
+        ]
+    return texts[:max_texts], images[:max_images]
+
+
+def embed_timed(model, items, batch_size: int):
+    list(model.embed(items[:2], batch_size=batch_size))  # warm up ONNX session
+    start = time.perf_counter()
+    vectors = np.stack(list(model.embed(items, batch_size=batch_size))).astype(np.float32)
+    elapsed = time.perf_counter() - start
+    return vectors, elapsed
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+
+def top_k_overlap(queries_a, corpus_a, queries_b, corpus_b, k: int) -> float:
+    k = min(k, len(corpus_a))
+    top_a = np.argsort(-(queries_a @ corpus_a.T), axis=1)[:, :k]
+    top_b = np.argsort(-(queries_b @ corpus_b.T), axis=1)[:, :k]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(top_a, top_b)]))
+
+
+def report(name, items, fp32_vectors, fp32_time, int8_vectors, int8_time):
+    fp32_n, int8_n = normalize(fp32_vectors), normalize(int8_vectors)
+    drift = 1.0 - np.sum(fp32_n * int8_n, axis=1)
+    print(f"\n[{name}] {len(items)} items")
+    print(f"  fp32: {1000 * fp32_time / len(items):7.2f} ms/item  {len(items) / fp32_time:8.1f} items/sec")
+    print(f"  int8: {1000 * int8_time / len(items):7.2f} ms/item  {len(items) / int8_time:8.1f} items/sec")
+    print(f"  speedup: {fp32_time / int8_time:.2f}x")
+    print(f"  cosine drift: mean={drift.mean():.4f} p95={np.percentile(drift, 95):.4f} max={drift.max():.4f}")
+    return fp32_n, int8_n
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare fp32 and int8 CLIP encoders')
+    parser.add_argument('--corpus', type=str, default=None, help='Directory with sample documents')
+    parser.add_argument('--texts', type=int, default=1000)
+    parser.add_argument('--images', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    texts, images = load_corpus(args.corpus, args.texts, args.images)
+    queries = texts[:args.queries]
+
+    print(f"\n{'='*60}")
+    print("CLIP fp32 vs int8 BENCHMARK")
+    print(f"{'='*60}")
+
+    text_fp32, text_int8 = load_text_model("fp32"), load_text_model("int8")
+    fp32_vecs, fp32_time = embed_timed(text_fp32, texts, args.batch_size)
+    int8_vecs, int8_time = embed_timed(text_int8, texts, args.batch_size)
+    text_fp32_n, text_int8_n = report("text", texts, fp32_vecs, fp32_time, int8_vecs, int8_time)
+
+    q_fp32 = text_fp32_n[:len(queries)]
+    q_int8 = text_int8_n[:len(queries)]
+    overlap = top_k_overlap(q_fp32, text_fp32_n, q_int8, text_int8_n, args.top_k)
+    print(f"  text->text top-{args.top_k} overlap: {overlap:.3f}")
+
+    image_fp32, image_int8 = load_image_model("fp32"), load_image_model("int8")
+    fp32_vecs, fp32_time = embed_timed(image_fp32, images, args.batch_size)
+    int8_vecs, int8_time = embed_timed(image_int8, images, args.batch_size)
+    img_fp32_n, img_int8_n = report("image", images, fp32_vecs, fp32_time, int8_vecs, int8_time)
+
+    overlap = top_k_overlap(q_fp32, img_fp32_n, q_int8, img_int8_n, args.top_k)
+    print(f"  text->image top-{args.top_k} overlap: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Session cache: in-process brute force vs Qdrant for typical session sizes
+
+Loads one scratch collection on the configured Qdrant with sessions of the
+given sizes, then reports p50/p95 latency of session-scoped queries answered
+by Qdrant and by the in-process session cache (single space and 3-space
+multimodal), plus the cache's load time and memory per session.
+
+Usage:
+    python scripts/benchmark_session_cache.py [--sizes 200 1000 5000] [--queries 300]
+
+The knowledge catalog and content store used during the run live in a
+temporary directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.storage.content_store import ChunkContentStore
+from app.storage.knowledge_catalog import KnowledgeCatalog
+from app.storage.session_cache import SessionVectorCache
+from app.storage.vector_store import VECTOR_SPACES, VectorStore
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def latency_ms(search, queries, session_id):
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        search(q, session_id=session_id, n_results=10, score_threshold=-1.0, hydrate=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="session_cache_bench_"))
+    KnowledgeCatalog(path=workdir / "catalog.sqlite")
+    ChunkContentStore(path=workdir / "chunk_content.sqlite")
+
+    store = VectorStore()
+    client = store.qdrant_client
+    dim = settings.embedding_dimension
+    rng = np.random.default_rng(0)
+    queries = random_unit(rng, args.queries, dim)
+
+    store.collection_name = f"{settings.collection_name}_bench_session_cache"
+    if client.collection_exists(store.collection_name):
+        client.delete_collection(store.collection_name)
+    store._create_collection()
+
+    try:
+        next_id = 1
+        for size in args.sizes:
+            vectors = {space: random_unit(rng, size, dim) for space in VECTOR_SPACES}
+            store.bulk_upsert(
+                {
+                    'id': next_id + i,
+                    **{space: vectors[space][i] for space in VECTOR_SPACES},
+                    'payload': {'session_id': f"s{size}", 'source_file': "bench.pdf", 'modality': 'text'},
+                }
+                for i in range(size)
+            )
+            next_id += size
+
+        print(f"backend={settings.qdrant_mode}, dim={dim}")
+        print(f"{'points':>7}{'qdrant p50':>12}{'p95':>8}{'cache p50':>11}{'p95':>8}"
+              f"{'multi qdrant':>14}{'multi cache':>13}{'load ms':>9}{'MB':>7}")
+        for size in args.sizes:
+            session_id = f"s{size}"
+            store.session_cache = None
+            q50, q95 = latency_ms(store.query, queries, session_id)
+            mq50, _ = latency_ms(store.query_multimodal, queries, session_id)
+
+            store.session_cache = SessionVectorCache(store, max_points=max(args.sizes))
+            t0 = time.perf_counter()
+            entry = store.session_cache.get(session_id)
+            load_ms = (time.perf_counter() - t0) * 1000
+            c50, c95 = latency_ms(store.query, queries, session_id)
+            mc50, _ = latency_ms(store.query_multimodal, queries, session_id)
+            print(f"{size:>7}{q50:>12.3f}{q95:>8.3f}{c50:>11.3f}{c95:>8.3f}"
+                  f"{mq50:>14.3f}{mc50:>13.3f}{load_ms:>9.0f}{entry.nbytes / 1e6:>7.1f}")
+    finally:
+        store.session_cache = None
+        client.delete_collection(store.collection_name)
+    print("(latencies in ms, multimodal columns are p50)")
+
+
+if __name__ == "__main__":
+    main()
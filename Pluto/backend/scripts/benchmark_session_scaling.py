@@ -0,0 +1,120 @@
+"""
+Session scaling: filtered query latency as the number of sessions grows
+
+Loads scratch collections on the configured Qdrant with N sessions of
+Zipf-distributed sizes plus one large tenant, then reports p50/p95 latency of
+session-filtered queries for small sessions (routed to exact search) and the
+large session (HNSW over the tenant index). With the tenant index and routing,
+p95 should stay flat as N grows.
+
+Usage:
+    python scripts/benchmark_session_scaling.py [--sessions 100 1000 10000 30000]
+        [--large-session 50000] [--queries 300] [--shards 0]
+
+--shards N creates the collections with N custom session shard keys
+(qdrant_session_shards). The knowledge catalog and content store used during
+the run live in a temporary directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.storage.content_store import ChunkContentStore
+from app.storage.knowledge_catalog import KnowledgeCatalog
+from app.storage.qdrant.connection import is_embedded
+from app.storage.vector_store import VectorStore
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def stream_vectors(rng, dim: int, block: int = 4096):
+    """Endless unit vectors, generated a block at a time"""
+    while True:
+        yield from random_unit(rng, block, dim)
+
+
+def session_sizes(rng, sessions: int) -> np.ndarray:
+    """Zipf-like sizes: most sessions hold a few documents, a few hold thousands"""
+    return np.clip(rng.zipf(1.6, sessions) * 10, 5, 5000)
+
+
+def latency_ms(store, queries, session_ids, top_k):
+    samples = []
+    for q, session_id in zip(queries, session_ids):
+        t0 = time.perf_counter()
+        store.query(q, session_id=session_id, n_results=top_k, score_threshold=-1.0, hydrate=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 10000, 30000])
+    parser.add_argument("--large-session", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="session_bench_"))
+    KnowledgeCatalog(path=workdir / "catalog.sqlite")
+    ChunkContentStore(path=workdir / "chunk_content.sqlite")
+    settings.qdrant_session_shards = args.shards
+
+    store = VectorStore()
+    client = store.qdrant_client
+    dim = settings.embedding_dimension
+    rng = np.random.default_rng(0)
+    queries = random_unit(rng, args.queries, dim)
+
+    print(f"exact search up to {settings.qdrant_exact_search_max_points} points/session, shards={args.shards}")
+    print(f"{'sessions':>9}{'points':>10}{'small p50':>11}{'p95':>8}{'large p50':>11}{'p95':>8}")
+    for sessions in args.sessions:
+        store.collection_name = f"{settings.collection_name}_bench_sessions_{sessions}"
+        if client.collection_exists(store.collection_name):
+            client.delete_collection(store.collection_name)
+        store.session_shards = 0 if is_embedded() else args.shards  # The main collection may differ
+        store._create_collection()
+
+        try:
+            sizes = session_sizes(rng, sessions)
+            owners = np.concatenate([np.repeat(np.arange(sessions), sizes), np.full(args.large_session, -1)])
+            store.bulk_upsert(
+                {
+                    'id': i + 1,
+                    'text_embedding': vector,
+                    'payload': {
+                        'session_id': "large" if owner < 0 else f"s{owner}",
+                        'source_file': "bench.pdf",
+                        'modality': 'text',
+                    },
+                }
+                for i, (owner, vector) in enumerate(zip(owners, stream_vectors(rng, dim)))
+            )
+            while client.get_collection(store.collection_name).status.value != "green":
+                time.sleep(2)
+
+            small = [f"s{s}" for s in rng.integers(0, sessions, args.queries)]
+            small_p50, small_p95 = latency_ms(store, queries, small, args.top_k)
+            large_p50, large_p95 = latency_ms(store, queries, ["large"] * args.queries, args.top_k)
+            print(f"{sessions:>9}{len(owners):>10}{small_p50:>11.2f}{small_p95:>8.2f}{large_p50:>11.2f}{large_p95:>8.2f}")
+        finally:
+            client.delete_collection(store.collection_name)
+            store.catalog.rebuild([])  # Session sizes of the next run start from zero
+    print("(latencies in ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Vector backend comparison: Qdrant server vs embedded local mode
+
+Runs the same VectorStore workload against each backend (settings.qdrant_mode)
+for small and medium collections, and reports:
+- bulk load throughput (points/s)
+- single-space query p50/p95 with a session filter
+- multimodal (3-space batch) query p50/p95
+
+Each backend runs in its own process because the mode is fixed per process;
+the 'local' backend uses a temporary storage directory.
+
+Usage:
+    python scripts/benchmark_vector_backend.py [--backends server local memory]
+        [--sizes 1000 20000] [--queries 200] [--top-k 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SPACES = ["text_embedding", "image_embedding", "audio_embedding"]
+SESSIONS = 10
+
+
+def random_unit(rng, rows: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_backend(sizes, queries: int, top_k: int):
+    """Workload against the backend configured for this process; one JSON line per size"""
+    from app.config import settings
+    from app.storage.vector_store import VectorStore
+
+    store = VectorStore()
+    client = store.qdrant_client
+    dim = settings.embedding_dimension
+    rng = np.random.default_rng(0)
+    query_vectors = random_unit(rng, queries, dim)
+
+    for size in sizes:
+        store.collection_name = f"{settings.collection_name}_bench_backend_{size}"
+        if client.collection_exists(store.collection_name):
+            client.delete_collection(store.collection_name)
+        client.create_collection(store.collection_name, vectors_config=store.vector_config)
+        store._create_indexes()
+
+        try:
+            vectors = {space: random_unit(rng, size, dim) for space in SPACES}
+            started = time.perf_counter()
+            store.bulk_upsert(
+                {
+                    'id': i + 1,
+                    **{space: vectors[space][i] for space in SPACES},
+                    'payload': {'session_id': f"s{i % SESSIONS}", 'modality': 'text'},
+                }
+                for i in range(size)
+            )
+            load_seconds = time.perf_counter() - started
+
+            single, multi = [], []
+            for i, q in enumerate(query_vectors):
+                session_id = f"s{i % SESSIONS}"
+                t0 = time.perf_counter()
+                store.query(q, session_id=session_id, n_results=top_k, score_threshold=-1.0, hydrate=False)
+                single.append((time.perf_counter() - t0) * 1000)
+                t0 = time.perf_counter()
+                store.query_multimodal(q, session_id=session_id, n_results=top_k, score_threshold=-1.0, hydrate=False)
+                multi.append((time.perf_counter() - t0) * 1000)
+
+            print(json.dumps({
+                "backend": settings.qdrant_mode,
+                "points": size,
+                "load_pts_s": size / load_seconds,
+                "query_p50": float(np.percentile(single, 50)),
+                "query_p95": float(np.percentile(single, 95)),
+                "multi_p50": float(np.percentile(multi, 50)),
+                "multi_p95": float(np.percentile(multi, 95)),
+            }), flush=True)
+        finally:
+            client.delete_collection(store.collection_name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["server", "local", "memory"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--run-backend", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        run_backend(args.sizes, args.queries, args.top_k)
+        return
+
+    rows = []
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory(prefix="qdrant_local_bench_") as local_path:
+            env = {**os.environ, "QDRANT_MODE": backend, "QDRANT_LOCAL_PATH": local_path}
+            print(f"Running {backend} backend...")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--run-backend", "--sizes", *map(str, args.sizes),
+                 "--queries", str(args.queries), "--top-k", str(args.top_k)],
+                env=env, capture_output=True, text=True,
+            )
+        if proc.returncode != 0:
+            print(f"[FAIL] {backend}: {proc.stderr.strip().splitlines()[-1] if proc.stderr else proc.returncode}")
+            continue
+        rows += [json.loads(line) for line in proc.stdout.splitlines() if line.startswith("{")]
+
+    print(f"\n{'backend':<8}{'points':>8}{'load pts/s':>12}{'query p50':>11}{'p95':>8}{'multi p50':>11}{'p95':>8}")
+    for r in rows:
+        print(
+            f"{r['backend']:<8}{r['points']:>8}{r['load_pts_s']:>12.0f}"
+            f"{r['query_p50']:>11.2f}{r['query_p95']:>8.2f}{r['multi_p50']:>11.2f}{r['multi_p95']:>8.2f}"
+        )
+    print("(latencies in ms)")
+
+
+if __name__ == "__main__":
+    main()
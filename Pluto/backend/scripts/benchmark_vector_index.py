@@ -0,0 +1,151 @@
+"""
+Vector index report: recall@k vs latency vs RAM per quantization/HNSW config
+
+Loads a synthetic clustered set of CLIP-sized unit vectors (1M by default)
+into scratch collections on the configured Qdrant, one per configuration,
+and reports for each:
+- recall@k against exact (brute-force) search
+- p50/p95 search latency
+- estimated RAM for vectors kept in memory plus the HNSW graph
+
+Usage:
+    python scripts/benchmark_vector_index.py [--points 1000000] [--queries 200] [--top-k 10]
+        [--configs none:16:100 scalar:16:100 binary:16:100 scalar:32:200]
+        [--hnsw-ef 64 128 256] [--oversampling 2.0]
+
+Each config is quantization:m:ef_construct. RAM is an estimate from the
+vector/graph layout (float32 = 4 B/dim, int8 = 1 B/dim, binary = 1 bit/dim,
+HNSW ~ 2*m links of 4 B per point on layer 0); compare with `docker stats`
+of the Qdrant container for the measured footprint.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from qdrant_client.http import models as qmodels
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.storage.vector_store import VectorStore, build_search_params, build_vector_config
+
+SPACE = "text_embedding"
+
+
+def synthetic_vectors(rng, rows: int, dim: int, clusters: int = 1000) -> np.ndarray:
+    """Clustered unit vectors (closer to real embeddings than uniform noise)"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.35 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def estimate_ram_mb(points: int, dim: int, quantization: str, m: int, on_disk: bool) -> float:
+    bytes_per_vector = {"none": 0 if on_disk else dim * 4, "scalar": dim, "binary": dim / 8}[quantization]
+    if quantization != "none" and not on_disk:
+        bytes_per_vector += dim * 4  # Originals also resident for rescoring
+    graph = points * 2 * m * 4
+    return (points * bytes_per_vector + graph) / (1024 * 1024)
+
+
+def wait_until_indexed(client, collection: str, timeout: float = 3600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get_collection(collection)
+        if info.status == qmodels.CollectionStatus.GREEN:
+            return
+        time.sleep(2)
+    raise TimeoutError(f"{collection} not indexed after {timeout}s")
+
+
+def search(client, collection: str, query: np.ndarray, top_k: int, params: qmodels.SearchParams):
+    return client.query_points(
+        collection_name=collection,
+        query=query.tolist(),
+        using=SPACE,
+        limit=top_k,
+        search_params=params,
+        with_payload=False,
+    ).points
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--configs", nargs="+", default=["none:16:100", "scalar:16:100", "binary:16:100", "scalar:32:200"])
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--oversampling", type=float, default=settings.qdrant_quantization_oversampling)
+    parser.add_argument("--on-disk", action="store_true", help="Keep full-precision vectors on disk")
+    args = parser.parse_args()
+
+    store = VectorStore()
+    client = store.qdrant_client
+    dim = settings.embedding_dimension
+    rng = np.random.default_rng(0)
+
+    print(f"Generating {args.points} x {dim} synthetic vectors...")
+    vectors = synthetic_vectors(rng, args.points, dim)
+    queries = synthetic_vectors(np.random.default_rng(1), args.queries, dim)
+
+    rows = []
+    ground_truth = None
+    for config in args.configs:
+        quantization, m, ef_construct = config.split(":")
+        m, ef_construct = int(m), int(ef_construct)
+        collection = f"{settings.collection_name}_bench_{quantization}_m{m}_ef{ef_construct}"
+        store.collection_name = collection
+
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+        client.create_collection(
+            collection,
+            vectors_config={SPACE: build_vector_config(quantization, m, ef_construct, args.on_disk)[SPACE]},
+            optimizers_config=qmodels.OptimizersConfigDiff(indexing_threshold=10000),
+        )
+
+        try:
+            started = time.perf_counter()
+            store.bulk_upsert(
+                {'id': i + 1, SPACE: vectors[i], 'payload': {}} for i in range(args.points)
+            )
+            wait_until_indexed(client, collection)
+            print(f"[{config}] loaded and indexed in {time.perf_counter() - started:.0f}s")
+
+            if ground_truth is None:
+                exact = qmodels.SearchParams(exact=True)
+                ground_truth = [
+                    {p.id for p in search(client, collection, q, args.top_k, exact)} for q in queries
+                ]
+
+            for hnsw_ef in args.hnsw_ef:
+                params = build_search_params(hnsw_ef, quantization, args.oversampling)
+                for q in queries[:10]:
+                    search(client, collection, q, args.top_k, params)  # Warm up
+
+                latencies, hits = [], 0
+                for q, truth in zip(queries, ground_truth):
+                    t0 = time.perf_counter()
+                    found = search(client, collection, q, args.top_k, params)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    hits += len(truth & {p.id for p in found})
+
+                rows.append((
+                    config, hnsw_ef, hits / (len(queries) * args.top_k),
+                    np.percentile(latencies, 50), np.percentile(latencies, 95),
+                    estimate_ram_mb(args.points, dim, quantization, m, args.on_disk),
+                ))
+        finally:
+            client.delete_collection(collection)
+
+    print(f"\n{args.points} points, {args.queries} queries, recall@{args.top_k}")
+    print(f"{'config':<18}{'hnsw_ef':>8}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}{'RAM MB':>10}")
+    for config, hnsw_ef, recall, p50, p95, ram in rows:
+        print(f"{config:<18}{hnsw_ef:>8}{recall:>9.3f}{p50:>9.2f}{p95:>9.2f}{ram:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,20 @@ This script helps clean up the Qdrant vector store by:
 2. Removing duplicate documents
 3. Providing detailed cleanup report
 
+The scan streams the collection page by page and saves its progress, so an
+interrupted run continues where it stopped (--restart starts over).
+
 Usage:
-    python scripts/cleanup_vectorstore.py [--dry-run]
+    python scripts/cleanup_vectorstore.py [--dry-run | --clean] [--max-points-per-s 2000] [--restart]
 """
 import sys
 import os
 import logging
-from pathlib import Path
-from collections import defaultdict
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from app.storage.cleanup import VectorStoreCleaner
 from app.storage.vector_store import VectorStore
 from app.config import settings
 
@@ -33,41 +35,51 @@ def analyze_vector_store():
 
     vector_store = VectorStore()
 
-    # Get collection info
     try:
-        collection_info = vector_store.qdrant_client.get_collection()
-        total_docs = collection_info.points_count
-        logger.info(f"\n[STATS] Total points in collection: {total_docs}")
+        stats = vector_store.get_stats()
+        logger.info(f"\n[STATS] Total points in collection: {stats['total_documents']}")
         logger.info(f"[STATS] Collection: {settings.collection_name}")
-
-        # For Qdrant, full analysis is not yet implemented
-        logger.warning("⚠️  Full analysis not yet implemented for Qdrant")
-        logger.info("✓ Basic stats retrieved")
-
+        for modality, count in stats['modalities'].items():
+            logger.info(f"[STATS]   {modality}: {count}")
     except Exception as e:
         logger.error(f"Failed to analyze vector store: {e}")
         return
 
-    return {
-        'total_docs': total_docs,
-        'orphaned_docs': [],  # TODO: Implement for Qdrant
-        'missing_source_docs': [],  # TODO: Implement for Qdrant
-        'duplicates': {}  # TODO: Implement for Qdrant
-    }
+    return stats
 
 
-def cleanup_orphaned_documents(dry_run=True):
-    """Clean up orphaned documents"""
+def cleanup_orphaned_documents(dry_run=True, page_size=512, max_points_per_s=0, restart=False, max_pages=None):
+    """Stream the collection, removing orphaned sources and duplicate chunks"""
     logger.info("\n" + "=" * 70)
     if dry_run:
         logger.info("DRY RUN MODE - No changes will be made")
     else:
-        logger.info("CLEANUP MODE - Removing orphaned documents")
+        logger.info("CLEANUP MODE - Removing orphaned documents and duplicates")
     logger.info("=" * 70)
 
-    # For Qdrant, cleanup is not yet implemented
-    logger.warning("⚠️  Orphaned document cleanup not yet implemented for Qdrant")
-    logger.info("✓ No cleanup performed")
+    cleaner = VectorStoreCleaner(
+        dry_run=dry_run,
+        page_size=page_size,
+        max_points_per_s=max_points_per_s,
+    )
+    try:
+        report = cleaner.run(resume=not restart, max_pages=max_pages)
+    finally:
+        cleaner.state.close()
+
+    logger.info(f"\n[REPORT] Status: {report['status']}")
+    if report.get('message'):
+        logger.info(f"[REPORT] {report['message']}")
+    logger.info(f"[REPORT] Points scanned: {report['scanned']}")
+    logger.info(f"[REPORT] Orphaned sources: {report['orphan_sources']} ({report['orphaned_points']} points)")
+    for source in report['orphan_sample']:
+        logger.info(f"           - {source}")
+    logger.info(f"[REPORT] Duplicate chunks: {report['duplicates']}")
+    if not dry_run:
+        logger.info(f"[REPORT] Deleted: {report['deleted']} points")
+    if report['status'] == 'running':
+        logger.info("💡 Run again to continue from the saved offset")
+    return report
 
 
 def main():
@@ -78,7 +90,15 @@ def main():
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be deleted without actually deleting')
     parser.add_argument('--clean', action='store_true',
-                       help='Actually perform cleanup (removes orphaned documents)')
+                       help='Actually perform cleanup (removes orphaned documents and duplicates)')
+    parser.add_argument('--page-size', type=int, default=512,
+                       help='Points per scroll page')
+    parser.add_argument('--max-points-per-s', type=float, default=settings.vector_cleanup_max_points_per_s,
+                       help='Scan throughput limit so cleanup can run beside live traffic (0 = unlimited)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                       help='Stop after this many pages (progress is saved)')
+    parser.add_argument('--restart', action='store_true',
+                       help='Ignore saved progress and scan from the beginning')
 
     args = parser.parse_args()
 
@@ -87,10 +107,16 @@ def main():
 
     # Cleanup if requested
     if args.clean or args.dry_run:
-        cleanup_orphaned_documents(dry_run=args.dry_run)
+        cleanup_orphaned_documents(
+            dry_run=not args.clean,
+            page_size=args.page_size,
+            max_points_per_s=args.max_points_per_s,
+            restart=args.restart,
+            max_pages=args.max_pages,
+        )
     else:
         logger.info("\n💡 Tip: Use --dry-run to see what would be deleted")
-        logger.info("💡 Use --clean to actually remove orphaned documents")
+        logger.info("💡 Use --clean to actually remove orphaned documents and duplicates")
 
     logger.info("\n" + "=" * 70)
     logger.info("Analysis complete!")
@@ -98,4 +124,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,71 @@
+"""
+Move chunk bodies out of existing Qdrant payloads into the chunk content store
+
+Points ingested before qdrant_external_content was enabled (it is off by
+default) carry content, OCR text, descriptions and transcriptions in their
+payloads. Queries still hydrate them from Qdrant, but this one-off migration
+copies the bodies to cache_dir/chunk_content.sqlite and deletes the fields
+from the payloads. Run it only with QDRANT_EXTERNAL_CONTENT=true, on the
+single host whose cache_dir will serve the bodies.
+
+Usage:
+    python scripts/migrate_payload_content.py [--dry-run] [--page-size 256]
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.storage.content_store import CONTENT_FIELDS, split_payload
+from app.storage.vector_store import VectorStore
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    parser.add_argument("--page-size", type=int, default=256)
+    args = parser.parse_args()
+
+    if not settings.qdrant_external_content and not args.dry_run:
+        logger.error("[FAIL] Set QDRANT_EXTERNAL_CONTENT=true first: queries would not read the migrated bodies")
+        sys.exit(1)
+
+    store = VectorStore()
+    client = store.qdrant_client
+    scanned = migrated = 0
+
+    for points in store.scroll_pages(
+        page_size=args.page_size,
+        with_payload=CONTENT_FIELDS + ["session_id", "source_file"],
+    ):
+        rows = []
+        for point in points:
+            lean, body = split_payload(point.payload or {})
+            if body:
+                rows.append((point.id, lean, body))
+        scanned += len(points)
+
+        if rows and not args.dry_run:
+            # Bodies are stored before the payload fields are dropped
+            store.content_store.put_many(rows)
+            client.delete_payload(
+                collection_name=store.collection_name,
+                keys=CONTENT_FIELDS,
+                points=[point_id for point_id, _, _ in rows],
+                wait=True,
+            )
+        migrated += len(rows)
+
+    action = "Would migrate" if args.dry_run else "[OK] Migrated"
+    logger.info(f"{action} {migrated} of {scanned} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import io
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+from app.embeddings.manager import EmbeddingsManager
+from app.embeddings.cache import EmbeddingLRUCache
+from app.embeddings.dispatcher import EmbeddingDispatcher
+from app.embeddings.disk_cache import DiskEmbeddingCache, content_hash
+
+
+class _FakeTextModel:
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        for text in texts:
+            yield np.full(4, float(len(text)), dtype=np.float32)
+
+
+class _FakeEmbedder:
+    def __init__(self):
+        self.text_model = _FakeTextModel()
+        self.image_calls = []
+
+    def encode_images(self, images, batch_size=16):
+        self.image_calls.append(len(images))
+        return [np.full(4, float(image.size[0]), dtype=np.float32) for image in images]
+
+
+def _make_manager():
+    manager = object.__new__(EmbeddingsManager)
+    manager.embedder = _FakeEmbedder()
+    manager._text_cache = EmbeddingLRUCache("text", 1024 * 1024)
+    manager._image_cache = EmbeddingLRUCache("image", 1024 * 1024)
+    manager._disk_caches = {"text": None, "image": None}
+    manager._dispatcher = None
+    manager._process_pool = None
+    manager._initialized = True
+    return manager
+
+
+def test_embed_batch_text_single_call_and_order():
+    manager = _make_manager()
+    texts = ["a", "bbb", "cc", "bbb"]
+    embeddings = manager.embed_batch_text(texts)
+    # All misses go to the model in one call, duplicates embedded once
+    assert manager.embedder.text_model.calls == [["a", "bbb", "cc"]]
+    assert embeddings.shape == (4, 4) and embeddings.dtype == np.float32
+    assert embeddings[:, 0].tolist() == [1.0, 3.0, 2.0, 3.0]
+
+    # Second pass is served entirely from cache
+    embeddings = manager.embed_batch_text(["cc", "a"])
+    assert len(manager.embedder.text_model.calls) == 1
+    assert embeddings[:, 0].tolist() == [2.0, 1.0]
+
+
+def test_disk_cache_persists_and_is_shared(tmp_path):
+    writer = DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path)
+    reader = DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path)
+    key = content_hash(b"hello")
+
+    assert writer.get(key) is None
+    writer.put_many([key], [[1.0, 2.0, 3.0, 4.0]])
+
+    # Visible to another open instance and to a fresh one (warm on boot)
+    assert reader.get(key).tolist() == [1.0, 2.0, 3.0, 4.0]
+    reopened = DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path)
+    assert len(reopened) == 1
+    assert reopened.get_many([key, content_hash(b"other")])[1] is None
+
+
+
+def test_disk_cache_is_separate_per_precision(tmp_path, monkeypatch):
+    from app.embeddings import disk_cache
+
+    key = content_hash(b"hello")
+    monkeypatch.setattr(disk_cache.settings, "embedding_precision", "fp32")
+    DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path).put(key, [1.0, 2.0, 3.0, 4.0])
+
+    monkeypatch.setattr(disk_cache.settings, "embedding_precision", "int8")
+    int8 = DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path)
+    assert int8.get(key) is None and len(int8) == 0
+    int8.put(key, [0.0, 1.0, 0.0, 0.0])
+
+    fp32 = DiskEmbeddingCache("text", "test/model", dimension=4, cache_dir=tmp_path, precision="fp32")
+    assert fp32.get(key).tolist() == [1.0, 2.0, 3.0, 4.0]
+
+def test_int8_falls_back_to_fp32_on_older_fastembed(monkeypatch):
+    from app.embeddings.models.multimodal_embedder import _load_model
+
+    class _OldModel:
+        """fastembed before lazy_load / specific_model_path"""
+        def __init__(self, model_name, providers=None, threads=None):
+            self.model_name = model_name
+
+    class _NoModelDir:
+        """lazy_load accepted, but no model directory on the inner model"""
+        def __init__(self, model_name, providers=None, threads=None, lazy_load=False, specific_model_path=None):
+            assert specific_model_path is None
+            self.model = object()
+
+    model, precision = _load_model(_OldModel, "test/model", precision="int8")
+    assert isinstance(model, _OldModel) and precision == "fp32"
+    model, precision = _load_model(_NoModelDir, "test/model", precision="int8")
+    assert isinstance(model, _NoModelDir) and precision == "fp32"
+
+
+def test_disk_cache_follows_the_precision_actually_loaded(tmp_path, monkeypatch):
+    from app.embeddings import disk_cache, manager as manager_module
+
+    monkeypatch.setattr(disk_cache.settings, "cache_dir", tmp_path)
+    monkeypatch.setattr(manager_module.settings, "embedding_disk_cache_enabled", True)
+    monkeypatch.setattr(manager_module.settings, "embedding_precision", "int8")
+    manager = _make_manager()
+    manager._disk_caches = {}
+    manager._disk_cache_lock = threading.Lock()
+    manager.embedder.text_precision = "fp32"  # int8 requested, fp32 loaded
+    manager.embedder.image_precision = "int8"
+
+    assert manager._disk_cache("text").directory.name.endswith("@fp32")
+    assert manager._disk_cache("image").directory.name.endswith("@int8-dynamic-qint8")
+    assert manager._disk_cache("text") is manager._disk_cache("text")
+
+
+def test_lru_cache_evicts_least_recently_used_by_bytes():
+    vector = np.zeros(128, dtype=np.float32)  # 512 bytes + overhead
+    cache = EmbeddingLRUCache("text", max_bytes=3 * (vector.nbytes + 200))
+    for key in ("a", "b", "c"):
+        cache.put(key, vector)
+
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.put("d", vector)
+
+    assert "b" not in cache
+    assert all(k in cache for k in ("a", "c", "d"))
+    assert cache.size_bytes <= cache.max_bytes
+    stats = cache.stats()
+    assert (stats["hits"], stats["evictions"]) == (1, 1)
+    assert cache.get("b") is None and cache.misses == 1
+
+
+def _png(width, height=64):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color=(width % 255, 0, 0)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_embed_images_batch_single_call_and_dedup():
+    manager = _make_manager()
+    images = [_png(100), b"not an image", _png(120), _png(100)]
+    embeddings = manager.embed_images_batch(images)
+
+    # Duplicates decoded and embedded once; undecodable images yield None
+    assert manager.embedder.image_calls == [2]
+    assert embeddings[1] is None
+    assert np.array_equal(embeddings[0], embeddings[3])
+    assert not np.array_equal(embeddings[0], embeddings[2])
+
+    assert np.array_equal(manager.embed_images_batch([_png(120)])[0], embeddings[2])
+    assert manager.embedder.image_calls == [2]
+
+
+def test_dispatcher_coalesces_concurrent_requests():
+    calls = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        if texts == ["first"]:
+            busy.set()
+            release.wait(5)
+        return [np.full(4, float(len(t)), dtype=np.float32) for t in texts]
+
+    dispatcher = EmbeddingDispatcher(embed_fn, max_batch=8, window_ms=200)
+
+    # A lone request runs at once instead of waiting out the window
+    started = time.monotonic()
+    first = dispatcher.submit("first")
+    assert busy.wait(5) and time.monotonic() - started < 0.15
+
+    # Requests queued during an inference form the next batch
+    texts = ["a", "bb", "ccc", "dddd", "eeeee", "a"]
+    futures = [dispatcher.submit(t) for t in texts]
+    release.set()
+    results = {t: f.result(timeout=5) for t, f in zip(texts, futures)}
+    first.result(timeout=5)
+    dispatcher.stop()
+
+    assert {k: v[0] for k, v in results.items()} == {t: float(len(t)) for t in texts}
+    assert calls == [["first"], ["a", "bb", "ccc", "dddd", "eeeee"]]  # duplicate "a" embedded once
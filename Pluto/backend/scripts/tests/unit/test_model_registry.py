@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.model_registry import ModelRegistry, model_registry, require_models
+
+
+def test_models_load_concurrently_and_once():
+    registry = ModelRegistry()
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def loader(name):
+        def load():
+            calls.append(name)
+            barrier.wait()  # Deadlocks unless both loads run at the same time
+            return name.upper()
+        return load
+
+    registry.register("a", loader("a"))
+    registry.register("b", loader("b"))
+    registry.start()
+
+    assert registry.wait(timeout=5)
+    assert registry.get("a") == "A" and registry.get("b") == "B"
+    assert sorted(calls) == ["a", "b"]
+    assert all(s["state"] == "ready" for s in registry.status().values())
+    assert registry.cold_start_seconds is not None
+
+
+def test_get_loads_inline_and_records_failures():
+    registry = ModelRegistry()
+    registry.register("ok", lambda: 42)
+    registry.register("broken", lambda: 1 / 0)
+
+    assert registry.get("ok") == 42
+    with pytest.raises(ZeroDivisionError):
+        registry.get("broken")
+    assert registry.status()["broken"]["state"] == "failed"
+    assert registry.not_ready(["ok", "broken"]) == ["broken"]
+
+
+def test_require_models_returns_503_until_ready():
+    registry = ModelRegistry()
+    registry.register("test-model", lambda: object())
+    dependency = require_models("test-model", registry=registry)
+
+    with pytest.raises(HTTPException) as exc:
+        dependency()
+    assert exc.value.status_code == 503
+
+    registry.get("test-model")
+    dependency()
+    assert "test-model" not in model_registry.status()
+
+
+def test_failed_loads_are_retried_after_backoff():
+    registry = ModelRegistry(retry_backoff_s=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("qdrant not up yet")
+        return "store"
+
+    registry.register("qdrant", flaky)
+    registry.start()
+    assert registry.wait(timeout=5)  # Finished, unsuccessfully
+    assert registry.status()["qdrant"]["state"] == "failed"
+
+    registry.is_ready("qdrant")  # Due for retry: reloads in the background
+    assert registry.wait(timeout=5)
+    assert registry.is_ready("qdrant") and registry.get("qdrant") == "store"
+    assert len(attempts) == 2 and registry.status()["qdrant"]["failures"] == 0
+
+    backoff = ModelRegistry(retry_backoff_s=60.0)
+    backoff.register("broken", lambda: 1 / 0)
+    for _ in range(3):
+        with pytest.raises(ZeroDivisionError):
+            backoff.get("broken")
+    assert backoff.status()["broken"]["failures"] == 1  # Not retried inside the backoff
@@ -0,0 +1,89 @@
+import io
+
+from PIL import Image
+
+from app.ingestion import image_dedup
+from app.ingestion.image_dedup import ImageDescriptionStore, summarize_image_dedup
+from app.ingestion.processors import pdf_processor
+from app.ingestion.processors.pdf_processor import PDFProcessor
+
+
+def _png(color, size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _FakePage:
+    def __init__(self, xrefs):
+        self.xrefs = xrefs
+
+    def get_images(self, full=True):
+        return [(xref,) for xref in self.xrefs]
+
+
+class _FakeDoc:
+    def __init__(self, images):
+        self.images = images
+        self.extracted = []
+
+    def extract_image(self, xref):
+        self.extracted.append(xref)
+        return {"image": self.images[xref], "ext": "png"}
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {"response": self.text}
+
+
+def test_pdf_images_deduplicated_within_document_and_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_dedup.settings, "data_dir", tmp_path)
+    monkeypatch.setattr(ImageDescriptionStore, "_instance", None)
+
+    vision_calls = []
+
+    def fake_post(url, json, timeout):
+        vision_calls.append(json["images"][0])
+        return _Response(f"description {len(vision_calls)}")
+
+    monkeypatch.setattr(pdf_processor.requests, "post", fake_post)
+
+    logo, chart = _png("red"), _png("blue")
+    # xref 1 repeats on every page; xref 3 holds the same bytes as xref 1
+    doc = _FakeDoc({1: logo, 2: chart, 3: logo})
+    pages = [_FakePage([1, 2]), _FakePage([1]), _FakePage([3])]
+
+    processor = PDFProcessor.__new__(PDFProcessor)
+    processor.extracted_images_dir = tmp_path
+    processor.min_image_size = 50
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF")
+
+    def extract_all():
+        seen, xref_hashes, chunks = {}, {}, []
+        for page_num, page in enumerate(pages):
+            chunks += processor._extract_page_images(
+                doc, page, page_num, file_path, {}, "pdf", seen, xref_hashes
+            )
+        return chunks
+
+    chunks = extract_all()
+    assert len(chunks) == 2
+    assert doc.extracted == [1, 2, 3]  # Repeated xref 1 is not re-extracted
+    assert len(vision_calls) == 2
+    assert chunks[0]["occurrence_pages"] == [1, 2, 3]
+    assert summarize_image_dedup(chunks) == {
+        "images_found": 4, "unique_images": 2, "deduplicated": 2, "descriptions_reused": 0
+    }
+
+    # A second document with the same images reuses the stored descriptions
+    chunks = extract_all()
+    assert len(vision_calls) == 2
+    assert [c["description"] for c in chunks] == ["description 1", "description 2"]
+    assert summarize_image_dedup(chunks)["descriptions_reused"] == 2
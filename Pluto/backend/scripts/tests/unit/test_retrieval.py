@@ -0,0 +1,810 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models as qmodels
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+from app.storage.async_vector_store import AsyncVectorStore
+from app.storage.content_store import ChunkContentStore
+from app.storage.knowledge_catalog import KnowledgeCatalog
+from app.storage import vector_store as vector_store_module
+from app.storage.vector_store import VectorStore, build_search_params, build_vector_config
+
+DIM = 8
+
+
+@pytest.fixture(autouse=True)
+def catalog(tmp_path, monkeypatch):
+    """Fresh knowledge catalog persisted under tmp_path"""
+    monkeypatch.setattr(KnowledgeCatalog, "_instance", None)
+    catalog = KnowledgeCatalog(path=tmp_path / "catalog.sqlite")
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture(autouse=True)
+def content_store(tmp_path, monkeypatch):
+    """Fresh chunk content store under tmp_path"""
+    monkeypatch.setattr(ChunkContentStore, "_instance", None)
+    return ChunkContentStore(path=tmp_path / "chunk_content.sqlite")
+
+
+def _make_store():
+    """VectorStore against an in-memory local Qdrant"""
+    store = object.__new__(VectorStore)
+    store.collection_name = "test_multimodal"
+    store.qdrant_client = QdrantClient(":memory:")
+    store.vector_config = {
+        name: qmodels.VectorParams(size=DIM, distance=qmodels.Distance.COSINE)
+        for name in ("text_embedding", "image_embedding", "audio_embedding")
+    }
+    store.qdrant_client.create_collection(store.collection_name, vectors_config=store.vector_config)
+    return store
+
+
+def _unit(index):
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_query_multimodal_single_batch_merges_spaces():
+    store = _make_store()
+    query = _unit(0)
+    store.add_documents([
+        # Matches in both text and image spaces; image is the better match
+        {'id': 1, 'text_embedding': 0.6 * query + 0.8 * _unit(1), 'image_embedding': query,
+         'payload': {'content': 'both', 'session_id': 's1'}},
+        {'id': 2, 'text_embedding': query, 'payload': {'content': 'text', 'session_id': 's1'}},
+        {'id': 3, 'text_embedding': query, 'payload': {'content': 'other session', 'session_id': 's2'}},
+    ])
+
+    calls = []
+    batch = store.qdrant_client.query_batch_points
+    store.qdrant_client.query_batch_points = lambda **kw: calls.append(kw) or batch(**kw)
+
+    results = store.query_multimodal(query, session_id="s1", score_threshold=0.1)
+
+    assert len(calls) == 1 and len(calls[0]["requests"]) == 3
+    assert sorted(results["ids"]) == ["1", "2"]
+    both = results["metadatas"][results["ids"].index("1")]
+    assert both["matched_vector_space"] == "image_embedding"
+    assert sorted(both["matched_spaces"]) == ["image_embedding", "text_embedding"]
+    assert results["scores"][results["ids"].index("1")] > 0.99
+
+
+def test_async_store_add_query_count_scroll_delete():
+    store = object.__new__(AsyncVectorStore)
+    store.collection_name = "test_async"
+    store.qdrant_client = AsyncQdrantClient(":memory:")
+
+    async def scenario():
+        await store.qdrant_client.create_collection(
+            store.collection_name,
+            vectors_config={
+                name: qmodels.VectorParams(size=DIM, distance=qmodels.Distance.COSINE)
+                for name in ("text_embedding", "image_embedding", "audio_embedding")
+            },
+        )
+        documents = [
+            {'id': i, 'text_embedding': _unit(i % DIM),
+             'payload': {'content': str(i), 'session_id': "s1" if i <= 5 else "s2", 'source_file': "a.pdf",
+                         'modality': "image" if i % 2 else "text"}}
+            for i in range(1, 13)
+        ]
+        assert (await store.add_documents(documents, batch_size=5))["indexed"] == 12
+
+        results = await store.query_multimodal(_unit(1), session_id="s1", score_threshold=0.5)
+        assert results["ids"] == ["1"]
+
+        assert await store.count(session_id="s2") == 7
+        scrolled = [point.id async for point in store.scroll(session_id="s2", page_size=3)]
+        assert sorted(scrolled) == list(range(6, 13))
+
+        assert (await store.delete_by_session("s2"))["deleted"] == 7
+        assert await store.count() == 5
+
+        # Partial deletes release the catalog refs of the deleted points
+        assert (await store.delete(session_id="s1", filters={"modality": "image"}))["deleted"] == 3
+        assert sorted([point.id async for point in store.scroll()]) == [2, 4]
+        assert store.catalog.session_point_count("s1") == 2
+
+    asyncio.run(scenario())
+
+
+def test_bulk_upsert_pipelines_retries_and_ends_with_barrier(monkeypatch):
+    store = _make_store()
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_upsert_backoff_s", 0.0)
+
+    waits = []
+    failed_once = set()
+    upsert = store.qdrant_client.upsert
+
+    def flaky_upsert(collection_name, points, wait, shard_key_selector=None):
+        # The batch starting at id 5 fails transiently on its first attempt
+        if points[0].id == 5 and 5 not in failed_once:
+            failed_once.add(5)
+            raise ResponseHandlingException(ConnectionError("reset"))
+        waits.append(wait)
+        return upsert(collection_name=collection_name, points=points, wait=wait)
+
+    store.qdrant_client.upsert = flaky_upsert
+    documents = ({'id': i, 'text_embedding': _unit(i % DIM), 'payload': {}} for i in range(1, 26))
+
+    result = store.bulk_upsert(documents, batch_size=4, max_in_flight=2)
+
+    assert result["indexed"] == 25 and result["batches"] == 7 and result["retries"] == 1
+    # Only the final batch waits; it is the consistency barrier
+    assert waits.count(True) == 1 and waits[-1] is True
+    assert store.qdrant_client.count(store.collection_name).count == 25
+
+
+def test_async_bulk_upsert_pipelines_and_retries(monkeypatch):
+    store = object.__new__(AsyncVectorStore)
+    store.collection_name = "test_async_bulk"
+    store.qdrant_client = AsyncQdrantClient(":memory:")
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_upsert_backoff_s", 0.0)
+
+    waits = []
+    failed_once = set()
+    upsert = store.qdrant_client.upsert
+
+    async def flaky_upsert(collection_name, points, wait, shard_key_selector=None):
+        if points[0].id == 5 and 5 not in failed_once:
+            failed_once.add(5)
+            raise ResponseHandlingException(ConnectionError("reset"))
+        waits.append(wait)
+        return await upsert(collection_name=collection_name, points=points, wait=wait)
+
+    async def scenario():
+        await store.qdrant_client.create_collection(store.collection_name, vectors_config=_make_store().vector_config)
+        store.qdrant_client.upsert = flaky_upsert
+        documents = [{'id': i, 'text_embedding': _unit(i % DIM), 'payload': {}} for i in range(1, 26)]
+
+        result = await store.bulk_upsert(documents, batch_size=4, max_in_flight=2)
+
+        assert result["indexed"] == 25 and result["batches"] == 7 and result["retries"] == 1
+        assert waits.count(True) == 1 and waits[-1] is True
+        assert (await store.qdrant_client.count(store.collection_name)).count == 25
+        # add_documents takes the same path past one batch
+        waits.clear()
+        more = [{'id': i, 'text_embedding': _unit(i % DIM), 'payload': {}} for i in range(26, 36)]
+        assert (await store.add_documents(more, batch_size=4))["indexed"] == 10
+        assert waits == [False, False, True]
+
+    asyncio.run(scenario())
+
+
+def test_bulk_upsert_waits_on_every_shard_and_stores_bodies_after_upsert(content_store, monkeypatch):
+    store = _make_store()
+    store.session_shards = 4
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_external_content", True)
+
+    calls = []  # (shard key, wait) of every write, in order
+    upsert = store.qdrant_client.upsert
+
+    def sharded_upsert(collection_name, points, wait, shard_key_selector=None):
+        calls.append((shard_key_selector, wait))
+        return upsert(collection_name=collection_name, points=points, wait=wait)
+
+    store.qdrant_client.upsert = sharded_upsert
+    store.qdrant_client.delete = None  # No barrier requests
+    sessions = [f"s{i}" for i in range(8)]
+    documents = [
+        {'id': i, 'text_embedding': _unit(i % DIM),
+         'payload': {'session_id': sessions[(i - 1) // 4], 'content': f"body {i}"}}
+        for i in range(1, 33)
+    ]  # One session per batch: the final batch reaches a single shard
+    store.bulk_upsert(documents, batch_size=4, max_in_flight=2)
+
+    touched = {store._shard_key(s) for s in sessions}
+    last_write = {key: wait for key, wait in calls}
+    assert len(touched) > 1 and last_write.keys() == touched and len(calls) == 8
+    # Each shard's last batch is the one that waits
+    assert all(last_write.values()) and [wait for _, wait in calls].count(True) == len(touched)
+    assert store.qdrant_client.count(store.collection_name).count == 32 and len(content_store) == 32
+
+    def failing_upsert(collection_name, points, wait, shard_key_selector=None):
+        raise UnexpectedResponse(400, "Bad Request", b"", None)
+
+    store.qdrant_client.upsert = failing_upsert
+    with pytest.raises(UnexpectedResponse):
+        store.add_documents([{'id': 99, 'text_embedding': _unit(0), 'payload': {'session_id': 's0', 'content': 'x'}}])
+    assert "99" not in content_store.get_many(["99"])  # No orphan body row
+
+
+def _payload(session_id, source_file, topic, concepts):
+    return {'session_id': session_id, 'source_file': source_file,
+            'document_topic': topic, 'document_concepts': concepts}
+
+
+def test_knowledge_catalog_incremental_refcounts_and_versions(catalog, tmp_path, monkeypatch):
+    catalog.add_points([_payload("s1", "a.pdf", "Physics", ["work", "energy"])] * 3)
+    catalog.add_points([_payload("s2", "b.pdf", "Physics", ["force"])])
+    first = catalog.get()
+    assert first["topics"] == ["Physics"] and first["concepts"] == ["energy", "force", "work"]
+    assert catalog.get() is first  # Cached until the version changes
+    assert catalog.get("s2") == {"topics": ["Physics"], "concepts": ["force"],
+                                 "document_count": 1, "point_count": 1, "version": catalog.version}
+    assert catalog.session_point_count("s1") == 3 and catalog.get()["point_count"] == 4
+
+    # Topic survives while another document still references it
+    catalog.remove_session("s1")
+    assert catalog.get()["topics"] == ["Physics"] and catalog.get()["concepts"] == ["force"]
+    assert catalog.version > first["version"]
+
+    catalog.remove_points([_payload("s2", "b.pdf", "Physics", ["force"])])
+    assert catalog.get()["document_count"] == 0 and catalog.get()["topics"] == []
+
+    # Persisted state is loaded by a new instance
+    catalog.add_points([_payload("s3", "c.pdf", "Biology", ["cells"])])
+    monkeypatch.setattr(KnowledgeCatalog, "_instance", None)
+    reloaded = KnowledgeCatalog(path=tmp_path / "catalog.sqlite")
+    assert reloaded.get("s3")["topics"] == ["Biology"]
+    reloaded.close()
+
+
+def test_knowledge_catalog_is_shared_between_workers(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(KnowledgeCatalog, "_instance", None)
+    other = KnowledgeCatalog(path=tmp_path / "catalog.sqlite")  # Another worker's catalog
+    monkeypatch.setattr(vector_store_module.settings, "knowledge_catalog_refresh_s", 60.0)
+    catalog.add_points([_payload("s1", "a.pdf", "Physics", ["work"])] * 4)
+    assert catalog.session_point_count("s1") == 4  # Own writes are seen at once
+
+    # Reads are served from memory between refresh checks
+    statements = []
+    other._conn.set_trace_callback(statements.append)
+    assert other.session_point_count("s1") == 0 and other.get("s1")["topics"] == [] and not statements
+    other._conn.set_trace_callback(None)
+    monkeypatch.setattr(vector_store_module.settings, "knowledge_catalog_refresh_s", 0.0)
+    assert other.get("s1")["topics"] == ["Physics"] and other.session_point_count("s1") == 4
+    assert other.version == catalog.version
+
+    other.remove_source("a.pdf", "s1")
+    assert catalog.get("s1")["document_count"] == 0 and catalog.version == other.version
+
+    # A document written while the rebuild scrolls keeps its live count,
+    # even though the scroll saw part of it
+    catalog.add_points([_payload("s2", "b.pdf", "Biology", ["cells"])] * 4)
+
+    def scrolled():
+        yield _payload("s2", "b.pdf", "Biology", ["cells"])
+        yield _payload("s2", "b.pdf", "Biology", ["cells"])
+        other.add_points([_payload("s2", "b.pdf", "Biology", ["cells"])] * 2)
+        yield _payload("s2", "b.pdf", "Biology", ["cells"])
+        yield _payload("s3", "c.pdf", "Chemistry", [])
+
+    catalog.rebuild(scrolled())
+    assert catalog.session_point_count("s2") == 6 and other.session_point_count("s2") == 6
+    assert other.get()["topics"] == ["Biology", "Chemistry"]
+    other.close()
+
+
+def test_vector_store_maintains_and_rebuilds_catalog(catalog):
+    store = _make_store()
+    store.add_documents([
+        {'id': i, 'text_embedding': _unit(i % DIM),
+         'payload': _payload("s1" if i < 4 else "s2", f"doc{i % 2}.pdf", f"Topic {i % 2}", ["x"])}
+        for i in range(1, 7)
+    ])
+    assert store.get_knowledge_catalog()["topics"] == ["Topic 0", "Topic 1"]
+    assert store.get_knowledge_catalog("s2")["document_count"] == 2
+
+    store.delete_by_session("s1")
+    catalog.add_points([_payload("s9", "stale.pdf", "Stale", [])])  # Not in Qdrant
+
+    store.rebuild_catalog(page_size=2)
+    assert store.get_knowledge_catalog()["topics"] == ["Topic 0", "Topic 1"]
+    assert store.get_knowledge_catalog()["document_count"] == 2
+
+
+def test_index_settings_applied_per_named_vector(monkeypatch):
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_quantization", "scalar")
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_hnsw_m", 32)
+
+    config = build_vector_config()
+    assert set(config) == {"text_embedding", "image_embedding", "audio_embedding"}
+    for params in config.values():
+        assert params.hnsw_config.m == 32
+        assert params.quantization_config.scalar.type == qmodels.ScalarType.INT8
+
+    params = build_search_params(hnsw_ef=64, oversampling=3.0)
+    assert params.hnsw_ef == 64
+    assert params.quantization.rescore and params.quantization.oversampling == 3.0
+
+    assert build_vector_config("binary")["text_embedding"].quantization_config.binary is not None
+    assert build_search_params(quantization="none").quantization is None
+    with pytest.raises(ValueError):
+        build_vector_config("pq")
+
+
+def test_lean_payloads_with_lazy_hydration(content_store, monkeypatch):
+    store = _make_store()
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_external_content", True)
+    query = _unit(0)
+    store.add_documents([
+        {'id': 1, 'text_embedding': query,
+         'payload': {'content': 'body one', 'ocr_text': 'ocr', 'session_id': 's1', 'source_file': 'a.pdf',
+                     'modality': 'text', 'document_concepts': ['x']}},
+        {'id': 2, 'text_embedding': 0.8 * query + 0.6 * _unit(1),
+         'payload': {'content': 'body two', 'session_id': 's2', 'source_file': 'b.pdf'}},
+    ])
+    # Point written before content was externalized
+    store.qdrant_client.upsert(store.collection_name, points=[qmodels.PointStruct(
+        id=3, vector={'text_embedding': (0.6 * query + 0.8 * _unit(2)).tolist()},
+        payload={'content': 'legacy body', 'session_id': 's2'})])
+
+    stored = store.qdrant_client.retrieve(store.collection_name, ids=[1])[0].payload
+    assert 'content' not in stored and 'ocr_text' not in stored and stored['modality'] == 'text'
+    assert len(content_store) == 2
+
+    lean = store.query(query, score_threshold=0.1, hydrate=False)
+    assert lean["documents"] == ["", "", ""]
+    assert "document_concepts" not in lean["metadatas"][0]
+
+    results = store.query(query, score_threshold=0.1)
+    assert results["documents"] == ["body one", "body two", "legacy body"]
+    assert results["metadatas"][0]["ocr_text"] == "ocr"
+
+    store.delete_by_session("s1")
+    assert content_store.get_many(["1", "2"]).keys() == {"2"}
+
+
+def test_embedded_mode_shares_one_client_between_stores(monkeypatch):
+    from app.config import settings
+    from app.storage.qdrant import connection
+
+    monkeypatch.setattr(settings, "qdrant_mode", "memory")
+    monkeypatch.setattr(connection, "_embedded_client", None)
+    for cls in (VectorStore, AsyncVectorStore):
+        monkeypatch.setattr(cls, "_instance", None)
+        monkeypatch.setattr(cls, "_initialized", False)
+    monkeypatch.setattr(settings, "embedding_dimension", DIM)
+
+    store = VectorStore()
+    async_store = AsyncVectorStore()
+    assert store.qdrant_client is connection.get_embedded_client()
+
+    store.add_documents([
+        {'id': i, 'text_embedding': _unit(i % DIM), 'payload': {'content': f'c{i}', 'session_id': f's{i % 2}'}}
+        for i in range(1, 9)
+    ])
+
+    async def scenario():
+        results = await async_store.query(_unit(1), session_id="s1", n_results=2, score_threshold=0.5)
+        count = await async_store.count(session_id="s0")
+        await async_store.close()
+        return results, count
+
+    results, count = asyncio.run(scenario())
+    assert results["ids"] == ["1"] and results["documents"] == ["c1"]
+    assert count == 4
+    assert store.qdrant_client.count(store.collection_name).count == 8
+
+
+def test_small_sessions_use_exact_search_and_shard_keys_are_stable(catalog, monkeypatch):
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_exact_search_max_points", 3)
+    store = _make_store()
+    store.search_params = build_search_params()
+    store.exact_search_params = build_search_params(exact=True)
+    store.add_documents([
+        {'id': i, 'text_embedding': _unit(i % DIM),
+         'payload': _payload("big" if i <= 5 else "small", "a.pdf", "T", [])}
+        for i in range(1, 8)
+    ])
+    assert catalog.session_point_count("big") == 5
+
+    requests = {r.filter.must[0].match.value: r.params
+                for r in store._multimodal_requests(_unit(0), "small", ["text_embedding"], 5, None, None)
+                + store._multimodal_requests(_unit(0), "big", ["text_embedding"], 5, None, None)}
+    assert requests["small"].exact and not requests["big"].exact
+    assert store._search_params_for(None) is store.search_params
+
+    store.session_shards = 8
+    keys = {vector_store_module.session_shard_key(f"s{i}", 8) for i in range(200)}
+    assert keys == {f"sessions_{i}" for i in range(8)}
+    groups = dict(store._group_by_shard(store._build_points([
+        {'id': i, 'text_embedding': _unit(0), 'payload': {'session_id': sid}}
+        for i, sid in enumerate(["a", "b", "a"], start=1)
+    ])))
+    assert [p.id for p in groups[store._shard_key("a")]] == [1, 3]
+
+
+def test_scroll_streams_every_page_lazily():
+    store = _make_store()
+    store.add_documents([
+        {'id': i, 'text_embedding': _unit(i % DIM),
+         'payload': {'session_id': f"s{i % 2}", 'modality': 'text', 'source_file': 'a.pdf'}}
+        for i in range(1, 24)
+    ])
+
+    calls = []
+    scroll = store.qdrant_client.scroll
+    store.qdrant_client.scroll = lambda **kw: calls.append(kw) or scroll(**kw)
+
+    records = store.scroll(session_id="s1", page_size=5, with_payload=["modality"], with_vectors=["text_embedding"])
+    first = next(records)
+    assert len(calls) == 1  # Later pages are fetched on demand
+    rest = list(records)
+
+    assert len(calls) == 3 and 1 + len(rest) == 12
+    assert first.payload == {'modality': 'text'} and len(first.vector['text_embedding']) == DIM
+    assert sum(len(page) for page in store.scroll_pages(page_size=10)) == 23
+
+
+def test_stats_by_count_api_cached_per_version_and_source_delete(catalog, content_store, monkeypatch):
+    store = _make_store()
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_external_content", True)
+    store.add_documents([
+        {'id': i, 'text_embedding': _unit(i % DIM),
+         'payload': {**_payload("s1", f"doc{i % 2}.pdf", "T", []), 'content': f'c{i}',
+                     'modality': ("text", "image", "audio")[i % 3]}}
+        for i in range(1, 10)
+    ])
+
+    calls = []
+    count = store.qdrant_client.count
+    store.qdrant_client.count = lambda **kw: calls.append(kw) or count(**kw)
+
+    stats = store.get_stats()
+    assert stats["total_documents"] == 9 and stats["modalities"] == {"text": 3, "image": 3, "audio": 3}
+    assert len(calls) == 4 and store.get_stats() is stats and len(calls) == 4  # Cached until a write
+
+    assert store.delete_by_source("doc1.pdf") == 5
+    fresh = store.get_stats()
+    assert fresh["total_documents"] == 4 and fresh["etag"] != stats["etag"]
+    assert [d for d in catalog._state.documents] == [("s1", "doc0.pdf")]
+    assert set(content_store.get_many([str(i) for i in range(1, 10)])) == {"2", "4", "6", "8"}
+
+    # Another worker computes the same ETag for the same data
+    other = object.__new__(VectorStore)
+    other.collection_name, other.qdrant_client = store.collection_name, store.qdrant_client
+    assert other.get_stats()["etag"] == fresh["etag"]
+
+    # A write that bypassed the catalog shows up once the TTL expires
+    store.qdrant_client.upsert(store.collection_name, points=[qmodels.PointStruct(
+        id=50, vector={'text_embedding': _unit(0).tolist()}, payload={'modality': 'text'})])
+    assert store.get_stats() is fresh
+    monkeypatch.setattr(vector_store_module.settings, "qdrant_stats_cache_ttl_s", 0.0)
+    assert store.get_stats()["total_documents"] == 5 and store.get_stats()["etag"] != fresh["etag"]
+
+
+def test_cleanup_removes_orphans_and_duplicates_resumably(catalog, content_store, tmp_path, monkeypatch):
+    from app.storage.cleanup import VectorStoreCleaner
+    from app.storage.content_store import document_hash
+
+    monkeypatch.setattr(vector_store_module.settings, "upload_dir", tmp_path)
+    kept, reupload, other = tmp_path / "a.pdf", tmp_path / "a_again.pdf", tmp_path / "b.pdf"
+    kept.write_text("x")
+    reupload.write_text("x")
+    other.write_text("y")
+
+    def chunk(point_id, source, index, content, **extra):
+        return {'id': point_id, 'text_embedding': _unit(point_id % DIM),
+                'payload': {**_payload("s1", str(source), "T", []), 'content': content,
+                            'modality': 'text', 'chunk_index': index, **extra}}
+
+    store = _make_store()
+    store.add_documents(
+        [chunk(i, kept, i, f'chunk {i}') for i in range(1, 5)]
+        # The same header twice in one document, and once more in another document
+        + [chunk(5, kept, 5, 'page header'), chunk(6, kept, 6, 'page header'),
+           chunk(31, other, 5, 'page header', document_hash=document_hash(other))]
+        # Re-upload of a.pdf under another name: same bytes, same chunks
+        + [chunk(10 + i, reupload, i, f'chunk  {i}') for i in range(1, 5)]
+        + [chunk(20 + i, tmp_path / "deleted.pdf", i, f'gone {i}') for i in range(1, 4)]
+    )
+
+    scanned_fields = []
+    scroll = store.qdrant_client.scroll
+    store.qdrant_client.scroll = lambda **kw: scanned_fields.append(kw["with_payload"]) or scroll(**kw)
+
+    dry = VectorStoreCleaner(store, dry_run=True, page_size=4, state_path=tmp_path / "dry.sqlite").run()
+    assert dry["status"] == "complete" and dry["orphaned_points"] == 3 and dry["duplicates"] == 4
+    # Pages carry no chunk bodies; the legacy points without content_hash are fetched separately
+    assert scanned_fields and all("content" not in fields for fields in scanned_fields)
+    assert store.count() == 14
+
+    cleaner = VectorStoreCleaner(store, dry_run=False, page_size=4, state_path=tmp_path / "clean.sqlite")
+    partial = cleaner.run(max_pages=1)
+    assert partial["status"] == "running" and partial["scanned"] == 4
+
+    report = VectorStoreCleaner(store, dry_run=False, page_size=4, state_path=tmp_path / "clean.sqlite").run()
+    assert report["status"] == "complete" and report["deleted"] == 7
+    assert sorted(int(p.id) for p in store.scroll(with_payload=False)) == [1, 2, 3, 4, 5, 6, 31]
+    assert set(catalog._state.documents) == {("s1", str(kept)), ("s1", str(other))}
+
+
+def test_reingest_skips_chunks_already_stored(catalog, tmp_path):
+    from app.ingestion.orchestrator import IngestionOrchestrator
+
+    class Processor:
+        calls = 0
+
+        def process(self, path, metadata):
+            Processor.calls += 1
+            return [{'content': f'paragraph number {i}', 'modality': 'text'} for i in range(3)] + [
+                {'content': 'repeated page header', 'modality': 'text'},
+                {'content': 'repeated page header', 'modality': 'text'},
+            ]
+
+    class Embeddings:
+        calls = []
+
+        def embed_batch_text(self, texts):
+            self.calls.append(len(texts))
+            return [_unit(i % DIM) for i in range(len(texts))]
+
+    orchestrator = object.__new__(IngestionOrchestrator)
+    orchestrator._vector_store = _make_store()
+    orchestrator._embeddings_manager = Embeddings()
+    orchestrator._processors = {'text': Processor()}
+    orchestrator._llm = None
+    document = tmp_path / "notes.txt"
+    document.write_text("notes")
+
+    first = orchestrator.ingest_and_store(str(document), "s1")
+    assert first["indexed"] == 5 and first["skipped"] == 0
+    again = orchestrator.ingest_and_store(str(document), "s1")
+    assert again["indexed"] == 0 and again["skipped"] == 5
+    # The whole document was found before processing
+    assert Embeddings.calls == [5] and Processor.calls == 1
+    assert orchestrator.vector_store.count() == 5
+
+    # A re-upload is saved under a new name; the stored chunks follow it
+    upload = tmp_path / "1a2b3c4d_notes.txt"
+    upload.write_bytes(document.read_bytes())
+    assert orchestrator.ingest_and_store(str(upload), "s1")["indexed"] == 0
+    assert orchestrator.vector_store.count("s1", {"source_file": str(upload)}) == 5
+    assert catalog.get("s1")["document_count"] == 1 and catalog.session_point_count("s1") == 5
+
+    # Failing to re-point the stored chunks does not fail the ingest
+    def failing_move(*args, **kwargs):
+        raise RuntimeError("set_payload failed")
+
+    orchestrator.vector_store.move_to_source = failing_move
+    assert orchestrator.ingest_and_store(str(document), "s1")["skipped"] == 5
+
+    # A partially stored document goes through the pipeline and embeds only what is missing
+    store = orchestrator.vector_store
+    dropped = next(store.scroll(session_id="s1", with_payload=False)).id
+    store.qdrant_client.delete(store.collection_name, points_selector=qmodels.PointIdsList(points=[dropped]))
+    partial = orchestrator.ingest_and_store(str(document), "s1")
+    assert partial["indexed"] == 1 and partial["skipped"] == 4 and Processor.calls == 2
+
+    other_session = orchestrator.ingest_and_store(str(document), "s2")
+    assert other_session["indexed"] == 5
+
+
+def test_reingest_of_renamed_pdf_keeps_image_chunk_ids(catalog, tmp_path):
+    from app.ingestion.orchestrator import IngestionOrchestrator
+
+    class PDFProcessor:
+        def process(self, path, metadata):
+            # Like PDFProcessor, image content names the saved file
+            return [{'content': f'page {i} text', 'modality': 'text'} for i in range(2)] + [
+                {'content': f'Image from {Path(path).name} page 1: a chart', 'modality': 'image', 'image_hash': 'abc123'},
+            ]
+
+    class Embeddings:
+        calls = []
+
+        def embed_batch_text(self, texts):
+            self.calls.append(len(texts))
+            return [_unit(i % DIM) for i in range(len(texts))]
+
+    orchestrator = object.__new__(IngestionOrchestrator)
+    orchestrator._vector_store = _make_store()
+    orchestrator._embeddings_manager = Embeddings()
+    orchestrator._processors = {'pdf': PDFProcessor()}
+    orchestrator._llm = None
+    document = tmp_path / "1a2b3c4d_report.pdf"
+    document.write_bytes(b"%PDF-1.4 report")
+    assert orchestrator.ingest_and_store(str(document), "s1")["indexed"] == 3
+
+    # Drop a text chunk so the re-upload goes through processing again
+    store = orchestrator.vector_store
+    dropped = next(p.id for p in store.scroll(session_id="s1") if p.payload.get('modality') == 'text')
+    store.qdrant_client.delete(store.collection_name, points_selector=qmodels.PointIdsList(points=[dropped]))
+
+    upload = tmp_path / "5e6f7a8b_report.pdf"
+    upload.write_bytes(document.read_bytes())
+    again = orchestrator.ingest_and_store(str(upload), "s1")
+    assert again["indexed"] == 1 and again["skipped"] == 2
+    assert Embeddings.calls == [3, 1]
+    assert store.count() == 3 and store.count("s1", {"modality": "image"}) == 1
+
+
+def test_session_cache_matches_qdrant_and_follows_writes(catalog):
+    from app.storage.session_cache import SessionVectorCache
+
+    store = _make_store()
+    rng = np.random.default_rng(0)
+    store.add_documents([
+        {'id': i, 'text_embedding': rng.standard_normal(DIM), 'image_embedding': rng.standard_normal(DIM) if i % 3 == 0 else None,
+         'payload': {'session_id': 's1', 'source_file': f'doc{i % 2}.pdf', 'modality': 'text', 'content': f'chunk {i}'}}
+        for i in range(1, 41)
+    ])
+    query = rng.standard_normal(DIM)
+    expected = store.query(query, session_id="s1", n_results=5, score_threshold=-1.0)
+    expected_multi = store.query_multimodal(query, session_id="s1", n_results=5, score_threshold=-1.0)
+    expected_filtered = store.query(query, session_id="s1", n_results=5, score_threshold=-1.0, filters={'source_file': 'doc1.pdf'})
+
+    store.session_cache = SessionVectorCache(store, max_points=100)
+    assert store.query(query, session_id="s1", n_results=5, score_threshold=-1.0)["ids"] == expected["ids"]
+    multi = store.query_multimodal(query, session_id="s1", n_results=5, score_threshold=-1.0)
+    assert multi["ids"] == expected_multi["ids"]
+    assert np.allclose(multi["scores"], expected_multi["scores"], atol=1e-5)
+    assert multi["documents"][0].startswith("chunk ")
+    filtered = store.query(query, session_id="s1", n_results=5, score_threshold=-1.0, filters={'source_file': 'doc1.pdf'})
+    assert filtered["ids"] == expected_filtered["ids"]
+    assert store.session_cache.stats()["loads"] == 1 and store.session_cache.stats()["hits"] == 2
+
+    # Writes drop the session; the next query sees the new point
+    store.add_documents([{'id': 99, 'text_embedding': query, 'payload': {'session_id': 's1', 'modality': 'text'}}])
+    assert store.session_cache.stats()["sessions"] == 0
+    assert store.query(query, session_id="s1", n_results=1, score_threshold=-1.0)["ids"] == ["99"]
+
+    # Sessions over the point limit, and unscoped queries, stay on Qdrant
+    store.session_cache = SessionVectorCache(store, max_points=10)
+    assert store.session_cache.search("s1", query, ["text_embedding"], 5, -1.0) is None
+    assert store.query(query, session_id="s1", n_results=1, score_threshold=-1.0)["ids"] == ["99"]
+    assert store.session_cache.stats()["sessions"] == 0
+
+
+HYBRID_TEXTS = {1: "photosynthesis converts light energy", 2: "mitochondria produce cellular energy",
+                3: "the krebs cycle oxidizes acetyl coa", 4: "newton laws describe motion"}
+
+
+def _hybrid_documents():
+    from app.storage.sparse_encoder import encode_document
+
+    # Cosine similarity to _unit(1): 1.0, 0.7, 0.65, 0.0
+    vectors = {
+        1: _unit(1),
+        2: 0.7 * _unit(1) + np.sqrt(1 - 0.7 ** 2) * _unit(2),
+        3: 0.65 * _unit(1) + np.sqrt(1 - 0.65 ** 2) * _unit(3),
+        4: _unit(4),
+    }
+    return [
+        {'id': i, 'text_embedding': vectors[i], 'sparse_embedding': encode_document(text),
+         'payload': {'session_id': 's1', 'source_file': 'bio.pdf', 'modality': 'text', 'content': text}}
+        for i, text in HYBRID_TEXTS.items()
+    ]
+
+
+def _make_hybrid_store():
+    """VectorStore over an in-memory collection with the BM25 sparse vector"""
+    from app.storage.vector_store import build_sparse_vector_config
+
+    store = object.__new__(VectorStore)
+    store.collection_name = "test_hybrid"
+    store.qdrant_client = QdrantClient(":memory:")
+    store.vector_config = _make_store().vector_config
+    store.sparse_vectors = True
+    store.qdrant_client.create_collection(
+        store.collection_name, vectors_config=store.vector_config,
+        sparse_vectors_config=build_sparse_vector_config(),
+    )
+    store.add_documents(_hybrid_documents())
+    return store
+
+
+def test_hybrid_query_fuses_bm25_and_dense_in_one_request():
+    store = _make_hybrid_store()
+    texts = HYBRID_TEXTS
+
+    requests = []
+    query_points = store.qdrant_client.query_points
+
+    def recording_query_points(**kwargs):
+        requests.append(kwargs)
+        return query_points(**kwargs)
+
+    store.qdrant_client.query_points = recording_query_points
+
+    # BM25 lifts the chunk that mentions the terms above the dense runner-up
+    dense = store.query_multimodal(_unit(1), session_id="s1", n_results=2)
+    assert dense["ids"] == ["1", "2"]
+    for fusion in ("rrf", "weighted"):
+        requests.clear()
+        hybrid = store.query_hybrid("krebs cycle", _unit(1), session_id="s1", n_results=2, fusion=fusion)
+        assert len(requests) == 1
+        assert hybrid["status"] == "success"
+        if fusion == "rrf":
+            # Ranked by fused rank, not cosine: the top BM25 hit (third by
+            # cosine) outranks the top dense hit
+            assert hybrid["ids"] == ["3", "1"]
+            assert hybrid["documents"][0] == texts[3]
+            assert 0 < hybrid["scores"][1] < hybrid["scores"][0] <= 1.0
+            # Rank scores order the results; the dense similarity stays alongside
+            assert np.allclose(hybrid["similarities"], [0.65, 1.0], atol=1e-5)
+            assert np.allclose(hybrid["distances"], [0.35, 0.0], atol=1e-5)
+        else:
+            # Weighted scores stay on the cosine scale: exact cosine without
+            # lexical match, a bounded boost towards 1.0 with it
+            assert hybrid["ids"] == ["1", "3"]
+            assert hybrid["documents"][1] == texts[3]
+            assert hybrid["scores"][0] == pytest.approx(1.0, abs=1e-5)
+            assert 0.7 < hybrid["scores"][1] < 1.0
+
+    # The similarity threshold applies to dense similarity before the final
+    # cut: a BM25 match with no dense similarity is not returned, and does
+    # not take the place of a qualifying result either
+    for fusion in ("rrf", "weighted"):
+        motion = store.query_hybrid("newton motion", _unit(1), session_id="s1", n_results=4, fusion=fusion)
+        assert motion["ids"] == ["1", "2", "3"]
+        similarities = motion["similarities"] if fusion == "rrf" else motion["scores"]
+        assert min(similarities) >= vector_store_module.settings.similarity_threshold
+    motion = store.query_hybrid("newton motion", _unit(1), session_id="s1", n_results=3, fusion="rrf")
+    assert motion["ids"] == ["1", "2", "3"]
+
+    # Ranked first by every branch (the call RetrievalNode makes) scores 1.0
+    top = store.query_hybrid(
+        "photosynthesis", _unit(1), session_id="s1", vector_spaces=["text_embedding"], n_results=3, fusion="rrf"
+    )
+    assert top["ids"] == ["1", "2", "3"]
+    assert top["scores"][0] == pytest.approx(1.0, abs=1e-5) and top["scores"][2] < top["scores"][1] < 1.0
+    assert top["similarities"][0] == pytest.approx(1.0, abs=1e-5)
+
+    # Filters apply to every branch; term-less queries fall back to dense search
+    other = store.query_hybrid("krebs cycle", _unit(1), session_id="s2", n_results=4)
+    assert other["ids"] == []
+    assert store.query_hybrid("the of", _unit(1), session_id="s1", n_results=4)["ids"] == ["1", "2", "3"]
+
+
+def test_retrieval_node_hybrid_search_uses_the_session_cache(monkeypatch):
+    from app.storage.session_cache import SessionVectorCache
+    from app.storage.sparse_encoder import SPARSE_VECTOR
+    from app.storage.vector_store import build_sparse_vector_config
+
+    store = _make_hybrid_store()
+    monkeypatch.setattr(VectorStore, "_instance", store)
+    monkeypatch.setattr(VectorStore, "_initialized", True)
+
+    async_store = object.__new__(AsyncVectorStore)
+    async_store.collection_name = store.collection_name
+    async_store.qdrant_client = AsyncQdrantClient(":memory:")
+    query = 0.9 * _unit(1) + 0.1 * _unit(3)
+
+    async def search():
+        # The call RetrievalNode._search makes for the graph workflow
+        return await async_store.query_hybrid(
+            "krebs cycle", query, session_id="s1", vector_spaces=["text_embedding"], n_results=4, hydrate=False
+        )
+
+    async def scenario():
+        await async_store.qdrant_client.create_collection(
+            store.collection_name, vectors_config=store.vector_config,
+            sparse_vectors_config=build_sparse_vector_config(),
+        )
+        await async_store.add_documents(_hybrid_documents())
+        expected = {}
+        for fusion in ("rrf", "weighted"):
+            monkeypatch.setattr(vector_store_module.settings, "hybrid_fusion", fusion)
+            expected[fusion] = await search()
+
+        store.session_cache = SessionVectorCache(store, max_points=100)
+        requests = []
+        query_points = async_store.qdrant_client.query_points
+
+        async def recording_query_points(**kwargs):
+            requests.append(kwargs.get("using"))
+            return await query_points(**kwargs)
+
+        async_store.qdrant_client.query_points = recording_query_points
+        for fusion, qdrant_result in expected.items():
+            monkeypatch.setattr(vector_store_module.settings, "hybrid_fusion", fusion)
+            cached = await search()
+            assert cached["ids"] == qdrant_result["ids"] and set(cached["ids"]) == {"1", "2", "3"}
+            assert np.allclose(cached["scores"], qdrant_result["scores"], atol=1e-5)
+            assert np.allclose(cached["distances"], qdrant_result["distances"], atol=1e-5)
+
+        # Dense branches and rescoring came from the cache; Qdrant only ran BM25
+        assert requests == [SPARSE_VECTOR, SPARSE_VECTOR]
+        assert store.session_cache.stats()["loads"] == 1
+
+    asyncio.run(scenario())